@@ -12,7 +12,9 @@ CURRENT_YEAR = datetime.now().year
 
 # Add parent directory to path to import database_utils
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from database_utils import get_ads_data, get_sales_data, check_database_exists, get_new_leads_data, get_discovery_call_data, get_design_review_data
+from database_utils import get_database_generation, check_database_exists, items_to_frame
+from board_datasets import get_ads_data, get_sales_data, get_sales_facts, get_new_leads_data, get_discovery_call_data, get_design_review_data
+from board_columns import ADS_DATA_COLUMNS, UTM_CHANNEL_COLUMNS, DISQUALIFIED_STATUS_COLUMNS, FORM_FIELD_COLUMNS
 
 # Monday.com API settings from Streamlit secrets
 def load_credentials():
@@ -115,37 +117,30 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def get_ads_data_from_db():
-    """Get ads data from SQLite database"""
-    return get_ads_data()
+    """Get ads data (shared read-only across pages, see board_datasets)"""
+    return get_ads_data(columns=ADS_DATA_COLUMNS)
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def get_sales_data_from_db():
-    """Get sales data from SQLite database"""
-    return get_sales_data()
+    """Get sales facts (revenue rules applied at refresh time), shared read-only across pages"""
+    return get_sales_facts()
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def get_all_leads_for_utm():
+@st.cache_data  # Keyed on get_database_generation() (monday_data.db): recomputed once per Monday.com refresh
+def get_all_leads_for_utm(generation):
     """Get all leads data from all boards using database only for speed"""
     import json
     
     all_leads = []
     
-    # Get data from all boards using database functions
-    boards_data = {
-        'New Leads v2': get_new_leads_data(),
-        'Discovery Call v2': get_discovery_call_data(), 
-        'Design Review v2': get_design_review_data(),
-        'Sales v2': get_sales_data().get('data', {}).get('boards', [{}])[0].get('items_page', {}).get('items', [])
-    }
-    
     # Board-specific channel column IDs
-    channel_columns = {
-        'Sales v2': 'text_mkrfer1n',
-        'Design Review v2': 'text_mkrkkpx0',
-        'Discovery Call v2': 'text_mkrk2tj8',
-        'New Leads v2': 'text_mkref4p0'
+    channel_columns = UTM_CHANNEL_COLUMNS
+    
+    # Get only the channel column and date columns from each board
+    boards_data = {
+        'New Leads v2': get_new_leads_data(columns=[channel_columns['New Leads v2']], column_types=['date']),
+        'Discovery Call v2': get_discovery_call_data(columns=[channel_columns['Discovery Call v2']], column_types=['date']),
+        'Design Review v2': get_design_review_data(columns=[channel_columns['Design Review v2']], column_types=['date']),
+        'Sales v2': get_sales_data(columns=[channel_columns['Sales v2']], column_types=['date']).get('data', {}).get('boards', [{}])[0].get('items_page', {}).get('items', [])
     }
     
     # Process each board's data
@@ -194,18 +189,18 @@ def get_all_leads_for_utm():
     
     return all_leads
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def get_sales_leads_for_utm():
+@st.cache_data  # Keyed on get_database_generation() (monday_data.db): recomputed once per Monday.com refresh
+def get_sales_leads_for_utm(generation):
     """Get leads data from Sales board only for UTM analysis"""
     import json
     
     sales_leads = []
     
-    # Get data from Sales board only
-    sales_items = get_sales_data().get('data', {}).get('boards', [{}])[0].get('items_page', {}).get('items', [])
-    
     # Sales board channel column ID - this is the UTM channel column with "Paid search", "Organic search", etc.
-    sales_channel_column = 'text_mkrfer1n'
+    sales_channel_column = UTM_CHANNEL_COLUMNS['Sales v2']
+    
+    # Get the channel and date columns from Sales board only
+    sales_items = get_sales_data(columns=[sales_channel_column], column_types=['date']).get('data', {}).get('boards', [{}])[0].get('items_page', {}).get('items', [])
     
     # Process Sales board data
     for item in sales_items:
@@ -266,386 +261,46 @@ def format_ads_data(data):
     if not items:
         return pd.DataFrame()
     
-    # Convert to DataFrame
-    records = []
-    for item in items:
-        record = {
-            "Item": item.get("name", ""),
-            "Attribution Date": "",
-            "Google Adspend": ""
-        }
-        
-        # Add specific columns we want to display
-        for col_val in item.get("column_values", []):
-            col_id = col_val.get("id", "")
-            text = col_val.get("text") or ""
-            value = col_val.get("value", "")
-            
-            # Map specific column IDs to our desired column names
-            if col_id == "name":  # Item name
-                record["Item"] = item.get("name", "")
-            elif col_id == "date_mkv81p3z":  # Attribution Date
-                record["Attribution Date"] = text if text else ""
-            elif col_id == "numeric_mkv863mb":  # Google Adspend (the actual column with data)
-                record["Google Adspend"] = text if text else ""
-        
-        records.append(record)
-    
-    df = pd.DataFrame(records)
-    
-    # Convert date columns and create month/year column
-    df['Attribution Date'] = pd.to_datetime(df['Attribution Date'], errors='coerce')
+    # Attribution Date (date_mkv81p3z) and Google Adspend (numeric_mkv863mb, the actual column with data), parsed per column
+    frame = items_to_frame(items, columns=["date_mkv81p3z", "numeric_mkv863mb"])
+    df = pd.DataFrame({
+        "Item": frame["name"],
+        "Attribution Date": frame["date_mkv81p3z__date"] if "date_mkv81p3z__date" in frame else pd.NaT,
+        "Google Adspend": frame["numeric_mkv863mb__number"] if "numeric_mkv863mb__number" in frame else float('nan')
+    })
     
     # Create Month/Year column for x-axis
     df['Month Year'] = df['Attribution Date'].dt.strftime('%B %Y')
     
-    # Convert Google Adspend to numeric
-    df['Google Adspend'] = pd.to_numeric(df['Google Adspend'], errors='coerce')
-    
     # Sort by attribution date
     df = df.sort_values('Attribution Date')
     
     return df
 
-def format_sales_data(data):
-    """Convert Monday.com sales data to pandas DataFrame with ROAS filtering"""
-    if not data or "data" not in data or "boards" not in data["data"]:
-        st.warning("No sales data found in API response")
-        return pd.DataFrame()
-    
-    
-    boards = data["data"]["boards"]
-    if not boards or not boards[0].get("items_page"):
-        st.warning("No items page found in sales board")
-        return pd.DataFrame()
-    
-    items_page = boards[0]["items_page"]
-    if not items_page or not items_page.get("items"):
+def format_sales_data(facts):
+    """Convert sales_facts rows to the sales DataFrame used for ROAS (see sales_facts.py for the revenue rules)"""
+    if facts is None or facts.empty:
         st.warning("No items found in sales board")
         return pd.DataFrame()
     
-    items = items_page["items"]
-    if not items:
-        st.warning("Empty items list in sales board")
-        return pd.DataFrame()
-    
-    # Convert to DataFrame
-    records = []
-    item_id_to_record = {}  # Map item_id to record index for linking
-    linked_items_map = {}  # Map item_id to list of linked item IDs
-    item_id_to_name = {}  # Map item_id to item name for display
-    
-    for item in items:
-        try:
-            item_id = item.get("id", "")
-            record = {
-                "Item ID": item_id,  # Store item ID for linking
-                "Item Name": item.get("name", ""),
-                "Status": "",
-                "Channel": "",
-                "Value": "",
-                "Date Created": "",
-                "Date Closed": "",
-                "Assigned Person": "",
-                "Linked Items": ""
-            }
-            item_id_to_name[item_id] = record["Item Name"]
-            
-            # Extract column values - FIRST PASS: collect all relevant values
-            formula_value = ""  # Amount Paid or Contract Value from formula column
-            contract_amt_value = ""  # Contract Amount
-            numbers3_value = ""  # Numbers3 (Amount Paid)
-            mirror_value = ""   # Mirror Ap or Cv (lookup)
-            
-            for col_val in item.get("column_values", []):
-                try:
-                    col_id = col_val.get("id", "")
-                    text = (col_val.get("text") or "").strip()
-                    value = col_val.get("value", "")
-                    
-                    # FIRST PRIORITY: Check formula columns for "Amount Paid or Contract Value"
-                    if not formula_value:  # Only check if we haven't found a formula value yet
-                        if col_id in ["formula_mktj2qh2", "formula_mktk2rgx", "formula_mktks5te", 
-                                     "formula_mktknqy9", "formula_mktkwnyh", "formula_mktq5ahq",
-                                     "formula_mktt5nty", "formula_mkv0r139"]:
-                            # Formula columns can store value in text or value field
-                            if text:
-                                formula_value = text
-                            elif value:
-                                # Try to extract from value field (might be JSON or string)
-                                try:
-                                    if isinstance(value, dict):
-                                        # If value is a dict, try common keys
-                                        formula_value = str(value.get("number", value.get("text", value)))
-                                    elif isinstance(value, str):
-                                        # Try to parse as JSON
-                                        try:
-                                            value_parsed = json.loads(value)
-                                            if isinstance(value_parsed, dict):
-                                                formula_value = str(value_parsed.get("number", value_parsed.get("text", value)))
-                                            else:
-                                                formula_value = str(value_parsed)
-                                        except:
-                                            formula_value = str(value)
-                                    else:
-                                        formula_value = str(value)
-                                except:
-                                    pass
-                    
-                    # Collect contract_amt and numbers3 for fallback
-                    if col_id == "contract_amt" and text:
-                        contract_amt_value = text
-                    elif col_id == "numbers3" and text:
-                        numbers3_value = text
-                    elif col_id == "lookup_mkx8jk3h":
-                        # Mirror Ap or Cv: try text, then parse value/additional_info
-                        if text:
-                            mirror_value = text
-                        else:
-                            extra = col_val.get("additional_info")
-                            raw_val = col_val.get("value")
-                            # Try to parse additional_info first (often contains mirrored value)
-                            parsed = None
-                            for candidate in [extra, raw_val]:
-                                if not candidate:
-                                    continue
-                                try:
-                                    if isinstance(candidate, str):
-                                        parsed = json.loads(candidate)
-                                    else:
-                                        parsed = candidate
-                                except Exception:
-                                    parsed = None
-                                if isinstance(parsed, dict):
-                                    # Common keys that may carry display text or number
-                                    for key in ["display_value", "text", "value", "number"]:
-                                        if key in parsed and parsed[key]:
-                                            mirror_value = str(parsed[key])
-                                            break
-                                if mirror_value:
-                                    break
-                    
-                    # Extract linked items from Connect boards columns (board_relation type)
-                    elif col_val.get("type") == "board_relation":
-                        linked_item_ids = col_val.get("linked_item_ids", [])
-                        if linked_item_ids:
-                            # Store linked items for this item
-                            if item_id not in linked_items_map:
-                                linked_items_map[item_id] = []
-                            linked_items_map[item_id].extend(linked_item_ids)
-                        
-                except Exception as e:
-                    continue
-            
-            # Store raw values in record for post-processing
-            record["_contract_amt"] = contract_amt_value
-            record["_numbers3"] = numbers3_value
-            record["_mirror"] = mirror_value
-            record["_formula"] = formula_value
-            
-            # SECOND PASS: Set initial Value field - prioritize formula, then sum available fields
-            if formula_value:
-                record["Value"] = formula_value
-            elif contract_amt_value and numbers3_value and mirror_value:
-                try:
-                    contract_amt_num = float(str(contract_amt_value).replace('$', '').replace(',', '').strip())
-                    numbers3_num = float(str(numbers3_value).replace('$', '').replace(',', '').strip())
-                    mirror_num = float(str(mirror_value).replace('$', '').replace(',', '').strip())
-                    record["Value"] = str(contract_amt_num + numbers3_num + mirror_num)
-                except:
-                    record["Value"] = contract_amt_value or numbers3_value or mirror_value or ""
-            elif (contract_amt_value and numbers3_value) or (contract_amt_value and mirror_value) or (numbers3_value and mirror_value):
-                # Sum available values as fallback
-                try:
-                    nums = []
-                    for v in [contract_amt_value, numbers3_value, mirror_value]:
-                        if v:
-                            nums.append(float(str(v).replace('$', '').replace(',', '').strip()))
-                    record["Value"] = str(sum(nums))
-                except:
-                    record["Value"] = contract_amt_value or numbers3_value or mirror_value or ""
-            elif contract_amt_value:
-                record["Value"] = contract_amt_value
-            elif numbers3_value:
-                record["Value"] = numbers3_value
-            
-            # Extract other column values (Status, Channel, Dates, etc.)
-            for col_val in item.get("column_values", []):
-                try:
-                    col_id = col_val.get("id", "")
-                    text = (col_val.get("text") or "").strip()
-                    value = col_val.get("value", "")
-                    
-                    # Map specific column IDs based on the actual Monday.com structure
-                    # Status field - using the color column that shows "Sales Qualified"
-                    if col_id == "color_mknxd1j2":
-                        record["Status"] = text
-                    # Channel/Source field - using the correct column for paid search data
-                    elif col_id == "text_mkrfer1n":  # This contains "Paid search" data
-                        record["Channel"] = text
-                    elif col_id == "source":  # Fallback to source column
-                        record["Channel"] = text
-                    # Date Created field - using date7 column (Jan 14 for Ashley Miles)
-                    elif col_id == "date7":
-                        record["Date Created"] = text
-                    # Date Closed field - using date_mktq7npm column (Aug 20 for Ashley Miles)
-                    elif col_id == "date_mktq7npm":
-                        record["Date Closed"] = text
-                    # Assigned Person field
-                    elif col_id == "color_mkvewcwe":
-                        record["Assigned Person"] = text
-                    # Fallback mappings for other possible columns
-                    elif col_id == "status_14__1":  # This shows "OTHER" in your data
-                        if record["Channel"] == "":  # Only use if source is empty
-                            record["Channel"] = text
-                    elif any(word in col_id.lower() for word in ["status", "stage", "state", "phase"]) and record["Status"] == "":
-                        record["Status"] = text
-                    elif any(word in col_id.lower() for word in ["channel", "source", "utm", "traffic", "medium"]) and record["Channel"] == "":
-                        record["Channel"] = text
-                    elif any(word in col_id.lower() for word in ["value", "revenue", "amount", "price", "deal", "contract"]) and record["Value"] == "":
-                        record["Value"] = text
-                except Exception as e:
-                    # Skip problematic column values
-                    continue
-            
-            records.append(record)
-            item_id_to_record[item_id] = len(records) - 1  # Store index for this item_id
-        except Exception as e:
-            # Skip problematic items
-            continue
-    
-    df = pd.DataFrame(records)
-    
-    # Post-processing: Calculate correct Value using formula: contract_amt + numbers3 + mirror (mirror = sum of copies)
-    if not df.empty:
-        # Helper function to normalize name (remove "(copy)" suffixes)
-        def normalize_name(name):
-            if not isinstance(name, str):
-                return ""
-            base = name
-            while base.endswith(" (copy)"):
-                base = base[:-len(" (copy)")]
-            return base.strip()
-        
-        # Normalize names and identify copies
-        df["_BaseName"] = df["Item Name"].apply(normalize_name)
-        df["_IsCopy"] = df["Item Name"].astype(str).str.contains("(copy)", na=False)
-        
-        # Convert raw values to numeric
-        def to_num(val):
-            if not val or val == "":
-                return 0.0
-            try:
-                return float(str(val).replace('$', '').replace(',', '').strip())
-            except:
-                return 0.0
-        
-        df["_contract_num"] = df["_contract_amt"].apply(to_num)
-        df["_numbers3_num"] = df["_numbers3"].apply(to_num)
-        df["_mirror_num"] = df["_mirror"].apply(to_num)
-        
-        # For copy items: Value = contract_amt + numbers3 (mirror not needed for copies)
-        copy_mask = df["_IsCopy"]
-        df.loc[copy_mask, "Value"] = (df.loc[copy_mask, "_contract_num"] + df.loc[copy_mask, "_numbers3_num"]).apply(lambda x: str(x) if x > 0 else "")
-        
-        # For base items: calculate mirror as sum of all copies' (contract_amt + numbers3) for same base name
-        base_mask = ~df["_IsCopy"]
-        if base_mask.any():
-            # Calculate sum of copies per base name
-            copy_totals = df[copy_mask].groupby("_BaseName").apply(
-                lambda g: (g["_contract_num"] + g["_numbers3_num"]).sum()
-            ).to_dict()
-            
-            # For each base item, if mirror is missing, use sum of copies as mirror
-            for idx in df[base_mask].index:
-                base_name = df.loc[idx, "_BaseName"]
-                mirror_val = df.loc[idx, "_mirror_num"]
-                
-                # If no mirror value, calculate from copies
-                if mirror_val == 0 and base_name in copy_totals:
-                    mirror_val = copy_totals[base_name]
-                
-                # Calculate final value: contract_amt + numbers3 + mirror
-                contract = df.loc[idx, "_contract_num"]
-                numbers3 = df.loc[idx, "_numbers3_num"]
-                total = contract + numbers3 + mirror_val
-                
-                # For base items: always recalculate if formula is missing (mirror needs to be included)
-                # If formula exists and was used, keep it; otherwise calculate from parts
-                current_formula = df.loc[idx, "_formula"]
-                if not current_formula or current_formula == "":
-                    # No formula available, calculate from contract_amt + numbers3 + mirror
-                    if total > 0:
-                        df.loc[idx, "Value"] = str(total)
-                    elif contract + numbers3 > 0:
-                        # At least use contract + numbers3 if available
-                        df.loc[idx, "Value"] = str(contract + numbers3)
-        
-        # Cleanup helper columns
-        df.drop(columns=[c for c in df.columns if c.startswith("_")], inplace=True)
-
-    # Convert date columns
-    df['Date Created'] = pd.to_datetime(df['Date Created'], errors='coerce')
-    df['Date Closed'] = pd.to_datetime(df['Date Closed'], errors='coerce')
-    
-    # Convert Value to numeric (remove $ and commas)
-    df['Value'] = df['Value'].astype(str).str.replace('$', '').str.replace(',', '').str.replace(' ', '')
-    df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-    
-    # Add linked items' revenue to items with Connect boards columns
-    # Track which items are linked items so we can exclude them from display
-    linked_item_ids_set = set()
-    if not df.empty and linked_items_map:
-        # Create mapping of item_id -> Value for quick lookup
-        item_id_to_value = dict(zip(df['Item ID'], df['Value']))
-        df['Linked Items'] = df['Linked Items'].fillna('')
-        
-        # Collect all linked item IDs to exclude them from display
-        for linked_item_ids in linked_items_map.values():
-            linked_item_ids_set.update(linked_item_ids)
-        
-        # For each item with linked items, add their revenues
-        for item_id, linked_item_ids in linked_items_map.items():
-            if item_id in item_id_to_record:
-                record_idx = item_id_to_record[item_id]
-                if record_idx < len(df):
-                    base_value = df.loc[df['Item ID'] == item_id, 'Value'].values[0]
-                    if pd.isna(base_value):
-                        base_value = 0.0
-                    
-                    # Sum revenue from linked items and capture their names
-                    linked_revenue = 0.0
-                    linked_names = []
-                    seen_linked_names = set()
-                    for linked_id in linked_item_ids:
-                        if linked_id in item_id_to_value:
-                            linked_val = item_id_to_value[linked_id]
-                            if not pd.isna(linked_val):
-                                linked_revenue += linked_val
-                        linked_name = item_id_to_name.get(linked_id, "")
-                        if linked_name and linked_name not in seen_linked_names:
-                            linked_names.append(linked_name)
-                            seen_linked_names.add(linked_name)
-                    
-                    # Update Value with sum of base + linked items
-                    if linked_revenue > 0:
-                        total_value = base_value + linked_revenue
-                        df.loc[df['Item ID'] == item_id, 'Value'] = total_value
-
-                    if linked_names:
-                        df.loc[df['Item ID'] == item_id, 'Linked Items'] = ", ".join(linked_names)
+    df = pd.DataFrame({
+        "Item Name": facts["item_name"],
+        "Status": facts["status"].fillna(""),
+        "Channel": facts["channel"].fillna(""),
+        "Value": pd.to_numeric(facts["value"], errors='coerce'),
+        "Date Created": pd.to_datetime(facts["date_created"], errors='coerce'),
+        "Date Closed": pd.to_datetime(facts["date_closed"], errors='coerce'),
+        "Assigned Person": facts["assigned_person"].fillna(""),
+        "Linked Items": facts["linked_items"].fillna("")
+    })
     
     # Create Month/Year column based on Date Created
     df['Month Year'] = df['Date Created'].dt.strftime('%B %Y')
     df['Year'] = df['Date Created'].dt.year
     
-    # Mark linked items so we can exclude them from display to prevent double-counting
-    df['_is_linked_item'] = df['Item ID'].isin(linked_item_ids_set)
-    
-    # Remove Item ID column (only used for internal calculations)
-    # Keep _is_linked_item flag for filtering out linked items later
-    if 'Item ID' in df.columns:
-        df.drop(columns=['Item ID'], inplace=True)
+    # Linked items' revenue is already included in the items that link them;
+    # the flag lets ROAS views exclude them to prevent double-counting
+    df['_is_linked_item'] = facts['is_linked_item'].fillna(0).astype(bool)
     
     return df
 
@@ -1007,7 +662,7 @@ def main():
     
     # Get all leads data for UTM analysis
     with st.spinner("Loading UTM data..."):
-        all_leads = get_all_leads_for_utm()
+        all_leads = get_all_leads_for_utm(get_database_generation())
     
     if all_leads:
         # Convert to DataFrame
@@ -1084,7 +739,7 @@ def main():
     
     # Get sales board leads data for UTM analysis
     with st.spinner("Loading Sales Board UTM data..."):
-        sales_leads = get_sales_leads_for_utm()
+        sales_leads = get_sales_leads_for_utm(get_database_generation())
     
     if sales_leads:
         # Convert to DataFrame
@@ -1159,16 +814,24 @@ def main():
     st.markdown("---")
     st.subheader("🎯 Qualified vs. Unqualified Breakdown by Form Field")
     
-    @st.cache_data(ttl=300)
-    def get_lead_qualification_data():
+    @st.cache_data  # Keyed on get_database_generation() (monday_data.db): recomputed once per Monday.com refresh
+    def get_lead_qualification_data(generation):
         """Extract and process leads for qualification analysis from ALL boards"""
         import json
         
-        # Get data from all 4 boards
-        new_leads_items = get_new_leads_data()
-        discovery_call_items = get_discovery_call_data()
-        design_review_items = get_design_review_data()
-        sales_items = get_sales_data().get('data', {}).get('boards', [{}])[0].get('items_page', {}).get('items', [])
+        # Extract date created for filtering
+        date_created_cols = ["date7", "date_created", "created_date"]  # Common date column IDs
+        
+        # Get only the status, date and form field columns from all 4 boards
+        qualification_columns = sorted(
+            DISQUALIFIED_STATUS_COLUMNS
+            | set(date_created_cols)
+            | {col_id for col_ids in FORM_FIELD_COLUMNS.values() for col_id in col_ids}
+        )
+        new_leads_items = get_new_leads_data(columns=qualification_columns, column_types=['date'])
+        discovery_call_items = get_discovery_call_data(columns=qualification_columns, column_types=['date'])
+        design_review_items = get_design_review_data(columns=qualification_columns, column_types=['date'])
+        sales_items = get_sales_data(columns=qualification_columns, column_types=['date']).get('data', {}).get('boards', [{}])[0].get('items_page', {}).get('items', [])
         
         print(f"Got {len(new_leads_items)} items from New Leads")
         print(f"Got {len(discovery_call_items)} items from Discovery Call")
@@ -1201,16 +864,9 @@ def main():
             
             # Define the "Disqualified" status column for each board type
             # These columns contain the actual Lead Status
-            disqualified_status_cols = {
-                "status7",  # New Leads
-                "color_mknx1h9r",  # Discovery Call
-                "color_mknx4zp1",  # Design Review
-                "color_mknxd1j2"   # Sales
-            }
+            disqualified_status_cols = DISQUALIFIED_STATUS_COLUMNS
             
-            # Extract date created for filtering
             date_created = None
-            date_created_cols = ["date7", "date_created", "created_date"]  # Common date column IDs
             
             # Extract ALL column data from the item
             for col_val in column_values:
@@ -1250,7 +906,7 @@ def main():
     
     # Get qualification data
     with st.spinner("Loading lead qualification data..."):
-        qualification_data = get_lead_qualification_data()
+        qualification_data = get_lead_qualification_data(get_database_generation())
     
     if qualification_data:
         df = pd.DataFrame(qualification_data)
@@ -1271,15 +927,7 @@ def main():
         # st.write(f"Available column IDs ({len(col_ids)}): {col_ids[:10]}...")
         
         # Use explicit column ID mappings based on actual database
-        # Each field can have different column IDs on different boards
-        field_column_mapping = {
-            'CLIENT TYPE?': ['status_1__1', 'status_14__1'],  # status_1__1 for New Leads, status_14__1 for other boards
-            'WHAT IS YOUR TIMELINE FOR STARTING?': ['text_mkwf56ca', 'text3__1'],  # text_mkwf56ca for New Leads, text3__1 for other boards
-            'WHAT IS YOUR STATUS?': ['text_mkwf2541', 'text_mkwf8r57', 'text37__1'],  # text_mkwf2541 for New Leads, text_mkwf8r57 for Discovery Call, text37__1 for Design Review
-            'HOW MANY STYLES DO YOU WANT TO DEVELOP?': ['text_mkwfxk8t', 'text_mkwfs99f', 'text30__1', 'text30__1'],  # text_mkwfxk8t for New Leads, text_mkwfs99f for Discovery, text30__1 for Design Review, text30__1 for Sales
-            'WHAT KINDS OF CLOTHING DO YOU WANT TO MAKE?': ['text_mkwfva26', 'text_mkwf8n18', 'text8__1'],  # text_mkwfva26 for New Leads, text_mkwf8n18 for Discovery Call, text8__1 for Design Review and Sales
-            'BUDGET FOR DEVELOPMENT (PATTERNS AND SAMPLES)': ['text_mkwfkqex', 'text_mkwf9e6c', 'text7__1']  # text_mkwfkqex for New Leads, text_mkwf9e6c for Discovery Call, text7__1 for Design Review and Sales
-        }
+        field_column_mapping = FORM_FIELD_COLUMNS
         
         # All fields now use lists of possible column IDs
         identified_fields = {}
@@ -0,0 +1,103 @@
+"""
+Monday.com columns the dashboards read, per board.
+
+The refresh requests only these columns (column_values(ids: [...])) unless it runs
+with columns="all" for an audit. Add a column here before reading it in a dashboard.
+"""
+from sales_facts import SALES_FACT_COLUMNS, SALES_FACT_COLUMN_PATTERNS
+from lead_identity import CONTACT_COLUMN_TYPES
+
+# Ads board columns read by format_ads_data
+ADS_DATA_COLUMNS = ["date_mkv81p3z", "numeric_mkv863mb"]
+
+# Board-specific UTM channel column IDs
+UTM_CHANNEL_COLUMNS = {
+    'Sales v2': 'text_mkrfer1n',
+    'Design Review v2': 'text_mkrkkpx0',
+    'Discovery Call v2': 'text_mkrk2tj8',
+    'New Leads v2': 'text_mkref4p0'
+}
+
+# Lead Status columns holding "Disqualified" on each board
+DISQUALIFIED_STATUS_COLUMNS = {
+    "status7",  # New Leads
+    "color_mknx1h9r",  # Discovery Call
+    "color_mknx4zp1",  # Design Review
+    "color_mknxd1j2"   # Sales
+}
+
+# Form fields for the Qualified vs. Unqualified breakdown
+# Each field can have different column IDs on different boards
+FORM_FIELD_COLUMNS = {
+    'CLIENT TYPE?': ['status_1__1', 'status_14__1'],  # status_1__1 for New Leads, status_14__1 for other boards
+    'WHAT IS YOUR TIMELINE FOR STARTING?': ['text_mkwf56ca', 'text3__1'],  # text_mkwf56ca for New Leads, text3__1 for other boards
+    'WHAT IS YOUR STATUS?': ['text_mkwf2541', 'text_mkwf8r57', 'text37__1'],  # text_mkwf2541 for New Leads, text_mkwf8r57 for Discovery Call, text37__1 for Design Review
+    'HOW MANY STYLES DO YOU WANT TO DEVELOP?': ['text_mkwfxk8t', 'text_mkwfs99f', 'text30__1', 'text30__1'],  # text_mkwfxk8t for New Leads, text_mkwfs99f for Discovery, text30__1 for Design Review, text30__1 for Sales
+    'WHAT KINDS OF CLOTHING DO YOU WANT TO MAKE?': ['text_mkwfva26', 'text_mkwf8n18', 'text8__1'],  # text_mkwfva26 for New Leads, text_mkwf8n18 for Discovery Call, text8__1 for Design Review and Sales
+    'BUDGET FOR DEVELOPMENT (PATTERNS AND SAMPLES)': ['text_mkwfkqex', 'text_mkwf9e6c', 'text7__1']  # text_mkwfkqex for New Leads, text_mkwf9e6c for Discovery Call, text7__1 for Design Review and Sales
+}
+
+# Lead boards: UTM channel, disqualification status and form fields (Ads dashboard),
+# every date column (stage dates, New Leads cache), Connect boards relations and the
+# email columns lead_identity matches leads on
+_LEAD_BOARD_COLUMNS = (
+    list(UTM_CHANNEL_COLUMNS.values())
+    + sorted(DISQUALIFIED_STATUS_COLUMNS)
+    + [col_id for col_ids in FORM_FIELD_COLUMNS.values() for col_id in col_ids]
+)
+_LEAD_BOARD_TYPES = ["date", "board_relation"] + CONTACT_COLUMN_TYPES
+
+# table_name -> {'ids': column ids, 'types': column types, 'patterns': id substrings}
+# A board column is fetched if it matches any of the three.
+BOARD_COLUMN_MANIFEST = {
+    'sales_board': {
+        'ids': _LEAD_BOARD_COLUMNS + SALES_FACT_COLUMNS + [
+            "color_mknxg5zf",  # Discovery call qualification (get_discovery_call_dates)
+        ],
+        'types': _LEAD_BOARD_TYPES,
+        'patterns': SALES_FACT_COLUMN_PATTERNS,
+    },
+    'new_leads_board': {
+        'ids': _LEAD_BOARD_COLUMNS,
+        'types': _LEAD_BOARD_TYPES,
+        'patterns': [],
+    },
+    'discovery_call_board': {
+        'ids': _LEAD_BOARD_COLUMNS + [
+            "color_mknxk7eq", "contract_status",  # Qualification (get_discovery_call_dates)
+        ],
+        'types': _LEAD_BOARD_TYPES,
+        'patterns': [],
+    },
+    'design_review_board': {
+        'ids': _LEAD_BOARD_COLUMNS + [
+            "color_mknxrx3c",  # Qualification (get_discovery_call_dates)
+        ],
+        'types': _LEAD_BOARD_TYPES,
+        'patterns': [],
+    },
+    'ads_board': {
+        'ids': ADS_DATA_COLUMNS,
+        'types': [],
+        'patterns': [],
+    },
+}
+
+
+def resolve_board_columns(table_name, board_columns):
+    """Column ids of a board (list of {'id', 'type'}) selected by its manifest entry, in board order.
+
+    Returns None for boards without a manifest entry (fetch every column).
+    """
+    manifest = BOARD_COLUMN_MANIFEST.get(table_name)
+    if manifest is None:
+        return None
+    ids = set(manifest['ids'])
+    types = set(manifest['types'])
+    patterns = [p.lower() for p in manifest['patterns']]
+    return [
+        column['id'] for column in board_columns
+        if column.get('id') in ids
+        or column.get('type') in types
+        or any(p in (column.get('id') or '').lower() for p in patterns)
+    ]
@@ -0,0 +1,72 @@
+"""
+Process-wide board datasets shared by every dashboard page.
+
+The getters mirror database_utils (get_sales_data, get_new_leads_data, ...) but each
+(board, column selection) is read and parsed once per data generation of
+monday_data.db (database_utils.get_database_generation) for the whole Streamlit
+process, and every page and session gets the same objects back - no per-page read
+and no copy per hit, unlike st.cache_data. The datasets are shared, so callers must
+treat them as read-only.
+
+get_dataset(name, build) shares any other value derived from the boards the same way;
+each dataset is keyed on the generation of the database it reads, so a Calendly-only
+refresh keeps every board dataset.
+"""
+import threading
+
+import database_utils
+
+_lock = threading.Lock()
+_datasets = {}  # key -> (generation, value)
+_build_locks = {}
+
+
+def get_dataset(key, build, db_path=None):
+    """build() for the current data generation of db_path (monday_data.db by default),
+    built once per process (key must be hashable).
+
+    Concurrent callers for the same key wait for one build instead of repeating it.
+    """
+    generation = database_utils.get_database_generation(db_path or database_utils.DB_PATH)
+    with _lock:
+        cached = _datasets.get(key)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        with _lock:
+            cached = _datasets.get(key)
+            if cached is not None and cached[0] == generation:
+                return cached[1]
+        value = build()
+        with _lock:
+            # A caller that read an older generation never replaces a newer dataset
+            cached = _datasets.get(key)
+            if cached is None or cached[0] <= generation:
+                _datasets[key] = (generation, value)
+        return value
+
+
+def _shared_getter(name, getter):
+    def shared(columns=None, column_types=None, column_patterns=None):
+        selection = tuple(None if s is None else tuple(s) for s in (columns, column_types, column_patterns))
+        return get_dataset(
+            (name, selection),
+            lambda: getter(columns=columns, column_types=column_types, column_patterns=column_patterns),
+        )
+    shared.__name__ = getter.__name__
+    shared.__doc__ = f"Shared, read-only {getter.__name__} (see database_utils.{getter.__name__})"
+    return shared
+
+
+get_sales_data = _shared_getter('sales_board', database_utils.get_sales_data)
+get_ads_data = _shared_getter('ads_board', database_utils.get_ads_data)
+get_new_leads_data = _shared_getter('new_leads_board', database_utils.get_new_leads_data)
+get_discovery_call_data = _shared_getter('discovery_call_board', database_utils.get_discovery_call_data)
+get_design_review_data = _shared_getter('design_review_board', database_utils.get_design_review_data)
+
+
+def get_sales_facts():
+    """Shared, read-only sales_facts DataFrame (see database_utils.get_sales_facts)"""
+    return get_dataset('sales_facts', database_utils.get_sales_facts)
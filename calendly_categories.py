@@ -0,0 +1,86 @@
+"""
+Calendly event categories, stored with each event in calendly_events.event_category.
+
+classify_event gives every event the dashboard slices it belongs to. An event can match
+several categories (e.g. a "TEG Let's Chat - Introductory Call" is both a Let's Chat and
+a TEG Introductory Call); event_category then holds all of them comma-separated in
+EVENT_CATEGORIES order, so each slice is still one indexed IN query over the stored
+values that include it (event_category_values).
+"""
+from datetime import datetime
+from itertools import combinations
+from zoneinfo import ZoneInfo
+
+# Dashboards report in California time
+LOCAL_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# Source labels that name an event type rather than a person; stored as ''
+GENERIC_SOURCE_LABELS = {
+    "Intro Call with TEG", "*Intro call with TEG*", "TEG - Let's Chat", "TEG Introductory Call",
+    "*TEG Introductory Call*", "Design Review", "30 Minute Meeting", "Other",
+}
+
+# In stored order: 'lets_chat' (TEG - Let's Chat), 'intro_call' (*Intro call with TEG*),
+# 'teg_introductory' (*TEG Introductory Call*), 'jennifer_30min' (30 minute meetings attributed to Jennifer)
+EVENT_CATEGORIES = ('lets_chat', 'intro_call', 'teg_introductory', 'jennifer_30min')
+OTHER_CATEGORY = 'other'
+
+# Bump when classify_event changes, so init_calendly_database reclassifies stored events
+EVENT_CATEGORY_RULES_VERSION = '2'
+
+
+def event_categories(name, source):
+    """The EVENT_CATEGORIES an event with this name and (raw) source belongs to, in order"""
+    name_lower = str(name).lower()
+    matches = []
+    if 'teg' in name_lower and ("let's chat" in name_lower or 'lets chat' in name_lower):
+        matches.append('lets_chat')
+    if ('intro call' in name_lower and 'teg' in name_lower and 'introductory' not in name_lower
+            and name_lower != 'teg intro call'):
+        matches.append('intro_call')
+    if 'teg' in name_lower and 'introductory' in name_lower and 'call' in name_lower:
+        matches.append('teg_introductory')
+    if str(source).lower() == 'jennifer' and (
+        '30 min google meet' in name_lower
+        or ('30 minute' in name_lower and 'meeting' in name_lower and 'google meet' not in name_lower)
+    ):
+        matches.append('jennifer_30min')
+    return matches
+
+
+def event_category_values(categories):
+    """Every stored event_category value that includes one of categories"""
+    wanted = set(categories)
+    values = [
+        ','.join(combo)
+        for size in range(1, len(EVENT_CATEGORIES) + 1)
+        for combo in combinations(EVENT_CATEGORIES, size)
+        if wanted.intersection(combo)
+    ]
+    if OTHER_CATEGORY in wanted:
+        values.append(OTHER_CATEGORY)
+    return values
+
+
+def classify_event(name, source, start_time):
+    """(event_category, source, local_date, local_hour) stored with an event.
+
+    event_category is its event_categories joined with ',' ('other' if none).
+    source drops GENERIC_SOURCE_LABELS and defaults to 'Burki' for Let's Chat.
+    local_date (YYYY-MM-DD) and local_hour are the start time in LOCAL_TIMEZONE.
+    """
+    matches = event_categories(name, source)
+    category = ','.join(matches) or OTHER_CATEGORY
+
+    source = (source or '').strip()
+    if source in GENERIC_SOURCE_LABELS:
+        source = ''
+    if not source and 'lets_chat' in matches:
+        source = 'Burki'
+
+    try:
+        local = datetime.fromisoformat(start_time.replace('Z', '+00:00')).astimezone(LOCAL_TIMEZONE)
+        local_date, local_hour = local.strftime('%Y-%m-%d'), local.hour
+    except (AttributeError, ValueError):
+        local_date, local_hour = None, None
+    return category, source, local_date, local_hour
@@ -0,0 +1,816 @@
+"""
+Calendly event storage shared by refresh_database.py and the Database Refresh page.
+
+Events are synced by start-time window. The refresh plans its windows with
+plan_sync_windows: the recent past and the future are re-fetched every run, while
+older months are treated as frozen and only reconciled every
+FROZEN_RECONCILE_INTERVAL. save_calendly_events upserts the fetched events and
+records a sync timestamp per month in calendly_sync_windows.
+
+Each event is classified when it is written (event_category, a normalized
+source and its California local_date/local_hour, see
+calendly_categories.classify_event), so the dashboards read their slice with
+one indexed query.
+
+Event types and users looked up for attribution are kept in calendly_event_types
+and calendly_users (see ResourceCache), so most runs resolve them locally.
+
+Scheduled events are fetched as independent streams (one query paged to the end,
+e.g. per window, or per API key x event type x window) by fetch_event_streams,
+which runs them over a bounded pool sharing one RateLimiter. A RequestPlanner
+per refresh sends each identical GET once, so e.g. users/me is not repeated per
+key and the organization-scope probe is reused as that window's first page.
+"""
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import http_client
+from calendly_categories import EVENT_CATEGORY_RULES_VERSION, GENERIC_SOURCE_LABELS, classify_event
+from database_utils import bump_data_generation, configure_ingest_connection, enable_wal
+
+# Seconds to wait for another writer before "database is locked"
+DB_LOCK_TIMEOUT = 60
+
+# Events are synced from January of last year to December of next year
+YEARS_BACK = 1
+YEARS_AHEAD = 1
+
+# Months that overlap this much recent past (and every future month) are re-fetched every run
+RECENT_PAST = timedelta(days=31)
+
+# Older (frozen) months are re-fetched at least this often to pick up late edits and cancellations
+FROZEN_RECONCILE_INTERVAL = timedelta(days=7)
+
+CALENDLY_API_URL = "https://api.calendly.com"
+
+# Cached event types and users are used without a request for this long, then revalidated
+RESOURCE_CACHE_TTL = timedelta(days=7)
+RESOURCE_FETCH_WORKERS = 8
+
+# Scheduled events streams fetched at once, and the request rate they share
+# (Calendly rate limits per token; this stays well under it with several keys)
+EVENT_STREAM_WORKERS = 6
+CALENDLY_REQUESTS_PER_SECOND = 8
+SCHEDULED_EVENTS_PAGE_SIZE = 100
+SCHEDULED_EVENTS_MAX_PAGES = 100
+
+CALENDLY_EVENT_FIELDS = [
+    "uri", "name", "start_time", "end_time", "status", "event_type", "invitee_name", "invitee_email",
+    "source", "event_category", "local_date", "local_hour", "updated_at",
+]
+
+
+def init_calendly_database(db_path):
+    """Create calendly_events (WAL mode) if it doesn't exist"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    # WAL lets dashboards keep reading while a refresh rewrites calendly_events
+    enable_wal(conn)
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS calendly_events (
+            uri TEXT PRIMARY KEY,
+            name TEXT,
+            start_time TEXT,
+            end_time TEXT,
+            status TEXT,
+            event_type TEXT,
+            invitee_name TEXT,
+            invitee_email TEXT,
+            source TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Ensure source column exists for DBs created before this column was added
+    try:
+        cursor.execute("ALTER TABLE calendly_events ADD COLUMN source TEXT")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    for column in ("event_category TEXT", "local_date TEXT", "local_hour INTEGER"):
+        try:
+            cursor.execute(f"ALTER TABLE calendly_events ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_calendly_events_start_time ON calendly_events (start_time)")
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_calendly_events_category
+        ON calendly_events (event_category, status, local_date)
+    ''')
+    # Classify rows written before event_category existed or under older rules
+    cursor.execute("CREATE TABLE IF NOT EXISTS db_metadata (key TEXT PRIMARY KEY, value TEXT)")
+    rules = cursor.execute("SELECT value FROM db_metadata WHERE key = 'event_category_rules'").fetchone()
+    if not rules or rules[0] != EVENT_CATEGORY_RULES_VERSION:
+        events = cursor.execute("SELECT uri, name, source, start_time FROM calendly_events").fetchall()
+        cursor.executemany(
+            "UPDATE calendly_events SET event_category = ?, source = ?, local_date = ?, local_hour = ? WHERE uri = ?",
+            [(*classify_event(name, source, start_time), uri) for uri, name, source, start_time in events]
+        )
+        cursor.execute(
+            "INSERT OR REPLACE INTO db_metadata (key, value) VALUES ('event_category_rules', ?)",
+            (EVENT_CATEGORY_RULES_VERSION,)
+        )
+        if events:
+            bump_data_generation(conn)
+    # Last sync per month partition (YYYY-MM) of event start times
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS calendly_sync_windows (
+            partition TEXT PRIMARY KEY,
+            min_start_time TEXT,
+            max_start_time TEXT,
+            synced_at TIMESTAMP,
+            events INTEGER
+        )
+    ''')
+    # Event types and users (GET /event_types/{uuid}, /users/{uuid}) for ResourceCache
+    for table in ("calendly_event_types", "calendly_users"):
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                uri TEXT PRIMARY KEY,
+                resource TEXT,
+                etag TEXT,
+                fetched_at TIMESTAMP
+            )
+        ''')
+    conn.commit()
+    conn.close()
+
+
+def _partition_bounds(key):
+    """(min_start_time, max_start_time) of a month partition key (YYYY-MM), in Calendly's format"""
+    year, month = int(key[:4]), int(key[5:])
+    end = datetime(year + (month == 12), month % 12 + 1, 1) - timedelta(microseconds=1)
+    return f"{key}-01T00:00:00.000000Z", end.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _month_partitions(now):
+    """Month partition keys (YYYY-MM) in the synced range"""
+    return [f"{year}-{month:02d}"
+            for year in range(now.year - YEARS_BACK, now.year + YEARS_AHEAD + 1)
+            for month in range(1, 13)]
+
+
+def plan_sync_windows(db_path, mode="auto", now=None):
+    """Start-time windows to fetch this run, as dicts with name, min_start_time, max_start_time
+    and partitions (month keys).
+
+    mode 'full' fetches every month; 'auto' fetches months overlapping the last
+    RECENT_PAST, future months, and frozen months never synced or last synced more
+    than FROZEN_RECONCILE_INTERVAL ago. Consecutive months are merged into one
+    window per year (Calendly caps results per query, so a window never spans years).
+    """
+    now = now or datetime.now()
+    recent_start = (now - RECENT_PAST).strftime("%Y-%m")
+
+    synced = {}
+    if mode != "full":
+        conn = sqlite3.connect(db_path, timeout=DB_LOCK_TIMEOUT)
+        try:
+            synced = dict(conn.execute("SELECT partition, synced_at FROM calendly_sync_windows"))
+        except sqlite3.OperationalError:
+            synced = {}
+        finally:
+            conn.close()
+
+    windows = []
+    previous_key = None
+    for key in _month_partitions(now):
+        last_sync = synced.get(key)
+        stale = (
+            mode == "full" or key >= recent_start or not last_sync
+            or now - datetime.fromisoformat(str(last_sync)) >= FROZEN_RECONCILE_INTERVAL
+        )
+        if not stale:
+            previous_key = None
+            continue
+        min_start_time, max_start_time = _partition_bounds(key)
+        if previous_key and previous_key[:4] == key[:4]:
+            windows[-1]['partitions'].append(key)
+            windows[-1]['max_start_time'] = max_start_time
+        else:
+            windows.append({'partitions': [key], 'min_start_time': min_start_time, 'max_start_time': max_start_time})
+        previous_key = key
+
+    for window in windows:
+        partitions = window['partitions']
+        window['name'] = partitions[0] if len(partitions) == 1 else f"{partitions[0]}..{partitions[-1]}"
+    return windows
+
+
+class ResourceCache:
+    """Calendly event types or users by URI, persisted in calendly_data.db.
+
+    Entries fetched within RESOURCE_CACHE_TTL are local lookups. Older entries are
+    revalidated with If-None-Match and the stored ETag (a 304 only renews them), and
+    prefetch() resolves misses concurrently. Failed fetches are not persisted, but
+    are not requested again in the same run. Call save() to persist what was fetched.
+    """
+
+    def __init__(self, db_path, table, api_path):
+        self.db_path = db_path
+        self.table = table
+        self.api_path = api_path
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._failed = set()
+        self._entries = {}
+        conn = sqlite3.connect(db_path, timeout=DB_LOCK_TIMEOUT)
+        try:
+            for uri, resource, etag, fetched_at in conn.execute(
+                f"SELECT uri, resource, etag, fetched_at FROM {table}"
+            ):
+                try:
+                    resource = json.loads(resource) if resource else {}
+                except ValueError:
+                    resource = {}
+                self._entries[uri] = (resource, etag, fetched_at)
+        except sqlite3.OperationalError:
+            pass  # Table not created yet (init_calendly_database)
+        finally:
+            conn.close()
+
+    def _is_fresh(self, uri, now):
+        entry = self._entries.get(uri)
+        if not entry or not entry[2]:
+            return False
+        try:
+            return now - datetime.fromisoformat(str(entry[2])) < RESOURCE_CACHE_TTL
+        except ValueError:
+            return False
+
+    def _failure(self, uri):
+        """Remember a failed fetch for this run; the cached resource (or {}) stands in for it"""
+        with self._lock:
+            self._failed.add(uri)
+        return (self._entries.get(uri) or ({},))[0]
+
+    def _fetch(self, uri, headers):
+        """GET the resource (conditionally when an ETag is cached) and store the result"""
+        entry = self._entries.get(uri)
+        request_headers = dict(headers)
+        if entry and entry[1]:
+            request_headers['If-None-Match'] = entry[1]
+        uuid = uri.rstrip('/').split('/')[-1]
+        try:
+            r = http_client.get(f"{CALENDLY_API_URL}/{self.api_path}/{uuid}", headers=request_headers, timeout=10)
+        except Exception:
+            return self._failure(uri)  # Not persisted - retried next run
+
+        now = datetime.now().isoformat()
+        if r.status_code == 304 and entry:
+            resource, etag = entry[0], entry[1]
+        elif r.status_code == 200:
+            resource, etag = r.json().get('resource', {}), r.headers.get('ETag')
+        elif r.status_code == 404:
+            resource, etag = {}, None
+        else:
+            return self._failure(uri)  # Not persisted - retried next run
+        with self._lock:
+            self._entries[uri] = (resource, etag, now)
+            self._dirty.add(uri)
+        return resource
+
+    def get(self, uri, headers):
+        """The resource for uri ({} if unknown), fetched only when missing or stale"""
+        if not uri:
+            return {}
+        if uri in self._failed:
+            return (self._entries.get(uri) or ({},))[0]
+        if not self._is_fresh(uri, datetime.now()):
+            return self._fetch(uri, headers)
+        return self._entries[uri][0]
+
+    def prefetch(self, uris, headers):
+        """Fetch every missing or stale uri concurrently"""
+        now = datetime.now()
+        stale = [uri for uri in dict.fromkeys(uris)
+                 if uri and uri not in self._failed and not self._is_fresh(uri, now)]
+        if not stale:
+            return
+        with ThreadPoolExecutor(max_workers=min(RESOURCE_FETCH_WORKERS, len(stale))) as executor:
+            list(executor.map(lambda uri: self._fetch(uri, headers), stale))
+
+    def save(self):
+        """Persist entries fetched or revalidated since loading"""
+        with self._lock:
+            rows = [(uri, json.dumps(self._entries[uri][0]), self._entries[uri][1], self._entries[uri][2])
+                    for uri in self._dirty]
+            self._dirty.clear()
+        if not rows:
+            return
+        conn = sqlite3.connect(self.db_path, timeout=DB_LOCK_TIMEOUT)
+        try:
+            conn.executemany(f"INSERT OR REPLACE INTO {self.table} (uri, resource, etag, fetched_at) VALUES (?, ?, ?, ?)", rows)
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def event_type_cache(db_path):
+    """ResourceCache of event types (GET /event_types/{uuid})"""
+    return ResourceCache(db_path, "calendly_event_types", "event_types")
+
+
+def user_cache(db_path):
+    """ResourceCache of users (GET /users/{uuid})"""
+    return ResourceCache(db_path, "calendly_users", "users")
+
+
+def get_event_type_uri(event):
+    """URI of a scheduled event's event type (string or nested object), or None"""
+    et_raw = event.get('event_type')
+    return et_raw if isinstance(et_raw, str) else (et_raw.get('uri') if isinstance(et_raw, dict) else None)
+
+
+def referenced_user_uris(events, event_types):
+    """User URIs attribution may look up: event membership users and event type owners"""
+    uris = []
+    for ev in events:
+        for m in ev.get('event_memberships') or []:
+            if isinstance(m, dict) and '/users/' in (m.get('user') or ''):
+                uris.append(m['user'])
+    for et in event_types:
+        profile = (et or {}).get('profile') or {}
+        owner_uri = profile.get('owner')
+        if owner_uri and (profile.get('type') == 'User' or '/users/' in owner_uri):
+            uris.append(owner_uri)
+    return uris
+
+
+class RateLimiter:
+    """Spaces wait() calls from any number of threads to at most rate per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class RequestPlanner:
+    """Calendly GETs for one refresh run, each identical request (URL, params and
+    headers) sent once. Responses are kept for the run unless they are 429 or 5xx.
+    sent and saved count the requests made and the repeats answered from memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._responses = {}
+        self.sent = 0
+        self.saved = 0
+
+    @staticmethod
+    def _key(url, headers, params):
+        return (
+            url,
+            tuple(sorted((headers or {}).items())),
+            tuple(sorted((k, str(v)) for k, v in (params or {}).items())),
+        )
+
+    def get(self, url, headers, params=None, timeout=60, limiter=None):
+        """http_client.get, or the response of an identical earlier request in this run"""
+        key = self._key(url, headers, params)
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self.saved += 1
+                return response
+        if limiter:
+            limiter.wait()
+        response = http_client.get(url, headers=headers, params=params, timeout=timeout)
+        with self._lock:
+            self.sent += 1
+            if response.status_code != 429 and response.status_code < 500:
+                self._responses.setdefault(key, response)
+        return response
+
+    def summary(self):
+        """e.g. '42 Calendly requests, 3 repeated requests saved'"""
+        return f"{self.sent} Calendly requests, {self.saved} repeated requests saved"
+
+
+def unwrap_events(collection):
+    """Scheduled events from a collection page (items may be wrapped as {uri, resource})"""
+    events = []
+    for item in collection:
+        if isinstance(item, dict) and "resource" in item:
+            events.append({**item["resource"], "uri": item.get("uri") or item["resource"].get("uri")})
+        else:
+            events.append(item if isinstance(item, dict) else {})
+    return events
+
+
+def scheduled_events_params(params):
+    """params for the first page of GET /scheduled_events (a probe sent with these is reused as that page)"""
+    return {**params, 'count': SCHEDULED_EVENTS_PAGE_SIZE}
+
+
+def fetch_scheduled_events(headers, params, planner=None, limiter=None, timeout=60):
+    """Every page of GET /scheduled_events for params, through planner (a RequestPlanner).
+
+    Returns (events, error): error is None when the last page was reached, else the
+    failing status code (or exception message), with the events fetched before it.
+    """
+    planner = planner or RequestPlanner()
+    params = scheduled_events_params(params)
+    events = []
+    for _ in range(SCHEDULED_EVENTS_MAX_PAGES):
+        r = planner.get(f"{CALENDLY_API_URL}/scheduled_events", headers, dict(params), timeout, limiter)
+        if r.status_code != 200:
+            return events, r.status_code
+        data = r.json()
+        page = unwrap_events(data.get('collection', []))
+        if not page:
+            break
+        events.extend(page)
+        next_token = (data.get('pagination') or {}).get('next_page_token')
+        if not next_token:
+            break
+        params['page_token'] = next_token
+    return events, None
+
+
+def fetch_event_streams(streams, planner=None, max_workers=EVENT_STREAM_WORKERS, timeout=60):
+    """Fetch scheduled_events streams, a list of (headers, params), concurrently.
+
+    Streams share planner and one RateLimiter at CALENDLY_REQUESTS_PER_SECOND. Yields
+    (index, events, error) as each stream finishes (see fetch_scheduled_events);
+    callers merge by index so the result does not depend on completion order.
+    """
+    if not streams:
+        return
+    planner = planner or RequestPlanner()
+    limiter = RateLimiter(CALENDLY_REQUESTS_PER_SECOND)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(streams))) as executor:
+        futures = {
+            executor.submit(fetch_scheduled_events, headers, params, planner, limiter, timeout): index
+            for index, (headers, params) in enumerate(streams)
+        }
+        for future in as_completed(futures):
+            try:
+                events, error = future.result()
+            except Exception as e:
+                events, error = [], str(e)
+            yield futures[future], events, error
+
+
+# Design Review hosts: (scheduling URL part, person); the first name also matches event type names and slugs
+DESIGN_REVIEW_PERSONS = [
+    ('anthony-the-evans-group', 'Anthony'),
+    ('heather-the-evans-group', 'Heather'),
+    ('ian-the-evans-group', 'Ian'),
+]
+
+
+def _is_lets_chat(name_lower):
+    return 'teg' in name_lower and ("let's chat" in name_lower or 'lets chat' in name_lower)
+
+
+def _is_jennifer_link(url, slug_lower, name_lower):
+    """Jennifer's 30 minute Google Meet link (jennifer-teg/30minutegooglemeet)"""
+    return 'jennifer-teg' in url or 'jennifer-teg' in slug_lower or ('jennifer' in name_lower and '30min' in url)
+
+
+def _person_named(*texts, burki=False):
+    """Anthony/Heather/Ian/Jennifer (and Jamie Burki when burki) named in any of the lowercase texts, else ''"""
+    if any('jennifer' in t for t in texts):
+        return 'Jennifer'
+    if any('anthony' in t for t in texts):
+        return 'Anthony'
+    if any('heather' in t for t in texts):
+        return 'Heather'
+    if any('ian' in t for t in texts) and not any('christian' in t for t in texts):
+        return 'Ian'
+    if burki and any('jamie' in t or 'burki' in t for t in texts):
+        return 'Burki'
+    return ''
+
+
+class EventAttribution:
+    """Attributes TEG events to the person who took the call (the event's source).
+
+    Owner and member users are read through the persistent user cache (see user_cache)
+    with the headers of the key that fetched the event. Call save() at the end of the run.
+    """
+
+    def __init__(self, db_path):
+        self.users = user_cache(db_path)
+
+    def save(self):
+        self.users.save()
+
+    def person_from_owner(self, owner_uri, headers):
+        """Person from the owner's User resource (GET /users/{uuid}, cached in calendly_users)"""
+        if not owner_uri:
+            return ''
+        user = self.users.get(owner_uri, headers)
+        return _person_named((user.get('name') or '').lower(), (user.get('slug') or '').lower())
+
+    def person_from_event_type(self, et, headers):
+        """Person from an event type: scheduling_url, slug, name, profile.name, or the profile owner's User"""
+        url = (et.get('scheduling_url') or '').lower()
+        slug_lower = (et.get('slug') or '').lower()
+        name_lower = (et.get('name') or '').lower()
+        if _is_jennifer_link(url, slug_lower, name_lower):
+            return 'Jennifer'
+        for url_part, person in DESIGN_REVIEW_PERSONS:
+            first_name = url_part.replace('-the-evans-group', '')
+            if url_part in url or first_name in name_lower or first_name in slug_lower:
+                return person
+        profile = et.get('profile') or {}
+        person = _person_named((profile.get('name') or '').lower())
+        if person:
+            return person
+        # Profile.owner is a user URI when type=User; for type=Team it is a team URI (GET /users not applicable)
+        owner_uri = profile.get('owner')
+        if owner_uri and (profile.get('type') == 'User' or '/users/' in owner_uri):
+            return self.person_from_owner(owner_uri, headers)
+        return ''
+
+    def person_from_event_memberships(self, ev, headers):
+        """Person from event_memberships (round-robin: who actually handled the call), else the host/organizer"""
+        for m in ev.get('event_memberships') or []:
+            if not isinstance(m, dict):
+                continue
+            person = _person_named((m.get('user_name') or '').lower(), (m.get('user_email') or '').lower(), burki=True)
+            if person:
+                return person
+            user_uri = m.get('user')
+            if user_uri and '/users/' in user_uri:
+                person = self.person_from_owner(user_uri, headers)
+                if person:
+                    return person
+        host = ev.get('host') or ev.get('organizer')
+        if isinstance(host, dict):
+            return _person_named((host.get('name') or '').lower(), (host.get('email') or '').lower(), burki=True)
+        return ''
+
+    def is_teg_event_type(self, et, headers, organization=False):
+        """Whether an event type's events are TEG events (Let's Chat, intro calls, Jennifer's link,
+        a Design Review host's or any 30 minute type). In organization scope only introductory
+        calls named for TEG count; a user's own event types count any introductory or intro call."""
+        url = (et.get('scheduling_url') or '').lower()
+        name_lower = (et.get('name') or '').lower()
+        if organization:
+            intro_call = (('introductory' in name_lower and 'teg' in name_lower)
+                          or ('intro call' in name_lower and 'introductory' not in name_lower))
+        else:
+            intro_call = 'introductory' in name_lower or 'intro call' in name_lower
+        return (_is_lets_chat(name_lower) or intro_call or 'teg-introductory-call' in url
+                or _is_jennifer_link(url, (et.get('slug') or '').lower(), name_lower)
+                or bool(self.person_from_event_type(et, headers))
+                or '/30min' in url or '/30-min' in url or '30 minute' in name_lower or '30 min' in name_lower)
+
+    def event_source(self, ev, headers, event_type=None, event_name=None):
+        """Source for a relevant event: its members/host, else the person of its event type;
+        'Burki' for an unattributed TEG - Let's Chat event (event_name defaults to the event's name)"""
+        source = self.person_from_event_memberships(ev, headers)
+        if not source and event_type:
+            source = self.person_from_event_type(event_type, headers)
+        if not source and _is_lets_chat((event_name or ev.get('name') or '').lower()):
+            source = 'Burki'
+        return '' if source in GENERIC_SOURCE_LABELS else source
+
+
+def _bearer(key):
+    return {'Authorization': f'Bearer {key}', 'Content-Type': 'application/json'}
+
+
+def fetch_teg_events(db_path, api_key, burki_key, windows, planner=None, log=print, on_progress=None):
+    """Fetch and attribute the TEG events (Let's Chat, intro calls, Design Review) in windows.
+
+    Tries organization scope first (an admin token lists every event); otherwise fetches
+    each key's TEG event types (the v2 and Burki keys when both are set) per window.
+    Windows whose stream failed are flagged 'incomplete' for save_calendly_events.
+    on_progress(fraction) is called as streams finish.
+    Returns (events deduplicated by URI, each with 'source', event type names, error).
+    """
+    planner = planner or RequestPlanner()
+    api_key = api_key or burki_key
+    attribution = EventAttribution(db_path)
+    progress = on_progress or (lambda fraction: None)
+
+    # Organization of the v2 key, else of the Burki key
+    org_uri, headers_org = None, None
+    for key in dict.fromkeys(k for k in (api_key if api_key != burki_key else None, burki_key) if k):
+        try:
+            r_me = planner.get(f"{CALENDLY_API_URL}/users/me", _bearer(key), timeout=30)
+            if r_me.status_code == 200:
+                org_uri = (r_me.json().get('resource') or {}).get('current_organization')
+                headers_org = _bearer(key)
+        except Exception:
+            pass
+        if org_uri:
+            break
+
+    # Probe one window to confirm org scope works (the planner reuses it as that window's first page)
+    use_org_path = False
+    if org_uri:
+        try:
+            r_probe = planner.get(
+                f"{CALENDLY_API_URL}/scheduled_events", headers_org,
+                params=scheduled_events_params({'organization': org_uri,
+                                                'min_start_time': windows[0]['min_start_time'],
+                                                'max_start_time': windows[0]['max_start_time']}),
+                timeout=90)
+            use_org_path = r_probe.status_code == 200
+        except http_client.RequestException:
+            pass
+
+    event_names = set()
+    try:
+        if use_org_path:
+            log("   Using organization scope (admin token)...")
+            # One stream per window, fetched concurrently
+            streams = [(headers_org, {'organization': org_uri, 'min_start_time': window['min_start_time'],
+                                      'max_start_time': window['max_start_time']}) for window in windows]
+            fetched = {}
+            for index, events, error in fetch_event_streams(streams, planner, timeout=90):
+                if error is not None:
+                    log(f"   ⚠️ Failed to get events for {windows[index]['name']}: {error}")
+                    windows[index]['incomplete'] = True
+                log(f"   Fetched {windows[index]['name']}: {len(events)} events")
+                fetched[index] = events
+                progress(len(fetched) / len(streams))
+            raw_events = [ev for index in sorted(fetched) for ev in fetched[index]]
+            # Resolve event types and the users attribution may need concurrently, from the
+            # persistent caches where fresh, so the per-event loop below is local lookups
+            event_types = event_type_cache(db_path)
+            et_uris = [get_event_type_uri(ev) for ev in raw_events]
+            event_types.prefetch(et_uris, headers_org)
+            attribution.users.prefetch(referenced_user_uris(
+                raw_events, [event_types.get(u, headers_org) for u in set(et_uris) if u]), headers_org)
+            event_types.save()
+            all_events = []
+            for ev, et_uri in zip(raw_events, et_uris):
+                et = event_types.get(et_uri, headers_org) if et_uri else {}
+                relevant = bool(et) and attribution.is_teg_event_type(et, headers_org, organization=True)
+                if not relevant and ev.get('name'):
+                    relevant = attribution.is_teg_event_type({'name': ev.get('name')}, headers_org, organization=True)
+                if relevant:
+                    event_names.add(ev.get('name') or et.get('name') or '')
+                    all_events.append({**ev, 'source': attribution.event_source(ev, headers_org, et)})
+            event_names = event_names or {'Organization events'}
+        else:
+            # User scope: one or both keys (Burki + v2), events merged
+            keys = [burki_key, api_key] if burki_key and api_key and burki_key != api_key else [burki_key or api_key]
+            log(f"🔑 Using {len(keys)} Calendly key(s) for user-scoped fetch...")
+            streams = []  # (headers, params) per scheduled_events query
+            stream_sources = []  # (event_type, window) per stream
+            for key in keys:
+                headers = _bearer(key)
+                user_response = planner.get(f"{CALENDLY_API_URL}/users/me", headers, timeout=30)
+                if user_response.status_code != 200:
+                    log(f"   ⚠️ Skip key ...{key[-8:]}: users/me returned {user_response.status_code}")
+                    continue
+                user_uri = (user_response.json().get('resource') or {}).get('uri')
+                if not user_uri:
+                    continue
+                resp = planner.get(f"{CALENDLY_API_URL}/event_types?user={user_uri}", headers, timeout=30)
+                if resp.status_code != 200:
+                    log(f"   ⚠️ Skip key ...{key[-8:]}: event_types returned {resp.status_code}")
+                    continue
+                key_event_types = resp.json().get('collection', [])
+                attribution.users.prefetch(referenced_user_uris([], key_event_types), headers)
+                for event_type in key_event_types:
+                    if not attribution.is_teg_event_type(event_type, headers):
+                        continue
+                    event_type_uuid = event_type['uri'].split('/')[-1]
+                    for window in windows:
+                        streams.append((headers, {'user': user_uri, 'event_type': event_type_uuid,
+                                                  'min_start_time': window['min_start_time'],
+                                                  'max_start_time': window['max_start_time']}))
+                        stream_sources.append((event_type, window))
+            # Every key x event type x window stream runs concurrently; each is attributed as it
+            # finishes and merged in stream order, so dedupe keeps the same event as a serial fetch
+            log(f"   Fetching {len(streams)} event streams ({len(keys)} key(s) x event types x windows)...")
+            fetched = {}
+            for index, events, error in fetch_event_streams(streams, planner):
+                headers = streams[index][0]
+                event_type, window = stream_sources[index]
+                event_name = event_type['name']
+                event_names.add(event_name)
+                if error is not None:
+                    log(f"   ⚠️ Failed to get events for {event_name} ({window['name']}): {error}")
+                    window['incomplete'] = True
+                attribution.users.prefetch(referenced_user_uris(events, []), headers)
+                fetched[index] = [
+                    {**event, 'name': event.get('name') or event_name,
+                     'source': attribution.event_source(event, headers, event_type, event_name)}
+                    for event in events
+                ]
+                progress(len(fetched) / len(streams))
+            all_events = [ev for index in sorted(fetched) for ev in fetched[index]]
+            if not all_events:
+                return [], sorted(event_names), ("No TEG events from any key ('TEG - Let's Chat', "
+                                                 "TEG Introductory Call, or Design Review 30min)")
+    finally:
+        attribution.save()
+
+    # Deduplicate by URI (same event can be returned under multiple event types)
+    unique_events = {}
+    for ev in all_events:
+        uri = (ev.get('uri') or '').strip()
+        if uri and uri not in unique_events:
+            unique_events[uri] = ev
+    return list(unique_events.values()), sorted(event_names), None
+
+
+def calendly_event_row(event, updated_at):
+    """Flatten a Calendly scheduled event (optionally with 'source') into a calendly_events row (CALENDLY_EVENT_FIELDS)"""
+    uri = event.get('uri') or ''
+    name = event.get('name') or ''
+    start_time = event.get('start_time') or ''
+    end_time = event.get('end_time') or ''
+    status = event.get('status') or ''
+    raw_event_type = event.get('event_type', '')
+    # event_type from API can be URI string or nested object
+    if isinstance(raw_event_type, dict):
+        event_type = raw_event_type.get('uri') or raw_event_type.get('name') or ''
+    else:
+        event_type = str(raw_event_type) if raw_event_type else ''
+
+    # Get invitee info (List Events may not include invitees; require separate invitee endpoint)
+    invitees = event.get('invitees') or []
+    invitee_name = ""
+    invitee_email = ""
+    if invitees and isinstance(invitees[0], dict):
+        invitee_name = invitees[0].get('name') or ''
+        invitee_email = invitees[0].get('email') or ''
+
+    category, source, local_date, local_hour = classify_event(name, event.get('source'), start_time)
+    return (uri, name, start_time, end_time, status, event_type, invitee_name, invitee_email,
+            source, category, local_date, local_hour, updated_at)
+
+
+def save_calendly_events(db_path, events, windows=None):
+    """Write events in one batched transaction. Returns the number of rows written.
+
+    Without windows, calendly_events is replaced by events. With the windows from
+    plan_sync_windows, events are upserted, and rows in a window that was fetched
+    completely (no 'incomplete' flag) but are no longer returned by Calendly are
+    deleted; each window's months are then recorded as synced.
+    """
+    now = datetime.now()
+    rows = [calendly_event_row(event, now) for event in events if isinstance(event, dict)]
+
+    init_calendly_database(db_path)
+    conn = sqlite3.connect(db_path, timeout=DB_LOCK_TIMEOUT, isolation_level=None)
+    try:
+        configure_ingest_connection(conn)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if windows is None:
+                conn.execute("DELETE FROM calendly_events")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO calendly_events ({', '.join(CALENDLY_EVENT_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(CALENDLY_EVENT_FIELDS))})",
+                rows
+            )
+            if windows is not None:
+                _prune_and_mark_windows(conn, windows, {row[0] for row in rows}, now)
+            bump_data_generation(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+    return len(rows)
+
+
+def _prune_and_mark_windows(conn, windows, fetched_uris, now):
+    """Delete events missing from completely fetched windows and record their months as synced"""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS fetched_event_uris (uri TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM fetched_event_uris")
+    conn.executemany("INSERT OR IGNORE INTO fetched_event_uris (uri) VALUES (?)", [(uri,) for uri in fetched_uris])
+    for window in windows:
+        if window.get('incomplete'):
+            continue
+        conn.execute('''
+            DELETE FROM calendly_events
+            WHERE start_time BETWEEN ? AND ? AND uri NOT IN (SELECT uri FROM fetched_event_uris)
+        ''', (window['min_start_time'], window['max_start_time']))
+        for key in window['partitions']:
+            min_start_time, max_start_time = _partition_bounds(key)
+            count = conn.execute(
+                "SELECT COUNT(*) FROM calendly_events WHERE start_time BETWEEN ? AND ?",
+                (min_start_time, max_start_time)
+            ).fetchone()[0]
+            conn.execute('''
+                INSERT OR REPLACE INTO calendly_sync_windows (partition, min_start_time, max_start_time, synced_at, events)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (key, min_start_time, max_start_time, now.isoformat(), count))
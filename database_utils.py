@@ -1,22 +1,346 @@
 import sqlite3
+import numpy as np
 import pandas as pd
 import json
 import ast
 from datetime import datetime
 import os
+import threading
+
+from sales_facts import SALES_FACTS_FIELDS, build_sales_facts, is_excluded_item_name
+from lead_identity import (
+    CONTACT_COLUMN_TYPES, FUNNEL_STAGES, LEAD_IDENTITY_RULES_VERSION, lead_identity_rows, name_key, resolve_lead_ids
+)
+from calendly_categories import EVENT_CATEGORY_RULES_VERSION, classify_event, event_category_values
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Optional: columnar snapshots (Arrow IPC) written after each refresh
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as pa_ipc
+except ImportError:
+    pa = None
 
 # Database configuration
 DB_PATH = "monday_data.db"
+CALENDLY_DB_PATH = "calendly_data.db"
+SNAPSHOT_DIR = "snapshots"
+
+BOARD_TABLES = ['sales_board', 'new_leads_board', 'discovery_call_board', 'design_review_board', 'ads_board']
+
+# Per-thread read-only connections (see get_read_connection)
+_read_connections = threading.local()
+READ_MMAP_SIZE = 256 * 1024 * 1024
+READ_CACHE_KIB = 32 * 1024
+
+def enable_wal(conn):
+    """Switch a database to WAL journaling (persistent): readers never block on, or see, an uncommitted refresh"""
+    conn.execute("PRAGMA journal_mode=WAL")
+
+def configure_ingest_connection(conn):
+    """Tune a writer connection for bulk refresh writes.
+    
+    synchronous=NORMAL is durable across application crashes in WAL mode (only an OS
+    crash can lose the last commit, which the next refresh rewrites anyway).
+    """
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+def serialize_column_values(column_values):
+    """Serialize Monday.com column_values as canonical JSON for storage"""
+    return json.dumps(column_values or [], separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+
+def migrate_column_values_to_json(db_path=DB_PATH):
+    """One-time migration: rewrite column_values stored as Python repr into JSON.
+    
+    Older refreshes stored str(list) in column_values. The migration is recorded in
+    db_metadata so it only scans the tables once. Returns the number of rows rewritten.
+    """
+    if not os.path.exists(db_path):
+        return 0
+    
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS db_metadata (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM db_metadata WHERE key = 'column_values_format'").fetchone()
+        if row and row[0] == 'json':
+            return 0
+        
+        converted = 0
+        for table in BOARD_TABLES:
+            try:
+                rows = conn.execute(f"SELECT id, column_values FROM {table}").fetchall()
+            except sqlite3.OperationalError:
+                continue  # Table not created yet
+            
+            updates = []
+            for item_id, raw in rows:
+                if not isinstance(raw, str) or not raw:
+                    continue
+                try:
+                    json.loads(raw)
+                    continue  # Already JSON
+                except json.JSONDecodeError:
+                    pass
+                try:
+                    column_values = ast.literal_eval(raw)
+                except (ValueError, SyntaxError):
+                    print(f"Warning: Could not migrate column_values for {table} item {item_id}: {raw[:100]}...")
+                    column_values = []
+                updates.append((serialize_column_values(column_values), item_id))
+            
+            if updates:
+                conn.executemany(f"UPDATE {table} SET column_values = ? WHERE id = ?", updates)
+                converted += len(updates)
+        
+        conn.execute("INSERT OR REPLACE INTO db_metadata (key, value) VALUES ('column_values_format', 'json')")
+        conn.commit()
+        if converted:
+            print(f"Migrated {converted} column_values rows to JSON")
+        return converted
+    finally:
+        conn.close()
+
+def decode_column_values(raw):
+    """Decode stored column_values (JSON; legacy Python repr until the next refresh migrates it).
+    Raises ValueError if neither parses."""
+    if not raw:
+        return []
+    try:
+        return _json_loads(raw)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(raw)
+    except SyntaxError as e:
+        raise ValueError(str(e))
+
+# Standard Monday.com column fields; anything else (linked_item_ids, display_value, ...) goes in extra
+_ITEM_COLUMN_FIELDS = ('id', 'type', 'text', 'value')
+
+def create_item_columns_table(cursor):
+    """Create the normalized item_columns table (one row per item column) and its indexes"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS item_columns (
+            board TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            col_id TEXT NOT NULL,
+            pos INTEGER,
+            type TEXT,
+            text TEXT,
+            value TEXT,
+            extra TEXT,
+            PRIMARY KEY (board, item_id, col_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_item_columns_board_col ON item_columns (board, col_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_item_columns_board_type ON item_columns (board, type)")
+
+def item_column_rows(board, items):
+    """Flatten Monday.com items into item_columns rows"""
+    rows = []
+    for item in items:
+        item_id = item.get("id", "")
+        for pos, col_val in enumerate(item.get("column_values") or []):
+            if not isinstance(col_val, dict):
+                continue
+            value = col_val.get("value")
+            if value is not None and not isinstance(value, str):
+                value = json.dumps(value)
+            extra = {k: v for k, v in col_val.items() if k not in _ITEM_COLUMN_FIELDS}
+            rows.append((
+                board,
+                item_id,
+                col_val.get("id", ""),
+                pos,
+                col_val.get("type"),
+                col_val.get("text"),
+                value,
+                json.dumps(extra, separators=(',', ':')) if extra else None
+            ))
+    return rows
+
+def save_item_columns(conn, board, items, replace_board=True):
+    """Write items' rows to item_columns (caller commits).
+    
+    replace_board=True replaces every row for the board; otherwise only the given
+    items' rows are replaced (incremental upserts).
+    """
+    if replace_board:
+        conn.execute("DELETE FROM item_columns WHERE board = ?", (board,))
+    else:
+        conn.executemany(
+            "DELETE FROM item_columns WHERE board = ? AND item_id = ?",
+            [(board, item.get("id", "")) for item in items]
+        )
+    conn.executemany('''
+        INSERT OR REPLACE INTO item_columns (board, item_id, col_id, pos, type, text, value, extra)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', item_column_rows(board, items))
+
+def create_item_links_table(cursor):
+    """Create item_links (one row per Connect boards link) with indexes for both directions"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS item_links (
+            board TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            col_id TEXT NOT NULL,
+            linked_item_id TEXT NOT NULL,
+            linked_board TEXT,
+            PRIMARY KEY (board, item_id, col_id, linked_item_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_item_links_item ON item_links (item_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_item_links_linked ON item_links (linked_item_id, linked_board)")
+
+def item_link_rows(board, items):
+    """item_links rows for the linked_item_ids of Monday.com items' board_relation columns"""
+    return [
+        (board, item.get("id", ""), col_val.get("id", ""), str(linked_id))
+        for item in items
+        for col_val in item.get("column_values") or []
+        if isinstance(col_val, dict)
+        for linked_id in col_val.get("linked_item_ids") or []
+    ]
+
+def save_item_links(conn, board, items, replace_board=True):
+    """Write items' links to item_links (caller commits), replacing the board's or only these items' rows
+    like save_item_columns. linked_board is set by resolve_item_link_boards."""
+    if replace_board:
+        conn.execute("DELETE FROM item_links WHERE board = ?", (board,))
+    else:
+        conn.executemany(
+            "DELETE FROM item_links WHERE board = ? AND item_id = ?",
+            [(board, item.get("id", "")) for item in items]
+        )
+    conn.executemany(
+        "INSERT OR IGNORE INTO item_links (board, item_id, col_id, linked_item_id) VALUES (?, ?, ?, ?)",
+        item_link_rows(board, items)
+    )
+
+def resolve_item_link_boards(conn):
+    """Set every link's linked_board to the board table now holding the linked item (NULL if none).
+    
+    Items move between boards, so this runs after each publish (one primary key lookup per board and link).
+    """
+    located = " ".join(
+        f"WHEN EXISTS (SELECT 1 FROM {table} WHERE id = item_links.linked_item_id) THEN '{table}'"
+        for table in BOARD_TABLES
+    )
+    conn.execute(f"UPDATE item_links SET linked_board = CASE {located} END")
+
+def backfill_item_links(conn):
+    """Fill an empty item_links table from the board_relation rows already in item_columns (caller commits).
+    Returns the number of links written."""
+    if conn.execute("SELECT 1 FROM item_links LIMIT 1").fetchone():
+        return 0
+    rows = []
+    for board in BOARD_TABLES:
+        for item_id, col_id, extra in conn.execute(
+            "SELECT item_id, col_id, extra FROM item_columns WHERE board = ? AND type = 'board_relation'", (board,)
+        ):
+            try:
+                linked_ids = _json_loads(extra).get("linked_item_ids") if extra else None
+            except ValueError:
+                linked_ids = None
+            rows.extend((board, item_id, col_id, str(linked_id)) for linked_id in linked_ids or [])
+    if rows:
+        conn.executemany(
+            "INSERT OR IGNORE INTO item_links (board, item_id, col_id, linked_item_id) VALUES (?, ?, ?, ?)", rows
+        )
+        resolve_item_link_boards(conn)
+    return len(rows)
 
 def get_db_connection():
-    """Get SQLite database connection"""
+    """Get a new read-write SQLite database connection (caller closes it)"""
     return sqlite3.connect(DB_PATH)
 
+def _file_identity(db_path):
+    """(device, inode) of the database file, or None if it doesn't exist"""
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+def get_read_connection(db_path=DB_PATH):
+    """Get this thread's pooled read-only connection to db_path (do not close it).
+    
+    Connections are opened once per thread with mode=ro and memory-mapped reads, in
+    autocommit mode so every query sees the latest committed refresh (WAL). If the
+    database file is replaced (different inode), the connection is reopened.
+    Raises sqlite3.OperationalError if the database doesn't exist.
+    """
+    path = os.path.abspath(db_path)
+    pool = getattr(_read_connections, 'pool', None)
+    if pool is None:
+        pool = _read_connections.pool = {}
+    
+    identity = _file_identity(path)
+    cached = pool.get(path)
+    if cached is not None:
+        conn, cached_identity = cached
+        if identity is not None and identity == cached_identity:
+            return conn
+        del pool[path]
+        conn.close()
+    if identity is None:
+        raise sqlite3.OperationalError(f"unable to open database file: {db_path}")
+    
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, isolation_level=None)
+    conn.execute(f"PRAGMA mmap_size={READ_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{READ_CACHE_KIB}")
+    pool[path] = (conn, identity)
+    return conn
+
+def close_read_connections():
+    """Close this thread's pooled read-only connections"""
+    pool = getattr(_read_connections, 'pool', None) or {}
+    for conn, _ in pool.values():
+        conn.close()
+    pool.clear()
+
+def bump_data_generation(conn):
+    """Increment the database's data generation (db_metadata) in the caller's write transaction.
+
+    Every refresh write bumps it in the transaction that publishes the data, so a
+    reader that sees the new generation also sees the new data.
+    """
+    conn.execute("CREATE TABLE IF NOT EXISTS db_metadata (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute('''
+        INSERT INTO db_metadata (key, value) VALUES ('data_generation', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+    ''')
+
+def _read_metadata(db_path, key):
+    """db_metadata value for key, or None (no database, or never written)"""
+    try:
+        row = get_read_connection(db_path).execute("SELECT value FROM db_metadata WHERE key = ?", (key,)).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+def get_database_generation(db_path=DB_PATH):
+    """db_path's data generation - changes exactly when a refresh writes it (0 if there is no
+    database or it was never refreshed since generations were added).
+
+    Dashboards pass the generation of the database they read to their st.cache_data loaders
+    (instead of a TTL), so cached data is recomputed once after each refresh of that
+    database and never otherwise.
+    """
+    return int(_read_metadata(db_path, 'data_generation') or 0)
+
 def get_board_data(table_name):
     """Get all data from a specific board table"""
-    conn = get_db_connection()
-    
     try:
+        conn = get_read_connection()
         query = f"SELECT * FROM {table_name} ORDER BY updated_at DESC"
         df = pd.read_sql_query(query, conn)
         
@@ -27,48 +351,120 @@ def get_board_data(table_name):
     except Exception as e:
         print(f"Error reading from {table_name}: {str(e)}")
         return pd.DataFrame()
-    finally:
-        conn.close()
 
 def get_board_data_as_items(table_name):
     """Get board data in the same format as Monday.com API (for compatibility)"""
-    df = get_board_data(table_name)
-    
-    if df.empty:
+    try:
+        rows = get_read_connection().execute(
+            f"SELECT id, name, column_values FROM {table_name} ORDER BY updated_at DESC"
+        ).fetchall()
+    except Exception as e:
+        print(f"Error reading from {table_name}: {str(e)}")
         return []
     
+    # column_values is stored as JSON (see serialize_column_values), so one decode per row;
+    # the refresh migrates legacy rows (migrate_column_values_to_json), reads never write
     items = []
-    for _, row in df.iterrows():
+    for item_id, name, column_values_str in rows:
         try:
-            # Parse column_values JSON string back to list
-            column_values_str = row['column_values']
-            if isinstance(column_values_str, str):
-                # Try to parse as JSON first
-                try:
-                    column_values = json.loads(column_values_str)
-                except json.JSONDecodeError:
-                    # If JSON parsing fails, try ast.literal_eval for Python dict syntax
-                    try:
-                        column_values = ast.literal_eval(column_values_str)
-                    except (ValueError, SyntaxError):
-                        # If both fail, create empty list
-                        print(f"Warning: Could not parse column_values for item {row['id']}: {column_values_str[:100]}...")
-                        column_values = []
-            else:
-                column_values = column_values_str if column_values_str else []
-            
-            item = {
-                'id': row['id'],
-                'name': row['name'],
-                'column_values': column_values
-            }
-            items.append(item)
-        except Exception as e:
-            print(f"Error processing item {row.get('id', 'unknown')}: {str(e)}")
-            continue
+            column_values = decode_column_values(column_values_str)
+        except ValueError:
+            print(f"Warning: Could not parse column_values for item {item_id}: {column_values_str[:100]}...")
+            column_values = []
+        items.append({
+            'id': item_id,
+            'name': name,
+            'column_values': column_values
+        })
     
     return items
 
+def get_board_columns(table_name, columns=None, column_types=None, column_patterns=None):
+    """Get board items with only the requested column_values, read from item_columns.
+    
+    A column is returned if its id is in columns, its type is in column_types, or its
+    id contains one of column_patterns (case-insensitive). Items keep the Monday.com
+    shape ({'id', 'name', 'column_values'}) and columns keep their board order, so
+    existing per-item loops work unchanged. Falls back to full items when the board
+    has not been refreshed into item_columns yet.
+    """
+    conditions = []
+    params = [table_name]
+    if columns:
+        conditions.append(f"c.col_id IN ({','.join('?' * len(columns))})")
+        params.extend(columns)
+    if column_types:
+        conditions.append(f"c.type IN ({','.join('?' * len(column_types))})")
+        params.extend(column_types)
+    for pattern in column_patterns or []:
+        conditions.append("instr(lower(c.col_id), ?) > 0")
+        params.append(pattern.lower())
+    if not conditions:
+        return [{**item, 'column_values': []} for item in get_board_data_as_items(table_name)]
+    
+    conn = None
+    try:
+        conn = get_read_connection()
+        # One read transaction so item names and columns come from the same committed snapshot
+        conn.execute("BEGIN")
+        has_columns = conn.execute(
+            "SELECT 1 FROM item_columns WHERE board = ? LIMIT 1", (table_name,)
+        ).fetchone()
+        if not has_columns:
+            return _filter_item_columns(get_board_data_as_items(table_name), columns, column_types, column_patterns)
+        
+        items = [
+            {'id': item_id, 'name': name, 'column_values': []}
+            for item_id, name in conn.execute(f"SELECT id, name FROM {table_name} ORDER BY updated_at DESC")
+        ]
+        items_by_id = {item['id']: item for item in items}
+        
+        rows = conn.execute(f'''
+            SELECT c.item_id, c.col_id, c.type, c.text, c.value, c.extra
+            FROM item_columns c
+            WHERE c.board = ? AND ({' OR '.join(conditions)})
+            ORDER BY c.item_id, c.pos
+        ''', params)
+        for item_id, col_id, col_type, text, value, extra in rows:
+            item = items_by_id.get(item_id)
+            if item is None:
+                continue
+            col_val = {'id': col_id, 'type': col_type, 'text': text, 'value': value}
+            if extra:
+                col_val.update(_json_loads(extra))
+            item['column_values'].append(col_val)
+        return items
+    except sqlite3.OperationalError:
+        # item_columns missing (database created before it existed)
+        return _filter_item_columns(get_board_data_as_items(table_name), columns, column_types, column_patterns)
+    finally:
+        # End the read transaction so the pooled connection sees later refreshes
+        if conn is not None and conn.in_transaction:
+            conn.execute("COMMIT")
+
+def _filter_item_columns(items, columns=None, column_types=None, column_patterns=None):
+    """Apply get_board_columns' column selection to full items"""
+    columns = set(columns or [])
+    column_types = set(column_types or [])
+    patterns = [p.lower() for p in column_patterns or []]
+    
+    def wanted(col_val):
+        col_id = col_val.get("id", "")
+        return (col_id in columns
+                or col_val.get("type") in column_types
+                or any(p in col_id.lower() for p in patterns))
+    
+    return [
+        {**item, 'column_values': [c for c in item.get('column_values', []) if wanted(c)]}
+        for item in items
+    ]
+
+def _get_board_items(table_name, columns=None, column_types=None, column_patterns=None):
+    """Full items when no column selection is given, otherwise only the selected columns"""
+    if columns is None and column_types is None and column_patterns is None:
+        return get_board_data_as_items(table_name)
+    return get_board_columns(table_name, columns, column_types, column_patterns)
+
 def debug_sales_board():
     """Debug function to see what's in the sales board"""
     items = get_board_data_as_items('sales_board')
@@ -100,29 +496,30 @@ def debug_sales_board():
     return susan_items
 
 def search_item_by_name(item_name):
-    """Search for a specific item across all boards"""
-    boards = ['sales_board', 'new_leads_board', 'discovery_call_board', 'design_review_board']
+    """Search for a specific lead across the funnel boards: every item of the leads with an item
+    whose name contains item_name or one of its words (or is contained in it), via lead_identity"""
+    lead_items = get_lead_items(search=item_name)
     results = []
-    
-    for board in boards:
-        items = get_board_data_as_items(board)
-        
-        for item in items:
-            item_name_lower = item.get("name", "").lower()
-            search_term_lower = item_name.lower()
-            
-            # Try different search methods
-            if (search_term_lower in item_name_lower or 
-                item_name_lower in search_term_lower or
-                any(word in item_name_lower for word in search_term_lower.split())):
-                
-                results.append({
-                    'board': board,
-                    'item': item,
-                    'name': item.get("name", ""),
-                    'id': item.get("id", ""),
-                    'column_values': item.get("column_values", [])
-                })
+    conn = get_read_connection()
+    for board, board_items in lead_items.groupby('board', sort=False):
+        item_ids = list(board_items['item_id'])
+        lead_ids = dict(zip(board_items['item_id'], board_items['lead_id']))
+        for item_id, name, column_values_str in conn.execute(
+            f"SELECT id, name, column_values FROM {board} WHERE id IN ({', '.join('?' * len(item_ids))})", item_ids
+        ):
+            try:
+                column_values = decode_column_values(column_values_str)
+            except ValueError:
+                column_values = []
+            item = {'id': item_id, 'name': name, 'column_values': column_values}
+            results.append({
+                'board': board,
+                'item': item,
+                'name': name,
+                'id': item_id,
+                'lead_id': lead_ids[item_id],
+                'column_values': column_values
+            })
     
     return results
 
@@ -147,9 +544,17 @@ def get_discovery_call_dates():
     # Find Discovery Call Date columns dynamically
     discovery_columns = find_discovery_call_date_columns()
     
+    # Qualification/status columns each board's filters below read
+    filter_columns = {
+        'sales_board': ['color_mknxg5zf'],
+        'new_leads_board': [],
+        'discovery_call_board': ['color_mknxk7eq', 'color_mknx1h9r', 'contract_status'],
+        'design_review_board': ['color_mknxrx3c']
+    }
+    
     for board in boards:
-        items = get_board_data_as_items(board)
         board_discovery_columns = discovery_columns.get(board, [])
+        items = get_board_columns(board, board_discovery_columns + filter_columns.get(board, []))
         
         for item in items:
             item_name = item.get("name", "")
@@ -268,9 +673,9 @@ def get_discovery_call_dates():
     
     return all_dates
 
-def get_sales_data():
+def get_sales_data(columns=None, column_types=None, column_patterns=None):
     """Get sales data in the format expected by sales dashboard with filtering"""
-    items = get_board_data_as_items('sales_board')
+    items = _get_board_items('sales_board', columns, column_types, column_patterns)
     
     # Filter out items that start with "No", "Not", or "Spam"
     filtered_items = []
@@ -292,9 +697,311 @@ def get_sales_data():
         }
     }
 
-def get_ads_data():
+def _snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, f"{name}.arrow")
+
+def write_snapshot(name, df, generation):
+    """Write a DataFrame as an Arrow IPC file in SNAPSHOT_DIR (atomically replaced), stamped with
+    the data generation of the database it was read from"""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = _snapshot_path(name)
+    tmp_path = path + ".tmp"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'data_generation': str(generation).encode()})
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+def _load_snapshot_table(name, db_path=DB_PATH):
+    """Memory-map a snapshot as an Arrow table, or None if pyarrow is missing or the snapshot is
+    missing or was written for another data generation of db_path (e.g. a refresh ran without re-exporting)"""
+    path = _snapshot_path(name)
+    if pa is None or not os.path.exists(path):
+        return None
+    try:
+        table = pa_ipc.open_file(pa.memory_map(path, "r")).read_all()
+    except (OSError, pa.ArrowInvalid) as e:
+        print(f"Warning: Could not load snapshot {path}: {str(e)}")
+        return None
+    generation = (table.schema.metadata or {}).get(b'data_generation')
+    if generation is None or generation.decode() != str(get_database_generation(db_path)):
+        return None
+    return table
+
+def load_snapshot(name, db_path=DB_PATH):
+    """A current snapshot (see _load_snapshot_table) as a DataFrame, or None"""
+    table = _load_snapshot_table(name, db_path)
+    return table.to_pandas() if table is not None else None
+
+def _column_texts(rows, col_id, pos):
+    """Stripped text of col_id for each item's column_values, read at pos when the id matches there"""
+    texts = []
+    for column_values in rows:
+        col_val = column_values[pos] if len(column_values) > pos else None
+        if not isinstance(col_val, dict) or col_val.get('id') != col_id:
+            col_val = next((c for c in column_values if isinstance(c, dict) and c.get('id') == col_id), {})
+        texts.append((col_val.get('text') or '').strip())
+    return texts
+
+def items_to_frame(items, columns=None, typed=True):
+    """Board items (as returned by the get_*_data getters) as a wide DataFrame.
+
+    One row per item (id, name, in item order) and one column per Monday column id
+    holding its stripped text ('' when missing), in board column order; columns limits
+    the frame to those ids. With typed, date columns also get '<col_id>__date' (datetime,
+    NaT when empty or unparseable) and numbers columns '<col_id>__number' (float, "$"
+    and "," ignored). frame.attrs['column_types'] maps each column id to its Monday type.
+
+    Items of a board share one column layout, so each column is read by its position
+    (checked against its id, searched for otherwise) and parsed once for the whole
+    column instead of once per item.
+    """
+    frame = pd.DataFrame({
+        'id': [item.get('id', '') for item in items],
+        'name': [item.get('name', '') for item in items],
+    })
+    rows = [item.get('column_values') or [] for item in items]
+
+    # Column order and types from the first item, plus columns only items with another layout
+    # (another sequence of column ids) have
+    column_types, positions = {}, {}
+    layouts = set()
+    for column_values in rows:
+        layout = tuple([col_val.get('id', '') if isinstance(col_val, dict) else None for col_val in column_values])
+        if layout in layouts:
+            continue
+        layouts.add(layout)
+        for pos, col_val in enumerate(column_values):
+            if isinstance(col_val, dict) and col_val.get('id', '') not in column_types:
+                column_types[col_val.get('id', '')] = col_val.get('type') or ''
+                positions.setdefault(col_val.get('id', ''), pos)
+    column_types = {
+        col_id: col_type for col_id, col_type in column_types.items()
+        if (columns is None or col_id in columns) and col_id not in frame.columns
+    }
+
+    texts = pd.DataFrame(
+        {col_id: _column_texts(rows, col_id, positions[col_id]) for col_id in column_types},
+        index=frame.index, columns=list(column_types), dtype=object
+    )
+    parsed = {}
+    for col_id, col_type in column_types.items():
+        if typed and col_type == 'date':
+            parsed[f'{col_id}__date'] = pd.to_datetime(texts[col_id], errors='coerce', format='ISO8601')
+        elif typed and col_type == 'numbers':
+            parsed[f'{col_id}__number'] = pd.to_numeric(
+                texts[col_id].str.replace('$', '', regex=False).str.replace(',', '', regex=False), errors='coerce'
+            )
+    frame = pd.concat([frame, texts, pd.DataFrame(parsed, index=frame.index)], axis=1)
+    frame.attrs['column_types'] = column_types
+    return frame
+
+def first_text(frame, col_ids):
+    """Per row of an items_to_frame frame, the first non-empty text among col_ids (in order), or None"""
+    col_ids = [col_id for col_id in col_ids if col_id in frame.columns]
+    if not col_ids:
+        return pd.Series(None, index=frame.index, dtype=object)
+    texts = frame[col_ids].to_numpy(dtype=object)
+    is_set = texts != ''
+    first = texts[np.arange(len(texts)), is_set.argmax(axis=1)]
+    return pd.Series(np.where(is_set.any(axis=1), first, None), index=frame.index, dtype=object)
+
+def _classify_calendly_events(df):
+    """Classify events read from a database refreshed before the current category rules
+    (calendly_categories.classify_event), in memory - dashboards never write"""
+    sources = df['source'] if 'source' in df.columns else [None] * len(df)
+    classified = pd.DataFrame(
+        [classify_event(name, source, start_time) for name, source, start_time in zip(df['name'], sources, df['start_time'])],
+        columns=['event_category', 'source', 'local_date', 'local_hour'], index=df.index
+    )
+    return df.drop(columns=[c for c in classified.columns if c in df.columns]).join(classified)
+
+def get_calendly_events(categories=None, active_only=False):
+    """Get calendly_events (newest first) as a DataFrame, from its snapshot when current.
+
+    With categories (see calendly_categories.EVENT_CATEGORIES) only the events in any of
+    them are returned, optionally only active events: filtered in Arrow before conversion
+    from the snapshot, otherwise with one query on the category index. Until the next
+    refresh reclassifies a database written under older category rules, its events are
+    classified on read.
+    """
+    values = event_category_values(categories) if categories else None
+    classified = _read_metadata(CALENDLY_DB_PATH, 'event_category_rules') == EVENT_CATEGORY_RULES_VERSION
+    table = _load_snapshot_table("calendly_events", CALENDLY_DB_PATH) if classified else None
+    if table is not None:
+        if categories:
+            mask = pc.is_in(table['event_category'], value_set=pa.array(values, pa.string()))
+            if active_only:
+                mask = pc.and_(mask, pc.equal(table['status'], 'active'))
+            table = table.filter(mask)
+        return table.to_pandas()
+    conn = get_read_connection(CALENDLY_DB_PATH)
+    if categories and not classified:
+        df = _classify_calendly_events(pd.read_sql_query("SELECT * FROM calendly_events ORDER BY start_time DESC", conn))
+        mask = df['event_category'].isin(values)
+        if active_only:
+            mask &= df['status'] == 'active'
+        return df[mask].reset_index(drop=True)
+    if categories:
+        where = f"event_category IN ({', '.join('?' * len(values))})"
+        if active_only:
+            where += " AND status = 'active'"
+        return pd.read_sql_query(
+            f"SELECT * FROM calendly_events WHERE {where} ORDER BY start_time DESC", conn, params=values
+        )
+    return pd.read_sql_query("SELECT * FROM calendly_events ORDER BY start_time DESC", conn)
+
+def _export_snapshot(name, db_path, query):
+    """Write query's result as snapshot name, with the data generation read in the same transaction"""
+    conn = get_read_connection(db_path)
+    conn.execute("BEGIN")
+    try:
+        generation = get_database_generation(db_path)
+        df = pd.read_sql_query(query, conn)
+    finally:
+        conn.execute("COMMIT")
+    write_snapshot(name, df, generation)
+
+def export_snapshots():
+    """Write Arrow snapshots of the tables dashboards load whole: sales_facts and calendly_events.
+    Returns (success, message)."""
+    if pa is None:
+        return False, "pyarrow not installed - skipping columnar snapshots"
+    
+    written = []
+    try:
+        if os.path.exists(DB_PATH):
+            _export_snapshot("sales_facts", DB_PATH, f"SELECT {', '.join(SALES_FACTS_FIELDS)} FROM sales_facts")
+            written.append("sales_facts")
+        if os.path.exists(CALENDLY_DB_PATH):
+            _export_snapshot("calendly_events", CALENDLY_DB_PATH, "SELECT * FROM calendly_events ORDER BY start_time DESC")
+            written.append("calendly_events")
+    except Exception as e:
+        return False, f"Error writing snapshots after {len(written)} tables: {str(e)}"
+    return True, f"Wrote {len(written)} snapshots to {SNAPSHOT_DIR}/"
+
+def get_sales_facts():
+    """Get the sales_facts table (one row per Sales board item, revenue rules applied) as a DataFrame.
+    
+    sales_facts is rebuilt by every refresh; until a database has been refreshed with
+    it, the facts are computed from the Sales board items instead.
+    """
+    df = load_snapshot("sales_facts")
+    if df is not None and not df.empty:
+        return df
+    try:
+        conn = get_read_connection()
+        df = pd.read_sql_query(f"SELECT {', '.join(SALES_FACTS_FIELDS)} FROM sales_facts", conn)
+        if not df.empty or not conn.execute("SELECT 1 FROM sales_board LIMIT 1").fetchone():
+            return df
+    except Exception as e:
+        print(f"Error reading from sales_facts: {str(e)}")
+    
+    items = get_sales_data()["data"]["boards"][0]["items_page"]["items"]
+    return pd.DataFrame(build_sales_facts(items), columns=SALES_FACTS_FIELDS)
+
+FUNNEL_ITEM_FIELDS = ['lead_id', 'board', 'item_id', 'name', 'stage_date']
+
+def _lead_identity_current():
+    """Whether lead_identity was built under the current matching rules (lead_identity.LEAD_IDENTITY_RULES_VERSION)"""
+    return _read_metadata(DB_PATH, 'lead_identity_rules') == LEAD_IDENTITY_RULES_VERSION
+
+def _resolve_funnel_items():
+    """lead_identity rows resolved in memory from the funnel boards' items, for a database
+    not yet refreshed with the current rules (dashboards never write)"""
+    items, links, board_of = [], [], {}
+    for board, _, stage_column in FUNNEL_STAGES:
+        board_items = get_board_data_as_items(board)
+        for item in board_items:
+            column_values = [c for c in item.get('column_values') or [] if isinstance(c, dict)]
+            items.append({
+                'board': board, 'item_id': item.get('id', ''), 'name': item.get('name', ''),
+                'email': next((c.get('text') for c in column_values
+                               if c.get('type') in CONTACT_COLUMN_TYPES and c.get('text')), ""),
+                'stage_date': next((c.get('text') for c in column_values if c.get('id') == stage_column), None) or None,
+            })
+            board_of.setdefault(item.get('id', ''), board)
+        links.extend(item_link_rows(board, board_items))
+    links = [(board, item_id, board_of.get(linked_id), linked_id) for board, item_id, _, linked_id in links]
+    return lead_identity_rows(items, resolve_lead_ids(items, links))
+
+def get_funnel_items():
+    """Every funnel item with its lead id (lead_identity) as a DataFrame (lead_id, board,
+    item_id, name, stage_date); placeholder items ("No ...", "Spam...") are left out like
+    in the get_*_data getters.
+    
+    Until the database has been refreshed with the current lead_identity rules, the leads
+    are resolved from the boards' items in memory instead.
+    """
+    df = None
+    if _lead_identity_current():
+        try:
+            df = pd.read_sql_query(f"SELECT {', '.join(FUNNEL_ITEM_FIELDS)} FROM lead_identity", get_read_connection())
+        except Exception as e:
+            print(f"Error reading from lead_identity: {str(e)}")
+    if df is None:
+        df = pd.DataFrame(_resolve_funnel_items(), columns=FUNNEL_ITEM_FIELDS)
+    return df[~df['name'].map(is_excluded_item_name)].reset_index(drop=True)
+
+def _name_key_matches(key, term, words):
+    """search_item_by_name's match: term in the name, the name in term, or any word of term in the name"""
+    return bool(key) and (term in key or key in term or any(word in key for word in words))
+
+def get_lead_items(item_id=None, name=None, search=None):
+    """Every funnel item of the lead(s) of item_id, of the items named name, or of the items whose
+    name partially matches search (names compared like lead_identity.name_key), as a DataFrame
+    (lead_id, board, item_id, name, stage_date)"""
+    words = []
+    if item_id is not None:
+        where, params = "me.item_id = ?", [str(item_id)]
+    elif name is not None:
+        where, params = "me.name_key = ?", [name_key(name)]
+    else:
+        term = " ".join(str(search).lower().split())
+        words = term.split()
+        where = " OR ".join(["instr(me.name_key, ?) > 0", "instr(?, me.name_key) > 0"]
+                            + ["instr(me.name_key, ?) > 0"] * len(words))
+        where, params = f"me.name_key != '' AND ({where})", [term, term] + words
+    if not _lead_identity_current():
+        df = pd.DataFrame(_resolve_funnel_items())
+        if df.empty:
+            return pd.DataFrame(columns=FUNNEL_ITEM_FIELDS)
+        if item_id is not None:
+            me = df['item_id'] == params[0]
+        elif name is not None:
+            me = df['name_key'] == params[0]
+        else:
+            me = df['name_key'].map(lambda key: _name_key_matches(key, params[0], words))
+        return (df.loc[df['lead_id'].isin(df.loc[me, 'lead_id']), FUNNEL_ITEM_FIELDS]
+                .sort_values(['lead_id', 'board', 'item_id']).reset_index(drop=True))
+    return pd.read_sql_query(f"""
+        SELECT DISTINCT l.lead_id, l.board, l.item_id, l.name, l.stage_date
+        FROM lead_identity me JOIN lead_identity l ON l.lead_id = me.lead_id
+        WHERE {where}
+        ORDER BY l.lead_id, l.board, l.item_id
+    """, get_read_connection(), params=params)
+
+def get_lead_funnel():
+    """One row per lead with, for each funnel stage (lead_identity.FUNNEL_STAGES), '<stage> Items'
+    (its items on that board) and '<stage> Date' (earliest stage date, NaT if none).
+    
+    Conversion is the share of leads with Items > 0 at each stage, and time between stages
+    the difference of their Date columns.
+    """
+    items = get_funnel_items()
+    stage_dates = pd.to_datetime(items['stage_date'], errors='coerce', format='ISO8601')
+    funnel = pd.DataFrame(index=pd.Index(items['lead_id'].unique(), name='lead_id'))
+    for board, stage, _ in FUNNEL_STAGES:
+        on_board = items['board'] == board
+        funnel[f"{stage} Items"] = items[on_board].groupby('lead_id').size().reindex(funnel.index, fill_value=0)
+        funnel[f"{stage} Date"] = stage_dates[on_board].groupby(items.loc[on_board, 'lead_id']).min().reindex(funnel.index)
+    return funnel.reset_index()
+
+def get_ads_data(columns=None, column_types=None, column_patterns=None):
     """Get ads data in the format expected by ads dashboard with filtering"""
-    items = get_board_data_as_items('ads_board')
+    items = _get_board_items('ads_board', columns, column_types, column_patterns)
     
     # Filter out items that start with "No", "Not", or "Spam"
     filtered_items = []
@@ -316,9 +1023,9 @@ def get_ads_data():
         }
     }
 
-def get_new_leads_data():
+def get_new_leads_data(columns=None, column_types=None, column_patterns=None):
     """Get new leads data with filtering"""
-    items = get_board_data_as_items('new_leads_board')
+    items = _get_board_items('new_leads_board', columns, column_types, column_patterns)
     
     # Filter out items that start with "No", "Not", or "Spam"
     filtered_items = []
@@ -329,9 +1036,9 @@ def get_new_leads_data():
     
     return filtered_items
 
-def get_discovery_call_data():
+def get_discovery_call_data(columns=None, column_types=None, column_patterns=None):
     """Get discovery call data with filtering"""
-    items = get_board_data_as_items('discovery_call_board')
+    items = _get_board_items('discovery_call_board', columns, column_types, column_patterns)
     
     # Filter out items that start with "No", "Not", or "Spam"
     filtered_items = []
@@ -342,9 +1049,9 @@ def get_discovery_call_data():
     
     return filtered_items
 
-def get_design_review_data():
+def get_design_review_data(columns=None, column_types=None, column_patterns=None):
     """Get design review data with filtering"""
-    items = get_board_data_as_items('design_review_board')
+    items = _get_board_items('design_review_board', columns, column_types, column_patterns)
     
     # Filter out items that start with "No", "Not", or "Spam"
     filtered_items = []
@@ -360,14 +1067,10 @@ def check_database_exists():
     if not os.path.exists(DB_PATH):
         return False, "Database file does not exist"
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
+        cursor = get_read_connection().cursor()
         # Check if tables exist and have data
-        tables = ['sales_board', 'new_leads_board', 'discovery_call_board', 'design_review_board', 'ads_board']
-        
-        for table in tables:
+        for table in BOARD_TABLES:
             cursor.execute(f"SELECT COUNT(*) FROM {table}")
             count = cursor.fetchone()[0]
             if count == 0:
@@ -376,45 +1079,38 @@ def check_database_exists():
         return True, "Database is ready"
     except Exception as e:
         return False, f"Database error: {str(e)}"
-    finally:
-        conn.close()
 
 def get_database_info():
     """Get information about the database"""
     if not os.path.exists(DB_PATH):
         return {"exists": False, "size": 0, "tables": {}}
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    cursor = get_read_connection().cursor()
     
-    try:
-        tables = ['sales_board', 'new_leads_board', 'discovery_call_board', 'design_review_board', 'ads_board']
-        table_info = {}
-        
-        for table in tables:
-            try:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                count = cursor.fetchone()[0]
-                
-                cursor.execute(f"SELECT MAX(updated_at) FROM {table}")
-                last_updated = cursor.fetchone()[0]
-                
-                table_info[table] = {
-                    'count': count,
-                    'last_updated': last_updated
-                }
-            except:
-                table_info[table] = {
-                    'count': 0,
-                    'last_updated': 'Never'
-                }
-        
-        file_size = os.path.getsize(DB_PATH)
-        
-        return {
-            "exists": True,
-            "size": file_size,
-            "tables": table_info
-        }
-    finally:
-        conn.close()
+    table_info = {}
+    
+    for table in BOARD_TABLES:
+        try:
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            count = cursor.fetchone()[0]
+            
+            cursor.execute(f"SELECT MAX(updated_at) FROM {table}")
+            last_updated = cursor.fetchone()[0]
+            
+            table_info[table] = {
+                'count': count,
+                'last_updated': last_updated
+            }
+        except:
+            table_info[table] = {
+                'count': 0,
+                'last_updated': 'Never'
+            }
+    
+    file_size = os.path.getsize(DB_PATH)
+    
+    return {
+        "exists": True,
+        "size": file_size,
+        "tables": table_info
+    }
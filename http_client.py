@@ -0,0 +1,198 @@
+"""
+Shared HTTP client for Monday.com, Calendly and SignNow API calls.
+
+Every call goes through request() (or get/post/put), which:
+- reuses a keep-alive session per host (one per thread, since requests.Session
+  is not thread-safe), with gzip accepted on every response
+- applies a per-host default timeout when the caller does not pass one
+- retries connection errors, timeouts, 429 and 5xx responses with exponential
+  backoff and full jitter, honouring Retry-After
+- records per-endpoint request, retry and error counts and latency (get_stats)
+
+HTTP_CLIENT_HOST_OVERRIDES ("api.monday.com=http://127.0.0.1:8765,...") sends a
+host's requests to another base URL, e.g. the offline stand-in in
+scripts/api_stand_in.py.
+
+POSTs are only retried on 429 and connection errors unless idempotent=True,
+so uploads and sends are never submitted twice after a server error.
+"""
+import os
+import random
+import re
+import threading
+import time
+from urllib.parse import urlparse, urlunparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) timeouts in seconds per host
+HOST_TIMEOUTS = {
+    "api.monday.com": (10, 120),
+    "api.calendly.com": (10, 60),
+    "api.signnow.com": (10, 90),
+}
+DEFAULT_TIMEOUT = (10, 30)
+
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+POOL_SIZE = 10
+
+# Raised by request() when every attempt fails without a response; callers catch it from here
+RequestException = requests.exceptions.RequestException
+
+HOST_OVERRIDES_ENV = "HTTP_CLIENT_HOST_OVERRIDES"
+
+_local = threading.local()
+_stats = {}
+_stats_lock = threading.Lock()
+
+# Path segments that are ids (numbers, UUIDs, hex ids) are collapsed in endpoint names
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F-]{16,})$")
+
+
+def get_session(host):
+    """This thread's keep-alive session for host"""
+    sessions = getattr(_local, "sessions", None)
+    if sessions is None:
+        sessions = _local.sessions = {}
+    session = sessions.get(host)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        sessions[host] = session
+    return session
+
+
+def _override_url(url):
+    """url with its scheme and host replaced per HTTP_CLIENT_HOST_OVERRIDES"""
+    overrides = os.environ.get(HOST_OVERRIDES_ENV)
+    if not overrides:
+        return url
+    parsed = urlparse(url)
+    for entry in overrides.split(","):
+        host, _, base_url = entry.strip().partition("=")
+        if host == parsed.netloc and base_url:
+            base = urlparse(base_url)
+            return urlunparse(parsed._replace(scheme=base.scheme, netloc=base.netloc))
+    return url
+
+
+def endpoint_name(method, url):
+    """Stats key for a request, e.g. 'GET api.calendly.com/event_types/{id}'"""
+    parsed = urlparse(url)
+    path = "/".join("{id}" if _ID_SEGMENT.match(segment) else segment
+                    for segment in parsed.path.split("/"))
+    return f"{method} {parsed.netloc}{path}"
+
+
+def backoff_delay(attempt):
+    """Seconds to wait before retry number attempt (1-based): full jitter exponential backoff"""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def _retry_after(response):
+    """Retry-After header in seconds, or None"""
+    try:
+        return min(float(response.headers.get("Retry-After")), BACKOFF_MAX_SECONDS * 4)
+    except (TypeError, ValueError):
+        return None
+
+
+def _record(endpoint, elapsed, retries, failed):
+    with _stats_lock:
+        stats = _stats.setdefault(endpoint, {
+            'requests': 0, 'retries': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0
+        })
+        stats['requests'] += 1
+        stats['retries'] += retries
+        stats['errors'] += 1 if failed else 0
+        stats['total_seconds'] += elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+
+
+def request(method, url, retries=MAX_RETRIES, idempotent=None, **kwargs):
+    """Send a request with the shared retry policy. Returns the final response.
+
+    Raises RequestException if every attempt fails without a response.
+    Responses with a retryable status are returned once retries are exhausted,
+    so callers check status codes as before.
+    """
+    method = method.upper()
+    if idempotent is None:
+        idempotent = method in IDEMPOTENT_METHODS
+    host = urlparse(url).netloc
+    kwargs.setdefault("timeout", HOST_TIMEOUTS.get(host, DEFAULT_TIMEOUT))
+    session = get_session(host)
+    endpoint = endpoint_name(method, url)
+    url = _override_url(url)
+
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            # A read timeout may mean the server got the request - only retry it when idempotent
+            if attempt >= retries or not (idempotent or not isinstance(e, requests.exceptions.ReadTimeout)):
+                _record(endpoint, time.monotonic() - started, attempt, True)
+                raise
+            attempt += 1
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUSES)
+        if retryable and attempt < retries:
+            attempt += 1
+            delay = _retry_after(response)
+            time.sleep(delay if delay is not None else backoff_delay(attempt))
+            continue
+
+        _record(endpoint, time.monotonic() - started, attempt, response.status_code >= 400)
+        return response
+
+
+def get(url, **kwargs):
+    """GET with the shared session and retry policy"""
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    """POST with the shared session and retry policy (pass idempotent=True for read-only queries)"""
+    return request("POST", url, **kwargs)
+
+
+def put(url, **kwargs):
+    """PUT with the shared session and retry policy"""
+    return request("PUT", url, **kwargs)
+
+
+def get_stats():
+    """Per-endpoint counters: {endpoint: {requests, retries, errors, total_seconds, max_seconds}}"""
+    with _stats_lock:
+        return {endpoint: dict(stats) for endpoint, stats in _stats.items()}
+
+
+def reset_stats():
+    """Clear the per-endpoint counters"""
+    with _stats_lock:
+        _stats.clear()
+
+
+def format_stats():
+    """One line per endpoint with request count, retries, errors and mean/max latency"""
+    lines = []
+    for endpoint, stats in sorted(get_stats().items()):
+        mean = stats['total_seconds'] / stats['requests'] if stats['requests'] else 0.0
+        lines.append(
+            f"{endpoint}: {stats['requests']} requests, {stats['retries']} retries, "
+            f"{stats['errors']} errors, {mean:.2f}s mean, {stats['max_seconds']:.2f}s max"
+        )
+    return lines
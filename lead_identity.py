@@ -0,0 +1,252 @@
+"""
+Lead identity: one lead id for the items that are the same lead across the funnel boards.
+
+A lead is copied from New Leads to Discovery Call, Design Review and Sales as separate
+items. The refresh resolves them in the transaction that publishes the boards: items
+are the same lead when they are linked (item_links) or have the same email address.
+Names and phone numbers are not matched - different people share names, and an office
+shares one phone number. The lead_identity table maps every funnel item to its lead id
+with its name and stage date, so funnel conversion and time between stages are
+indexed reads on lead_id.
+"""
+from sales_facts import base_item_name, is_excluded_item_name
+
+# Funnel order: board table, stage name and stage date column (as in the Sales dashboard's funnel chart)
+FUNNEL_STAGES = [
+    ('new_leads_board', 'New Leads', 'date_mkwgr4gg'),
+    ('discovery_call_board', 'Discovery Call', 'date_mktbrpz6'),
+    ('design_review_board', 'Design Review Call', 'date3'),
+    ('sales_board', 'Deck Call', 'date_mktqx5me'),
+]
+FUNNEL_BOARDS = [board for board, _, _ in FUNNEL_STAGES]
+
+# Monday.com column types matched as contact details
+CONTACT_COLUMN_TYPES = ['email']
+
+# Bump when the matching rules or the table change, so init_monday_database rebuilds lead_identity
+LEAD_IDENTITY_RULES_VERSION = '2'
+
+
+def create_lead_identity_table(cursor):
+    """Create the lead_identity table and its indexes"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS lead_identity (
+            board TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            lead_id TEXT NOT NULL,
+            stage_date TEXT,
+            name TEXT,
+            name_key TEXT,
+            email TEXT,
+            PRIMARY KEY (board, item_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lead_identity_lead ON lead_identity (lead_id, board, stage_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lead_identity_item ON lead_identity (item_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lead_identity_name ON lead_identity (name_key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lead_identity_email ON lead_identity (email)")
+
+
+def init_lead_identity(conn):
+    """Create lead_identity, (re)building it when it is empty or was built under older rules
+    (caller commits). Returns the number of items indexed (0 if the table was kept)."""
+    conn.execute("CREATE TABLE IF NOT EXISTS db_metadata (key TEXT PRIMARY KEY, value TEXT)")
+    rules = conn.execute("SELECT value FROM db_metadata WHERE key = 'lead_identity_rules'").fetchone()
+    if rules and rules[0] == LEAD_IDENTITY_RULES_VERSION:
+        create_lead_identity_table(conn.cursor())
+        if conn.execute("SELECT 1 FROM lead_identity LIMIT 1").fetchone():
+            return 0
+    else:
+        # Older tables merged leads on names and phones (and have no name column)
+        conn.execute("DROP TABLE IF EXISTS lead_identity")
+        create_lead_identity_table(conn.cursor())
+        conn.execute(
+            "INSERT OR REPLACE INTO db_metadata (key, value) VALUES ('lead_identity_rules', ?)",
+            (LEAD_IDENTITY_RULES_VERSION,)
+        )
+    return rebuild_lead_identity(conn)
+
+
+def name_key(name):
+    """Item name as compared across boards ("Jane Doe (copy)" -> "jane doe"), or "" for placeholder names"""
+    if is_excluded_item_name(name):
+        return ""
+    return " ".join(base_item_name(name).lower().split())
+
+
+def _email_key(text):
+    email = (text or "").strip().lower()
+    return email if "@" in email else ""
+
+
+def _find(parent, key):
+    while parent[key] != key:
+        parent[key] = parent[parent[key]]
+        key = parent[key]
+    return key
+
+
+def resolve_lead_ids(items, links=()):
+    """Lead id for each funnel item.
+
+    items are dicts with board, item_id, name and email; links are
+    (board, item_id, linked_board, linked_item_id) pairs. Items connected by a link or
+    the same email address are one lead, identified by its lowest item id.
+    Returns {(board, item_id): lead_id}.
+    """
+    parent = {(item['board'], item['item_id']): (item['board'], item['item_id']) for item in items}
+
+    def union(a, b):
+        root_a, root_b = _find(parent, a), _find(parent, b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    for board, item_id, linked_board, linked_item_id in links:
+        if (board, item_id) in parent and (linked_board, linked_item_id) in parent:
+            union((board, item_id), (linked_board, linked_item_id))
+
+    first_with_email = {}
+    for item in items:
+        key = (item['board'], item['item_id'])
+        email = _email_key(item['email'])
+        if not email:
+            continue
+        if email in first_with_email:
+            union(first_with_email[email], key)
+        else:
+            first_with_email[email] = key
+
+    members = {}
+    for key in parent:
+        members.setdefault(_find(parent, key), []).append(key[1])
+    lead_ids = {root: min(item_ids, key=lambda item_id: (len(item_id), item_id)) for root, item_ids in members.items()}
+    return {key: lead_ids[_find(parent, key)] for key in parent}
+
+
+def _stage_keys(conn, keys):
+    """Load (board, item_id) keys into the temp table lead_identity_keys"""
+    conn.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS lead_identity_keys (
+            board TEXT NOT NULL, item_id TEXT NOT NULL, PRIMARY KEY (board, item_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("DELETE FROM lead_identity_keys")
+    conn.executemany("INSERT OR IGNORE INTO lead_identity_keys (board, item_id) VALUES (?, ?)", keys)
+
+
+def read_funnel_items(conn, keys=None):
+    """Funnel items (dicts with board, item_id, name, email and stage_date) from the board
+    tables and item_columns; only the (board, item_id) keys if given (staged in the temp
+    table lead_identity_keys, so the connection must be writable)."""
+    if keys is not None:
+        _stage_keys(conn, keys)
+    items = []
+    for board, _, stage_column in FUNNEL_STAGES:
+        if keys is None:
+            scope, id_scope, scope_params = "", "", []
+        else:
+            scope = "AND item_id IN (SELECT item_id FROM lead_identity_keys WHERE board = ?)"
+            id_scope = "WHERE id IN (SELECT item_id FROM lead_identity_keys WHERE board = ?)"
+            scope_params = [board]
+        emails = {}
+        for item_id, text in conn.execute(f'''
+            SELECT item_id, text FROM item_columns
+            WHERE board = ? AND type IN ({', '.join('?' * len(CONTACT_COLUMN_TYPES))}) AND text != '' {scope}
+            ORDER BY item_id, pos
+        ''', [board] + CONTACT_COLUMN_TYPES + scope_params):
+            emails.setdefault(item_id, text)
+        stage_dates = dict(conn.execute(
+            f"SELECT item_id, text FROM item_columns WHERE board = ? AND col_id = ? {scope}",
+            [board, stage_column] + scope_params
+        ))
+        for item_id, name in conn.execute(f"SELECT id, name FROM {board} {id_scope}", scope_params):
+            items.append({
+                'board': board, 'item_id': item_id, 'name': name,
+                'email': emails.get(item_id, ""),
+                'stage_date': stage_dates.get(item_id) or None,
+            })
+    return items
+
+
+def read_funnel_links(conn):
+    """item_links rows between funnel items, as (board, item_id, linked_board, linked_item_id)"""
+    return conn.execute(f'''
+        SELECT board, item_id, linked_board, linked_item_id FROM item_links
+        WHERE linked_board IN ({', '.join('?' * len(FUNNEL_BOARDS))})
+    ''', FUNNEL_BOARDS).fetchall()
+
+
+def lead_identity_rows(items, lead_ids):
+    """lead_identity rows (dicts) for funnel items and their resolved lead ids"""
+    return [
+        {'board': item['board'], 'item_id': item['item_id'], 'lead_id': lead_ids[(item['board'], item['item_id'])],
+         'stage_date': item['stage_date'], 'name': item['name'], 'name_key': name_key(item['name']),
+         'email': _email_key(item['email'])}
+        for item in items
+    ]
+
+
+def _write_rows(conn, rows):
+    conn.executemany('''
+        INSERT OR REPLACE INTO lead_identity (board, item_id, lead_id, stage_date, name, name_key, email)
+        VALUES (:board, :item_id, :lead_id, :stage_date, :name, :name_key, :email)
+    ''', rows)
+
+
+def rebuild_lead_identity(conn):
+    """Recompute lead_identity from the funnel boards, item_columns and item_links (caller commits).
+    Returns the number of items indexed."""
+    items = read_funnel_items(conn)
+    rows = lead_identity_rows(items, resolve_lead_ids(items, read_funnel_links(conn)))
+    conn.execute("DELETE FROM lead_identity")
+    _write_rows(conn, rows)
+    return len(rows)
+
+
+def update_lead_identity(conn, changed):
+    """Re-resolve the leads of changed funnel items, (board, item_id) pairs a publish upserted
+    (caller commits). Returns the number of items re-indexed.
+
+    A lead is a connected group of items, so only the leads the changed items belonged to, and
+    the leads they now link to, are linked from or share an email with, can change; every other
+    row is kept. Deleted items need rebuild_lead_identity.
+    """
+    changed = [(board, item_id) for board, item_id in changed if board in FUNNEL_BOARDS]
+    if not changed:
+        return 0
+    changed_items = read_funnel_items(conn, changed)
+    emails = sorted({_email_key(item['email']) for item in changed_items} - {""})
+
+    # lead_identity_keys holds the changed keys (staged by read_funnel_items)
+    lead_ids = {row[0] for row in conn.execute(f'''
+        SELECT li.lead_id FROM lead_identity li
+        JOIN lead_identity_keys k ON k.board = li.board AND k.item_id = li.item_id
+        UNION
+        SELECT li.lead_id FROM lead_identity_keys k
+        JOIN item_links l ON l.board = k.board AND l.item_id = k.item_id
+        JOIN lead_identity li ON li.board = l.linked_board AND li.item_id = l.linked_item_id
+        UNION
+        SELECT li.lead_id FROM lead_identity_keys k
+        JOIN item_links l ON l.linked_item_id = k.item_id AND l.linked_board = k.board
+        JOIN lead_identity li ON li.board = l.board AND li.item_id = l.item_id
+        UNION
+        SELECT lead_id FROM lead_identity WHERE email IN ({', '.join('?' * len(emails))})
+    ''', emails)}
+    affected = set(changed)
+    for lead_id in lead_ids:
+        affected.update(conn.execute(
+            "SELECT board, item_id FROM lead_identity WHERE lead_id = ?", (lead_id,)
+        ).fetchall())
+
+    items = read_funnel_items(conn, sorted(affected))
+    links = conn.execute('''
+        SELECT l.board, l.item_id, l.linked_board, l.linked_item_id FROM item_links l
+        JOIN lead_identity_keys k ON k.board = l.board AND k.item_id = l.item_id
+    ''').fetchall()
+    rows = lead_identity_rows(items, resolve_lead_ids(items, links))
+    conn.execute('''
+        DELETE FROM lead_identity
+        WHERE EXISTS (SELECT 1 FROM lead_identity_keys k WHERE k.board = lead_identity.board AND k.item_id = lead_identity.item_id)
+    ''')
+    _write_rows(conn, rows)
+    return len(rows)
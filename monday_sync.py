@@ -0,0 +1,779 @@
+"""
+Monday.com board sync shared by refresh_database.py and the Database Refresh page.
+
+Boards are synced either fully (every item, then items missing from Monday are
+deleted) or incrementally (only items updated since the board's high-water mark,
+upserted in place). Incremental runs fall back to a full reconciliation at least
+every FULL_SYNC_INTERVAL so deletions are picked up.
+
+sync_boards fetches boards concurrently. All requests share one ComplexityBudget,
+which tracks the complexity budget Monday.com reports on every response and
+pauses every worker when Monday asks us to retry later, so total wall time is
+bounded by the API budget rather than fixed sleeps.
+
+monday_data.db runs in WAL mode and every refresh is published in a single
+transaction, so dashboards never block on the writer and never see a partially
+written board.
+
+Fetched pages are staged in sync_pages with the cursor for the next page, so a
+board whose fetch fails part way resumes from its last good page on the next run.
+
+Items are fetched with only the columns the dashboards read (board_columns.py),
+resolved against each board's column list; columns="all" fetches every column
+for audits.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import http_client
+from database_utils import (
+    BOARD_TABLES,
+    bump_data_generation,
+    configure_ingest_connection,
+    enable_wal,
+    serialize_column_values,
+    migrate_column_values_to_json,
+    create_item_columns_table,
+    save_item_columns,
+    create_item_links_table,
+    save_item_links,
+    resolve_item_link_boards,
+    backfill_item_links,
+)
+from board_columns import resolve_board_columns
+from sales_facts import create_sales_facts_table, rebuild_sales_facts
+from lead_identity import FUNNEL_BOARDS, init_lead_identity, rebuild_lead_identity, update_lead_identity
+
+MONDAY_API_URL = "https://api.monday.com/v2"
+
+# Run a full reconciliation (to pick up deleted items) at least this often
+FULL_SYNC_INTERVAL = timedelta(hours=24)
+
+# The UPDATED_AT rule compares whole dates, so re-read from the day before the high-water mark
+INCREMENTAL_OVERLAP = timedelta(days=1)
+
+MAX_PAGES = 50
+MAX_RETRIES = 5
+
+# Monday.com cursors expire 60 minutes after the first page; only resume well within that
+CURSOR_TTL = timedelta(minutes=55)
+
+# Monday.com's per-minute complexity budget for API tokens, used until a response reports the real one
+DEFAULT_COMPLEXITY_BUDGET = 5_000_000
+COMPLEXITY_WINDOW_SECONDS = 60
+
+# Seconds to wait for another board's write to finish before "database is locked"
+DB_LOCK_TIMEOUT = 60
+
+# Items per page. With every column, Sales board pages are kept smaller
+PAGE_LIMIT = 500
+FULL_COLUMNS_SALES_PAGE_LIMIT = 200
+
+# Every column (columns="all")
+ITEM_FIELDS = """
+    id
+    name
+    updated_at
+    column_values {
+        id
+        text
+        value
+        type
+        ... on BoardRelationValue {
+            linked_item_ids
+            display_value
+            linked_items {
+                id
+                name
+            }
+        }
+    }
+"""
+
+
+def build_item_fields(column_ids=None):
+    """Item fields for items_page, with column_values limited to column_ids (None = ITEM_FIELDS)"""
+    if column_ids is None:
+        return ITEM_FIELDS
+    ids = ", ".join(json.dumps(column_id) for column_id in column_ids)
+    return f"""
+    id
+    name
+    updated_at
+    column_values(ids: [{ids}]) {{
+        id
+        text
+        value
+        type
+        ... on BoardRelationValue {{
+            linked_item_ids
+            display_value
+        }}
+    }}
+"""
+
+
+class ComplexityBudget:
+    """Token bucket over Monday.com's complexity budget, shared by concurrent board fetches.
+
+    acquire() blocks until the remaining budget covers the estimated cost of a query (or
+    the budget window resets); release() updates the bucket from the complexity block
+    Monday.com returns. pause() stops every worker until retry_in_seconds has passed.
+    """
+
+    def __init__(self, budget=DEFAULT_COMPLEXITY_BUDGET):
+        self._cond = threading.Condition()
+        self.budget = budget
+        self.remaining = budget
+        self.reset_at = None
+        self.paused_until = 0.0
+        self.reserved = 0
+        self.max_query_cost = 0
+
+    def _refill_if_reset(self, now):
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.budget
+            self.reset_at = None
+
+    def acquire(self, cost=None):
+        """Reserve budget for one query; cost defaults to the most expensive query seen so far"""
+        with self._cond:
+            if cost is None:
+                cost = self.max_query_cost
+            while True:
+                now = time.monotonic()
+                self._refill_if_reset(now)
+                if now < self.paused_until:
+                    self._cond.wait(self.paused_until - now)
+                    continue
+                # A query larger than the whole budget can only run on a fresh window
+                if self.remaining - self.reserved >= min(cost, self.budget):
+                    self.reserved += cost
+                    return cost
+                wait = (self.reset_at - now) if self.reset_at is not None else COMPLEXITY_WINDOW_SECONDS
+                self._cond.wait(max(wait, 0.1))
+
+    def release(self, reserved, complexity=None):
+        """Return a reservation and record the budget Monday.com reported for the query"""
+        with self._cond:
+            self.reserved = max(0, self.reserved - reserved)
+            if complexity:
+                query_cost = complexity.get('query') or 0
+                self.max_query_cost = max(self.max_query_cost, query_cost)
+                after = complexity.get('after')
+                if after is not None:
+                    before = complexity.get('before')
+                    if before is not None and before > self.budget:
+                        self.budget = before
+                    self.remaining = after
+                    reset_in = complexity.get('reset_in_x_seconds')
+                    self.reset_at = time.monotonic() + (reset_in if reset_in is not None else COMPLEXITY_WINDOW_SECONDS)
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """Stop all workers from sending queries for the next `seconds` seconds"""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+
+def init_monday_database(db_path):
+    """Create board tables, item_columns, item_links, sales_facts, lead_identity and board_sync_state
+    if missing, and migrate legacy rows"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    # WAL lets dashboards read the last committed snapshot while a refresh writes
+    enable_wal(conn)
+
+    for table_name in BOARD_TABLES:
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                id TEXT PRIMARY KEY,
+                name TEXT,
+                board_type TEXT,
+                column_values TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    # Normalized per-column table so dashboards can read only the columns they need
+    create_item_columns_table(cursor)
+    # Connect boards links, indexed from both ends for cross-board lookups
+    create_item_links_table(cursor)
+    backfill_item_links(conn)
+    create_sales_facts_table(cursor)
+    # One lead id per lead across the funnel boards (rebuilt when its matching rules change)
+    if init_lead_identity(conn):
+        bump_data_generation(conn)
+
+    # Pages of interrupted fetches, so the next run resumes instead of starting over
+    create_sync_staging_tables(cursor)
+
+    # Per-board high-water mark for incremental syncs
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS board_sync_state (
+            board TEXT PRIMARY KEY,
+            high_water_mark TEXT,
+            last_full_sync TIMESTAMP,
+            last_sync TIMESTAMP
+        )
+    ''')
+
+    conn.commit()
+    conn.close()
+
+    # Rewrite any legacy Python-repr column_values rows as JSON (no-op once done)
+    migrate_column_values_to_json(db_path)
+
+
+def create_sync_staging_tables(cursor):
+    """Create sync_checkpoint (per-board resume cursor) and sync_pages (staged page items)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_checkpoint (
+            board TEXT PRIMARY KEY,
+            anchor TEXT,
+            next_cursor TEXT,
+            pages INTEGER,
+            anchored_at TIMESTAMP,
+            updated_at TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_pages (
+            board TEXT,
+            page INTEGER,
+            items TEXT,
+            PRIMARY KEY (board, page)
+        )
+    ''')
+
+
+def _fetch_anchor(updated_since, column_ids=None):
+    """Identifies what a staged fetch was paging through: the whole board or one incremental
+    window, and the columns requested"""
+    anchor = updated_since.isoformat() if updated_since else "full"
+    if column_ids is None:
+        return f"{anchor}|all"
+    digest = hashlib.sha1(",".join(column_ids).encode()).hexdigest()[:12]
+    return f"{anchor}|{digest}"
+
+
+def load_checkpoint(conn, table_name, anchor, now=None):
+    """Return (items, next_cursor, pages, anchored_at) staged by an interrupted fetch of anchor, or None.
+
+    Staging for another anchor, a finished fetch or a cursor older than CURSOR_TTL is cleared.
+    """
+    row = conn.execute(
+        "SELECT anchor, next_cursor, pages, anchored_at FROM sync_checkpoint WHERE board = ?",
+        (table_name,)
+    ).fetchone()
+    if not row:
+        return None
+
+    saved_anchor, next_cursor, pages, anchored_at = row
+    age = (now or datetime.now()) - (_parse_timestamp(anchored_at) or datetime.min)
+    if saved_anchor != anchor or not next_cursor or age >= CURSOR_TTL:
+        clear_checkpoint(conn, table_name)
+        conn.commit()
+        return None
+
+    items = []
+    for (page_items,) in conn.execute("SELECT items FROM sync_pages WHERE board = ? ORDER BY page", (table_name,)):
+        items.extend(json.loads(page_items))
+    return items, next_cursor, pages, anchored_at
+
+
+def save_checkpoint_page(conn, table_name, anchor, page, items, next_cursor, anchored_at):
+    """Stage one fetched page and the cursor for the page after it (commits)"""
+    conn.execute(
+        "INSERT OR REPLACE INTO sync_pages (board, page, items) VALUES (?, ?, ?)",
+        (table_name, page, json.dumps(items, separators=(',', ':')))
+    )
+    conn.execute('''
+        INSERT OR REPLACE INTO sync_checkpoint (board, anchor, next_cursor, pages, anchored_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (table_name, anchor, next_cursor, page, anchored_at, datetime.now().isoformat()))
+    conn.commit()
+
+
+def clear_checkpoint(conn, table_name):
+    """Drop a board's staged pages and resume cursor (caller commits)"""
+    conn.execute("DELETE FROM sync_pages WHERE board = ?", (table_name,))
+    conn.execute("DELETE FROM sync_checkpoint WHERE board = ?", (table_name,))
+
+
+def _is_cursor_expired(error):
+    """Whether a post_query error says the page cursor is no longer valid"""
+    message = str(error).lower()
+    return 'cursor' in message and ('expired' in message or 'invalid' in message)
+
+
+def get_sync_state(conn, table_name):
+    """Return the board's sync state row as a dict, or None if it has never been synced"""
+    row = conn.execute(
+        "SELECT high_water_mark, last_full_sync, last_sync FROM board_sync_state WHERE board = ?",
+        (table_name,)
+    ).fetchone()
+    if not row:
+        return None
+    return {'high_water_mark': row[0], 'last_full_sync': row[1], 'last_sync': row[2]}
+
+
+def _parse_timestamp(value):
+    """Parse an ISO timestamp as stored by Monday.com ('...Z') or by this module"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def choose_sync_mode(state, now=None):
+    """'incremental' when the board has a high-water mark and a recent full sync, else 'full'"""
+    now = now or datetime.now()
+    if not state or not state.get('high_water_mark'):
+        return "full"
+    last_full_sync = _parse_timestamp(state.get('last_full_sync'))
+    if not last_full_sync or now - last_full_sync >= FULL_SYNC_INTERVAL:
+        return "full"
+    return "incremental"
+
+
+def build_items_query(board_id, limit, cursor=None, updated_since=None, column_ids=None):
+    """Build the items_page query for the first page (optionally filtered by updated date) or a cursor page.
+
+    column_ids limits the column values returned (None = every column).
+    """
+    if cursor:
+        page_args = f'limit: {limit}, cursor: "{cursor}"'
+    elif updated_since:
+        # The cursor returned by a filtered first page keeps the filter for later pages
+        page_args = (
+            f'limit: {limit}, query_params: {{rules: [{{column_id: "__last_updated__", '
+            f'compare_value: ["EXACT", "{updated_since.strftime("%Y-%m-%d")}"], '
+            f'operator: greater_than_or_equals, compare_attribute: "UPDATED_AT"}}]}}'
+        )
+    else:
+        page_args = f'limit: {limit}'
+
+    return f"""
+    query {{
+        complexity {{
+            before
+            after
+            query
+            reset_in_x_seconds
+        }}
+        boards(ids: [{board_id}]) {{
+            items_page({page_args}) {{
+                cursor
+                items {{
+                    {build_item_fields(column_ids)}
+                }}
+            }}
+        }}
+    }}
+    """
+
+
+def post_query(query, api_token, label, timeout=120, log=print, budget=None):
+    """POST a GraphQL query, retrying rate limit, concurrency and internal server errors.
+
+    Connection errors and HTTP 429/5xx are retried by http_client. With a shared ComplexityBudget the query waits for budget before it is sent, and
+    rate limit errors pause every worker for Monday's retry_in_seconds.
+    Returns (data, error) where error is None on success.
+    """
+    headers = {
+        "Authorization": api_token,
+        "Content-Type": "application/json",
+    }
+    budget = budget or ComplexityBudget()
+
+    retry_count = 0
+    while True:
+        reserved = budget.acquire()
+        complexity = None
+        try:
+            response = http_client.post(MONDAY_API_URL, json={"query": query}, headers=headers,
+                                        timeout=timeout, idempotent=True)
+
+            if response.status_code == 401:
+                return None, f"401 Unauthorized: Check API token for {label}"
+
+            data = response.json()
+            complexity = (data.get("data") or {}).get("complexity")
+        except Exception as e:
+            return None, f"Error after {http_client.MAX_RETRIES} retries - {str(e)}"
+        finally:
+            budget.release(reserved, complexity)
+
+        if "errors" not in data:
+            return data, None
+
+        errors = data['errors']
+        is_rate_limit = False
+        is_internal_error = False
+        retry_seconds = 0
+
+        for error in errors:
+            extensions = error.get('extensions', {})
+            status_code = extensions.get('status_code')
+            code = extensions.get('code', '')
+            error_code = extensions.get('error_code', '')
+            msg = (error.get('message') or '').lower()
+
+            # 429 (rate limit), LIMIT_EXCEEDED (complexity/concurrency): wait as long as Monday asks
+            if (status_code == 429 or
+                    'RATE_LIMIT' in str(code) or
+                    'LIMIT_EXCEEDED' in str(code)):
+                is_rate_limit = True
+                retry_seconds = max(retry_seconds, extensions.get('retry_in_seconds', 10))
+            # 500/internal server error: transient, back off
+            elif (status_code == 500 or
+                    code == 'INTERNAL_SERVER_ERROR' or
+                    'INTERNAL_SERVER_ERROR' in str(error_code) or
+                    'internal server error' in msg):
+                is_internal_error = True
+
+        if (is_rate_limit or is_internal_error) and retry_count < MAX_RETRIES - 1:
+            retry_count += 1
+            if is_rate_limit:
+                log(f"⏳ Rate limit hit for {label}, pausing all boards {retry_seconds}s before retry {retry_count}/{MAX_RETRIES - 1}...")
+                budget.pause(retry_seconds)
+            else:
+                wait_time = 10 + (retry_count * 5)
+                log(f"⏳ Monday.com internal server error for {label}, waiting {wait_time}s before retry {retry_count}/{MAX_RETRIES - 1}...")
+                time.sleep(wait_time)
+            continue
+
+        # Not retryable or max retries reached
+        return None, f"GraphQL errors for {label}: {errors}"
+
+
+def build_columns_query(board_id):
+    """Build the query for a board's column ids and types"""
+    return f"""
+    query {{
+        complexity {{
+            before
+            after
+            query
+            reset_in_x_seconds
+        }}
+        boards(ids: [{board_id}]) {{
+            columns {{
+                id
+                type
+            }}
+        }}
+    }}
+    """
+
+
+def fetch_board_column_ids(board_id, table_name, api_token, budget=None, log=print):
+    """Column ids to request for a board, from its column list and its board_columns.py manifest.
+
+    Returns (column_ids, error); column_ids is None when the board has no manifest entry.
+    """
+    data, error = post_query(build_columns_query(board_id), api_token, f"{table_name} columns",
+                             timeout=30, log=log, budget=budget)
+    if error:
+        return None, error
+    boards = data.get("data", {}).get("boards", [])
+    if not boards:
+        return None, f"Board {board_id} not found"
+    board_columns = boards[0].get("columns") or []
+    column_ids = resolve_board_columns(table_name, board_columns)
+    if column_ids is not None:
+        log(f"📐 {table_name}: fetching {len(column_ids)} of {len(board_columns)} columns")
+    return column_ids, None
+
+
+def fetch_board_items(board_id, table_name, api_token, updated_since=None, budget=None, log=print, db_path=None,
+                      column_ids=None):
+    """Fetch a board's items page by page (only items updated since updated_since when given).
+
+    column_ids limits the columns fetched (None = every column).
+
+    With db_path, each page and the cursor for the next one are staged (see
+    save_checkpoint_page), and a fetch interrupted by an error resumes from its last
+    good page. If the saved cursor has expired, the fetch re-anchors from page 1.
+    Returns (items, error). On error the partial result stays staged for the next run.
+    """
+    # Sales board has the most columns per item - smaller pages unless they are projected
+    if column_ids is None and table_name == 'sales_board':
+        limit = FULL_COLUMNS_SALES_PAGE_LIMIT
+    else:
+        limit = PAGE_LIMIT
+    timeout = 120
+
+    anchor = _fetch_anchor(updated_since, column_ids)
+    anchored_at = datetime.now().isoformat()
+    all_items = []
+    cursor = None
+    page_count = 0
+
+    conn = sqlite3.connect(db_path, timeout=DB_LOCK_TIMEOUT) if db_path else None
+    try:
+        checkpoint = load_checkpoint(conn, table_name, anchor) if conn else None
+        if checkpoint:
+            all_items, cursor, page_count, anchored_at = checkpoint
+            log(f"↩️ Resuming {table_name} at page {page_count + 1} ({len(all_items)} items already fetched)")
+
+        while page_count < MAX_PAGES:
+            query = build_items_query(board_id, limit, cursor=cursor, updated_since=updated_since,
+                                      column_ids=column_ids)
+            data, error = post_query(query, api_token, table_name, timeout=timeout, log=log, budget=budget)
+            if error and cursor and _is_cursor_expired(error):
+                # Cursors can't be recreated - start the board over from a fresh first page
+                log(f"↩️ Cursor for {table_name} expired at page {page_count + 1}, re-anchoring from page 1")
+                if conn:
+                    clear_checkpoint(conn, table_name)
+                    conn.commit()
+                anchored_at = datetime.now().isoformat()
+                all_items, cursor, page_count = [], None, 0
+                continue
+            if error:
+                return None, error
+
+            page_count += 1
+            boards = data.get("data", {}).get("boards", [])
+            if not boards:
+                break
+
+            items_page = boards[0].get("items_page", {})
+            items = items_page.get("items", [])
+
+            if not items:
+                break
+
+            all_items.extend(items)
+            cursor = items_page.get("cursor")
+            if conn:
+                save_checkpoint_page(conn, table_name, anchor, page_count, items, cursor, anchored_at)
+
+            if not cursor:
+                break
+    finally:
+        if conn:
+            conn.close()
+
+    return all_items, None
+
+
+def upsert_board_items(conn, table_name, items, board_type, prune=False):
+    """Upsert items into the board table, item_columns and item_links (caller commits).
+
+    With prune=True, items is the complete board and rows not in it are deleted.
+    Returns the number of deleted rows.
+    """
+    now = datetime.now()
+    conn.executemany(f'''
+        INSERT INTO {table_name} (id, name, board_type, column_values, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            name = excluded.name,
+            board_type = excluded.board_type,
+            column_values = excluded.column_values,
+            updated_at = excluded.updated_at
+    ''', [
+        (item.get("id", ""), item.get("name", ""), board_type,
+         serialize_column_values(item.get("column_values", [])), now)
+        for item in items
+    ])
+
+    save_item_columns(conn, table_name, items, replace_board=prune)
+    save_item_links(conn, table_name, items, replace_board=prune)
+
+    deleted = 0
+    if prune:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS synced_item_ids (id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM synced_item_ids")
+        conn.executemany("INSERT OR IGNORE INTO synced_item_ids (id) VALUES (?)",
+                         [(item.get("id", ""),) for item in items])
+        deleted = conn.execute(
+            f"DELETE FROM {table_name} WHERE id NOT IN (SELECT id FROM synced_item_ids)"
+        ).rowcount
+    return deleted
+
+
+def save_sync_state(conn, table_name, items, mode, previous_state):
+    """Advance the board's high-water mark to the newest item updated_at seen (caller commits)"""
+    now = datetime.now().isoformat()
+    high_water_mark = (previous_state or {}).get('high_water_mark')
+    item_marks = [item.get('updated_at') for item in items if item.get('updated_at')]
+    if item_marks:
+        newest = max(item_marks, key=lambda v: _parse_timestamp(v) or datetime.min)
+        if not high_water_mark or (_parse_timestamp(newest) or datetime.min) > (_parse_timestamp(high_water_mark) or datetime.min):
+            high_water_mark = newest
+    if not high_water_mark and mode == "full":
+        high_water_mark = now
+
+    last_full_sync = now if mode == "full" else (previous_state or {}).get('last_full_sync')
+    conn.execute('''
+        INSERT OR REPLACE INTO board_sync_state (board, high_water_mark, last_full_sync, last_sync)
+        VALUES (?, ?, ?, ?)
+    ''', (table_name, high_water_mark, last_full_sync, now))
+
+
+def fetch_board(board_id, table_name, api_token, db_path, mode="auto", board_type=None, budget=None, log=print,
+                columns="manifest"):
+    """Fetch phase of a board sync: pick the sync mode from the board's state and download items.
+
+    mode is 'full', 'incremental' or 'auto' (incremental unless the board has no
+    high-water mark or its last full sync is older than FULL_SYNC_INTERVAL).
+    columns is 'manifest' (only the columns in board_columns.py) or 'all'.
+    Returns a dict for publish_boards with table_name, board_type, mode, state, items and error.
+    """
+    conn = sqlite3.connect(db_path, timeout=DB_LOCK_TIMEOUT)
+    try:
+        state = get_sync_state(conn, table_name)
+    finally:
+        conn.close()
+
+    if mode == "auto":
+        mode = choose_sync_mode(state)
+    elif mode == "incremental" and not (state and state.get('high_water_mark')):
+        mode = "full"
+
+    updated_since = None
+    if mode == "incremental":
+        updated_since = _parse_timestamp(state['high_water_mark']) - INCREMENTAL_OVERLAP
+
+    column_ids, error = None, None
+    if columns == "manifest":
+        column_ids, error = fetch_board_column_ids(board_id, table_name, api_token, budget=budget, log=log)
+
+    items = None
+    if not error:
+        items, error = fetch_board_items(board_id, table_name, api_token, updated_since=updated_since,
+                                         budget=budget, log=log, db_path=db_path, column_ids=column_ids)
+
+    # An empty full fetch is almost certainly an API problem - never prune the whole board
+    if not error and mode == "full" and not items:
+        error = "No items returned from API"
+
+    return {
+        'table_name': table_name,
+        'board_type': board_type or table_name,
+        'mode': mode,
+        'state': state,
+        'items': items or [],
+        'error': error,
+    }
+
+
+def publish_boards(db_path, fetched_boards):
+    """Write every successfully fetched board in one transaction.
+
+    The database runs in WAL mode, so dashboards keep reading the previous snapshot
+    until the commit and then see all boards' new data at once - never a half-written
+    or empty table. Writing sales_board also rebuilds sales_facts in that transaction, and
+    lead_identity is updated for the funnel items written (rebuilt after a full sync of a
+    funnel board, which can delete items).
+    Returns {table_name: result} with mode, items, deleted and error.
+    """
+    results = {
+        fetched['table_name']: {'mode': fetched['mode'], 'items': len(fetched['items']),
+                                'deleted': 0, 'error': fetched['error']}
+        for fetched in fetched_boards
+    }
+    to_write = [fetched for fetched in fetched_boards if not fetched['error']]
+    if not to_write:
+        return results
+
+    # One connection for every board, so the shared item_columns statements are prepared once
+    conn = sqlite3.connect(db_path, timeout=DB_LOCK_TIMEOUT, isolation_level=None)
+    try:
+        configure_ingest_connection(conn)
+        conn.execute("BEGIN IMMEDIATE")
+        for fetched in to_write:
+            table_name = fetched['table_name']
+            results[table_name]['deleted'] = upsert_board_items(
+                conn, table_name, fetched['items'], fetched['board_type'],
+                prune=(fetched['mode'] == "full")
+            )
+            save_sync_state(conn, table_name, fetched['items'], fetched['mode'], fetched['state'])
+            clear_checkpoint(conn, table_name)
+        resolve_item_link_boards(conn)
+        # Any funnel board can add, move or rename a lead's items
+        written_funnel = [fetched for fetched in to_write if fetched['table_name'] in FUNNEL_BOARDS]
+        if any(fetched['mode'] == "full" for fetched in written_funnel):
+            rebuild_lead_identity(conn)
+        elif written_funnel:
+            update_lead_identity(conn, [
+                (fetched['table_name'], item.get("id", "")) for fetched in written_funnel for item in fetched['items']
+            ])
+        if 'sales_board' in results and not results['sales_board']['error']:
+            # Derived revenue facts are published in the same snapshot as the board
+            rebuild_sales_facts(conn)
+        bump_data_generation(conn)
+        conn.execute("COMMIT")
+    except Exception as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        for fetched in to_write:
+            results[fetched['table_name']]['error'] = f"Database write failed: {str(e)}"
+    finally:
+        conn.close()
+    return results
+
+
+def sync_board(board_id, table_name, api_token, db_path, mode="auto", board_type=None, budget=None, log=print,
+               columns="manifest"):
+    """Fetch and publish one board. Returns a dict with mode, items (fetched), deleted and error."""
+    fetched = fetch_board(board_id, table_name, api_token, db_path,
+                          mode=mode, board_type=board_type, budget=budget, log=log, columns=columns)
+    return publish_boards(db_path, [fetched])[table_name]
+
+
+def fetch_boards(boards, api_token, db_path, mode="auto", max_workers=None, log=print, columns="manifest"):
+    """Fetch phase for several boards, concurrently under one shared ComplexityBudget.
+
+    boards is a list of (board_id, table_name, board_type). Returns the fetch_board
+    dicts, ready for publish_boards.
+    """
+    budget = ComplexityBudget()
+    fetched_boards = []
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(boards) or 1) as executor:
+        futures = {
+            executor.submit(fetch_board, board_id, table_name, api_token, db_path,
+                            mode=mode, board_type=board_type, budget=budget, log=log,
+                            columns=columns): table_name
+            for board_id, table_name, board_type in boards
+        }
+        for future in as_completed(futures):
+            table_name = futures[future]
+            try:
+                fetched_boards.append(future.result())
+            except Exception as e:
+                fetched_boards.append({'table_name': table_name, 'board_type': table_name, 'mode': mode,
+                                       'state': None, 'items': [], 'error': str(e)})
+    return fetched_boards
+
+
+def sync_boards(boards, api_token, db_path, mode="auto", max_workers=None, on_result=None, log=print,
+                columns="manifest"):
+    """Fetch several boards concurrently (see fetch_boards), then publish them together.
+
+    All successfully fetched boards are written in a single transaction (see
+    publish_boards). on_result(table_name, result) is called from the calling thread
+    for each board (so Streamlit UI updates are safe). columns is 'manifest' or 'all'
+    (see fetch_board). Returns {table_name: result}.
+    """
+    fetched_boards = fetch_boards(boards, api_token, db_path, mode=mode, max_workers=max_workers,
+                                  log=log, columns=columns)
+    results = publish_boards(db_path, fetched_boards)
+    if on_result:
+        for _, table_name, _ in boards:
+            on_result(table_name, results[table_name])
+    return results
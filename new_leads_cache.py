@@ -0,0 +1,147 @@
+"""
+New Leads month cache (inputs/new_leads_current_month.json) read by the New Leads Check page.
+
+The refresh pipeline (refresh_pipeline.py) builds it from the items it just fetched;
+boards it did not re-fetch in full are read from monday_data.db.
+"""
+import json
+import os
+from datetime import date
+
+import pandas as pd
+
+from database_utils import (
+    get_new_leads_data,
+    get_discovery_call_data,
+    get_design_review_data,
+    get_sales_data,
+)
+from sales_facts import is_excluded_item_name
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inputs", "new_leads_current_month.json")
+
+# Board table -> board name shown on the New Leads Check page
+LEAD_BOARDS = {
+    'new_leads_board': "New Leads v2",
+    'discovery_call_board': "Discovery Call v2",
+    'design_review_board': "Design Review v2",
+    'sales_board': "Sales v2",
+}
+
+
+def _load_board(table_name):
+    """Lead board items from monday_data.db ("No"/"Not"/"Spam" items excluded)"""
+    if table_name == 'sales_board':
+        return (
+            get_sales_data()
+            .get("data", {})
+            .get("boards", [{}])[0]
+            .get("items_page", {})
+            .get("items", [])
+        )
+    return {
+        'new_leads_board': get_new_leads_data,
+        'discovery_call_board': get_discovery_call_data,
+        'design_review_board': get_design_review_data,
+    }[table_name]()
+
+
+def _format_leads_data(leads_data):
+    if not leads_data:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(
+        [
+            {
+                "Item Name": i.get("name", ""),
+                "Current Board": i.get("board_name", ""),
+                "Created At": i.get("created_at", ""),
+                "Date Created (Custom)": next(
+                    (
+                        c.get("text")
+                        for c in (i.get("column_values") or [])
+                        if (
+                            c.get("type") == "date"
+                            and c.get("text")
+                            and "new lead form fill date"
+                            not in (c.get("id") or "").lower()
+                        )
+                    ),
+                    None,
+                ),
+            }
+            for i in leads_data
+        ]
+    )
+
+    df["Effective Date"] = pd.to_datetime(df["Date Created (Custom)"], errors="coerce")
+    mask = df["Effective Date"].isna()
+    if mask.any():
+        df.loc[mask, "Effective Date"] = pd.to_datetime(
+            df.loc[mask, "Created At"], errors="coerce"
+        )
+
+    df["Effective Date Date"] = df["Effective Date"].dt.date
+    return df
+
+
+def build_new_leads_cache(boards, today=None):
+    """Current-month cache data from {table_name: items} for the LEAD_BOARDS, or None if there are no leads"""
+    today = today or date.today()
+    month_start = today.replace(day=1)
+
+    # Combined leads like the page builds them
+    leads_data = [
+        {**item, "board_name": board_name}
+        for table_name, board_name in LEAD_BOARDS.items()
+        for item in boards.get(table_name) or []
+        if not is_excluded_item_name(item.get("name"))
+    ]
+
+    df = _format_leads_data(leads_data)
+    if df.empty:
+        return None
+
+    # Filter to current month
+    df_current = df[(df["Effective Date Date"] >= month_start) & (df["Effective Date Date"] <= today)].copy()
+
+    # Pre-calculate daily counts for instant access
+    daily_counts = df_current.groupby("Effective Date Date").size().to_dict()
+    # Convert date objects to strings for JSON serialization
+    daily_counts_str = {str(k): int(v) for k, v in daily_counts.items()}
+
+    # Convert datetime columns to strings for JSON serialization
+    df_current["Effective Date"] = df_current["Effective Date"].astype(str)
+    df_current["Effective Date Date"] = df_current["Effective Date Date"].astype(str)
+
+    records = df_current.to_dict(orient="records")
+    return {
+        "records": records,
+        "daily_counts": daily_counts_str,
+        "month_start": str(month_start),
+        "cached_date": str(today),
+        "total_records": len(records)
+    }
+
+
+def write_new_leads_cache(boards=None, cache_path=None):
+    """Build and write the cache (to CACHE_PATH by default). boards maps table_name -> items
+    already in memory; lead boards missing from it are read from the database.
+    Returns (success, message).
+    """
+    cache_path = cache_path or CACHE_PATH
+    boards = dict(boards or {})
+    for table_name in LEAD_BOARDS:
+        if table_name not in boards:
+            boards[table_name] = _load_board(table_name)
+
+    cache_data = build_new_leads_cache(boards)
+    if cache_data is None:
+        return True, "No data to cache."
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(cache_data, f, ensure_ascii=False)
+
+    return True, (f"Cached {cache_data['total_records']} records with {len(cache_data['daily_counts'])} "
+                  f"daily counts to {cache_path}")
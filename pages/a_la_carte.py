@@ -14,8 +14,8 @@ from copy import copy
 from io import BytesIO
 
 import streamlit as st
-import requests
 
+import http_client
 from google_sheets_uploader import (
     GoogleSheetsUploadError,
     upload_workbook_to_google_sheet,
@@ -3566,18 +3566,20 @@ def build_workbook_bytes(
     return buffer.read(), total_dev, total_optional
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def get_sales_records():
-    """Get sales records from monday.com for dropdown selection."""
+    """Get sales records from monday.com for dropdown selection (sorted once per refresh, shared read-only)."""
     try:
-        from database_utils import get_sales_data
+        from board_datasets import get_dataset, get_sales_data
         
-        sales_data = get_sales_data()
-        items = sales_data.get("data", {}).get("boards", [{}])[0].get("items_page", {}).get("items", [])
+        def build_records():
+            sales_data = get_sales_data()
+            items = sales_data.get("data", {}).get("boards", [{}])[0].get("items_page", {}).get("items", [])
+            
+            # List of (item_id, item_name) tuples
+            records = [(item.get("id"), item.get("name", "")) for item in items if item.get("name")]
+            return sorted(records, key=lambda x: x[1])  # Sort by name
         
-        # Return list of (item_id, item_name) tuples
-        records = [(item.get("id"), item.get("name", "")) for item in items if item.get("name")]
-        return sorted(records, key=lambda x: x[1])  # Sort by name
+        return get_dataset("sales_records", build_records)
     except Exception as e:
         st.warning(f"Could not load sales records: {e}")
         return []
@@ -3615,7 +3617,7 @@ def update_monday_item_a_la_carte_link(item_id: str, workbook_url: str) -> bool:
             "Content-Type": "application/json",
         }
         
-        response = requests.post(url, json={"query": query}, headers=headers, timeout=30)
+        response = http_client.post(url, json={"query": query}, headers=headers, timeout=30)
         data = response.json()
         
         if "errors" in data:
@@ -3681,7 +3683,7 @@ def update_monday_item_a_la_carte_link(item_id: str, workbook_url: str) -> bool:
             }}
             """
         
-        response = requests.post(url, json={"query": mutation}, headers=headers, timeout=30)
+        response = http_client.post(url, json={"query": mutation}, headers=headers, timeout=30)
         result = response.json()
         
         if "errors" in result:
@@ -3953,7 +3955,7 @@ def get_board_id_from_item(item_id: str) -> str | None:
             "Content-Type": "application/json",
         }
         
-        response = requests.post(url, json={"query": query}, headers=headers, timeout=30)
+        response = http_client.post(url, json={"query": query}, headers=headers, timeout=30)
         data = response.json()
         
         if "errors" in data:
@@ -4002,7 +4004,7 @@ def upload_file_to_monday_item(item_id: str, board_id: str, file_bytes: bytes, f
         }}
         """
         
-        response = requests.post(url, json={"query": query}, headers=headers, timeout=30)
+        response = http_client.post(url, json={"query": query}, headers=headers, timeout=30)
         data = response.json()
         
         if "errors" in data:
@@ -4073,7 +4075,7 @@ def upload_file_to_monday_item(item_id: str, board_id: str, file_bytes: bytes, f
         }
         
         # Upload the file
-        upload_response = requests.post(
+        upload_response = http_client.post(
             file_url,
             headers={"Authorization": api_token},
             files=files_data,
@@ -3,12 +3,16 @@ import pandas as pd
 from datetime import datetime, timedelta, date
 import plotly.express as px
 import plotly.graph_objects as go
-import requests
 import json
 import os
 import sqlite3
+import sys
 import calendar
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import http_client
+from database_utils import get_calendly_events
+
 # Get current year dynamically
 CURRENT_YEAR = datetime.now().year
 
@@ -84,42 +88,11 @@ def load_calendly_credentials():
 
 def load_calendly_data_from_db():
     """Load Calendly data from SQLite database"""
-    CALENDLY_DB_PATH = "calendly_data.db"
-    
     try:
-        conn = sqlite3.connect(CALENDLY_DB_PATH)
-        cursor = conn.cursor()
-        
-        # Check if table exists and has data
-        cursor.execute("SELECT COUNT(*) FROM calendly_events")
-        count = cursor.fetchone()[0]
-        
-        if count == 0:
-            conn.close()
-            return None, "No Calendly data found in database. Please refresh Calendly data first."
-        
-        # Get all events
-        cursor.execute("""
-            SELECT uri, name, start_time, end_time, status, event_type, 
-                   invitee_name, invitee_email, updated_at
-            FROM calendly_events
-            ORDER BY start_time DESC
-        """)
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(rows, columns=[
-            'uri', 'name', 'start_time', 'end_time', 'status', 'event_type',
-            'invitee_name', 'invitee_email', 'updated_at'
-        ])
-        
-        # Keep only "TEG - Let's Chat" events (Burki dashboard shows this event type only)
-        if not df.empty and 'name' in df.columns:
-            name_lower = df['name'].astype(str).str.lower()
-            is_burki = (name_lower.str.contains("teg", na=False) & (name_lower.str.contains("let's chat", na=False) | name_lower.str.contains("lets chat", na=False)))
-            df = df[is_burki].copy()
+        # "TEG - Let's Chat" events (Burki dashboard shows this event type only), classified at refresh
+        df = get_calendly_events(categories=['lets_chat'])
+        df = df[['uri', 'name', 'start_time', 'end_time', 'status', 'event_type',
+                 'invitee_name', 'invitee_email', 'updated_at']]
         if df.empty:
             return None, "No TEG - Let's Chat events in database. Refresh Calendly data (use Burki token for this event type)."
         
@@ -152,7 +125,7 @@ def get_calendly_data():
     }
     
     # Get user info
-    user_response = requests.get('https://api.calendly.com/users/me', headers=headers)
+    user_response = http_client.get('https://api.calendly.com/users/me', headers=headers)
     if user_response.status_code != 200:
         st.error(f"Failed to get user info: {user_response.status_code}")
         return {'events': [], 'debug_info': {'error': f'User API error: {user_response.status_code}'}}
@@ -162,7 +135,7 @@ def get_calendly_data():
     user_name = user_data['resource']['name']
     
     # Get event types
-    event_types_response = requests.get('https://api.calendly.com/event_types', 
+    event_types_response = http_client.get('https://api.calendly.com/event_types', 
                                       headers=headers,
                                       params={
                                           'user': user_uri,
@@ -213,7 +186,7 @@ def get_calendly_data():
         if next_page_token:
             params['page_token'] = next_page_token
         
-        events_response = requests.get('https://api.calendly.com/scheduled_events', 
+        events_response = http_client.get('https://api.calendly.com/scheduled_events', 
                                      headers=headers,
                                      params=params)
         
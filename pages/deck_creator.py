@@ -11,10 +11,10 @@ import re
 from datetime import datetime
 from typing import Optional, Dict, List, Tuple, Any
 import base64
-import requests
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import http_client
 
 try:
     from pptx import Presentation
@@ -1748,7 +1748,7 @@ def get_board_id_from_item(item_id: str) -> str | None:
             "Content-Type": "application/json",
         }
         
-        response = requests.post(url, json={"query": query}, headers=headers, timeout=30)
+        response = http_client.post(url, json={"query": query}, headers=headers, timeout=30)
         data = response.json()
         
         if "errors" in data:
@@ -1797,7 +1797,7 @@ def update_monday_item_deck_url(item_id: str, deck_url: str) -> bool:
             "Content-Type": "application/json",
         }
         
-        response = requests.post(url, json={"query": query}, headers=headers, timeout=30)
+        response = http_client.post(url, json={"query": query}, headers=headers, timeout=30)
         data = response.json()
         
         if "errors" in data:
@@ -1862,7 +1862,7 @@ def update_monday_item_deck_url(item_id: str, deck_url: str) -> bool:
             }}
             """
         
-        response = requests.post(url, json={"query": mutation}, headers=headers, timeout=30)
+        response = http_client.post(url, json={"query": mutation}, headers=headers, timeout=30)
         result = response.json()
         
         if "errors" in result:
@@ -5,8 +5,12 @@ import plotly.express as px
 import plotly.graph_objects as go
 import sqlite3
 import os
+import sys
 import pytz
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database_utils import get_calendly_events
+
 # California timezone for displaying dates (user's timezone)
 CALIFORNIA_TZ = pytz.timezone('America/Los_Angeles')
 
@@ -56,78 +60,11 @@ def load_design_review_data_from_db():
     if not os.path.exists(CALENDLY_DB_PATH):
         return None, "Calendly database not found. Refresh Calendly data from the Database Refresh page."
     try:
-        conn = sqlite3.connect(CALENDLY_DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA table_info(calendly_events)")
-        columns = [row[1] for row in cursor.fetchall()]
-        if "source" not in columns:
-            conn.close()
-            return None, "Design Review 'source' column not in database. Refresh Calendly data from the Database Refresh page to include Design Review links."
-        cursor.execute("""
-            SELECT uri, name, start_time, end_time, status, event_type, invitee_name, invitee_email, source, updated_at
-            FROM calendly_events
-            ORDER BY start_time DESC
-        """)
-        rows = cursor.fetchall()
-        conn.close()
-        if not rows:
-            return pd.DataFrame(), None
-        df = pd.DataFrame(rows, columns=[
-            'uri', 'name', 'start_time', 'end_time', 'status', 'event_type',
-            'invitee_name', 'invitee_email', 'source', 'updated_at'
-        ])
-        # Filter to Design Review events
-        # Based on CSV export Event Type Name: "30 Minute Meeting" and "*TEG Introductory Call*"
-        # Note: Database may store names with or without asterisks, so we check both
-        if not df.empty:
-            name_str = df['name'].astype(str)
-            name_lower = name_str.str.lower()
-            
-            # Match "*TEG Introductory Call*" exactly (case-insensitive, handles asterisks)
-            # CSV: "*TEG Introductory Call*"
-            # Must contain both "teg" and "introductory" and "call"
-            is_teg_introductory_call = (
-                name_lower.str.contains('teg', na=False) &
-                name_lower.str.contains('introductory', na=False) &
-                name_lower.str.contains('call', na=False)
-            )
-            
-            # For "30 Minute Meeting": only include when Source == "Jennifer"
-            # Jennifer's actual events are named "30 Min Google Meet w/ JE", so we include those for Jennifer
-            # Check source field to identify Jennifer's events
-            if 'source' in df.columns:
-                is_jennifer_source = df['source'].astype(str).str.lower() == 'jennifer'
-                
-                # Match "30 Min Google Meet w/ JE" (Jennifer's actual event type)
-                # Only include if source is Jennifer
-                is_jennifer_30min = (
-                    name_lower.str.contains('30 min google meet', na=False) |
-                    (name_lower.str.contains('30 minute', na=False) &
-                     name_lower.str.contains('meeting', na=False) &
-                     ~name_lower.str.contains('google meet', na=False))
-                ) & is_jennifer_source
-            else:
-                is_jennifer_30min = pd.Series([False] * len(df), index=df.index)
-            
-            # Create mask for filtering
-            # Include TEG Introductory Call OR (30 Min Google Meet w/ JE with Jennifer source)
-            mask = is_teg_introductory_call | is_jennifer_30min
-            df = df[mask].copy()
-            
-            # Filter to only active events (exclude canceled)
-            if 'status' in df.columns:
-                df = df[df['status'].str.lower() == 'active'].copy()
-            
-            # Preserve existing source if present (person names like Anthony, Heather, Ian, Jennifer)
-            # Don't overwrite person names with generic labels
-            df["source"] = df["source"].fillna("").astype(str).str.strip()
-            # Remove generic labels - they should be replaced with person names from database
-            # If source is generic, clear it (person name should come from database refresh)
-            generic_labels = ["Design Review", "TEG Introductory Call", "*TEG Introductory Call*", "30 Minute Meeting", "Other"]
-            df.loc[df["source"].isin(generic_labels), "source"] = ""
-            # If source is still empty after cleaning, leave it empty (don't set to "Other")
-            # This helps identify events that need database refresh
-        
+        # Active "*TEG Introductory Call*" events and Jennifer's 30 minute meetings, classified at
+        # refresh (calendly_categories.classify_event: source is already cleaned of generic labels)
+        df = get_calendly_events(categories=['teg_introductory', 'jennifer_30min'], active_only=True)
+        df = df[['uri', 'name', 'start_time', 'end_time', 'status', 'event_type',
+                 'invitee_name', 'invitee_email', 'source', 'local_date', 'local_hour', 'updated_at']]
         if df.empty:
             return pd.DataFrame(), None
         # Calendly API uses UTC; convert to California timezone before extracting date (user's timezone)
@@ -135,12 +72,12 @@ def load_design_review_data_from_db():
         df['end_time'] = pd.to_datetime(df['end_time'], utc=True)
         df['updated_at'] = pd.to_datetime(df['updated_at'], utc=True)
         df['start_time_local'] = df['start_time'].dt.tz_convert(CALIFORNIA_TZ)
-        df['date'] = df['start_time_local'].dt.date
+        df['date'] = pd.to_datetime(df['local_date']).dt.date
         df['month'] = df['start_time_local'].dt.strftime('%B %Y')
         df['week'] = df['start_time_local'].dt.isocalendar().week
         df['year'] = df['start_time_local'].dt.year
         df['day_of_week'] = df['start_time_local'].dt.strftime('%A')
-        df['hour'] = df['start_time_local'].dt.hour
+        df['hour'] = df['local_hour']
         return df, None
     except sqlite3.Error as e:
         return None, f"Database error: {str(e)}"
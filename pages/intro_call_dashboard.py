@@ -3,13 +3,17 @@ import pandas as pd
 from datetime import datetime, timedelta, date
 import plotly.express as px
 import plotly.graph_objects as go
-import requests
 import json
 import os
 import sqlite3
+import sys
 import calendar
 import pytz
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import http_client
+from database_utils import get_calendly_events
+
 # California timezone for displaying dates (user's timezone)
 CALIFORNIA_TZ = pytz.timezone('America/Los_Angeles')
 
@@ -102,95 +106,12 @@ def load_calendly_data_from_db():
     - Burki: event name containing "TEG" and "Let's Chat" or "Lets Chat"
     - Intro Call with TEG: event name containing 'introductory' or 'intro call' or scheduling URL contains 'intro-call-with-teg'
     """
-    CALENDLY_DB_PATH = "calendly_data.db"
-    
     try:
-        conn = sqlite3.connect(CALENDLY_DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA table_info(calendly_events)")
-        columns = [row[1] for row in cursor.fetchall()]
-        has_source = "source" in columns
-        
-        cursor.execute("SELECT COUNT(*) FROM calendly_events")
-        count = cursor.fetchone()[0]
-        if count == 0:
-            conn.close()
-            return None, "No Calendly data found in database. Please refresh Calendly data first."
-        
-        if has_source:
-            cursor.execute("""
-                SELECT uri, name, start_time, end_time, status, event_type,
-                       invitee_name, invitee_email, source, updated_at
-                FROM calendly_events
-                ORDER BY start_time DESC
-            """)
-            df = pd.DataFrame(cursor.fetchall(), columns=[
-                'uri', 'name', 'start_time', 'end_time', 'status', 'event_type',
-                'invitee_name', 'invitee_email', 'source', 'updated_at'
-            ])
-        else:
-            cursor.execute("""
-                SELECT uri, name, start_time, end_time, status, event_type,
-                       invitee_name, invitee_email, updated_at
-                FROM calendly_events
-                ORDER BY start_time DESC
-            """)
-            df = pd.DataFrame(cursor.fetchall(), columns=[
-                'uri', 'name', 'start_time', 'end_time', 'status', 'event_type',
-                'invitee_name', 'invitee_email', 'updated_at'
-            ])
-            df["source"] = ""
-        conn.close()
-        
-        # Filter to Intro Call events
-        # Based on CSV export Event Type Name: "TEG - Let's Chat" and "*Intro call with TEG*"
-        # Note: Database may store names with or without asterisks, so we check both
-        if not df.empty and 'name' in df.columns:
-            name_str = df['name'].astype(str)
-            name_lower = name_str.str.lower()
-            
-            # Match "TEG - Let's Chat" exactly (case-insensitive, handles asterisks)
-            # CSV: "TEG - Let's Chat"
-            is_teg_lets_chat = (
-                name_lower.str.contains("teg", na=False) &
-                (name_lower.str.contains("let's chat", na=False) | name_lower.str.contains("lets chat", na=False))
-            )
-            
-            # Match "*Intro call with TEG*" exactly (case-insensitive, handles asterisks)
-            # CSV: "*Intro call with TEG*"
-            # Must contain "intro call" but NOT "introductory" (to exclude "*TEG Introductory Call*")
-            # Exclude "TEG Intro Call" (without asterisks, different event type)
-            is_intro_call_with_teg = (
-                name_lower.str.contains("intro call", na=False) &
-                name_lower.str.contains("teg", na=False) &
-                ~name_lower.str.contains("introductory", na=False) &
-                ~(name_lower == "teg intro call")  # Exclude exact match "TEG Intro Call"
-            )
-            
-            # Create mask for filtering
-            mask = is_teg_lets_chat | is_intro_call_with_teg
-            df = df[mask].copy()
-            
-            # Filter to only active events (exclude canceled)
-            if 'status' in df.columns:
-                df = df[df['status'].str.lower() == 'active'].copy()
-            
-            # Preserve existing source if present (person names like Ian, Anthony, Burki, etc.)
-            df["source"] = df["source"].fillna("").astype(str).str.strip()
-            # Remove generic labels - they should be replaced with person names from database
-            generic_labels = ["Intro Call with TEG", "Other", "TEG - Let's Chat", "*Intro call with TEG*"]
-            df.loc[df["source"].isin(generic_labels), "source"] = ""
-            # Only set "Burki" for TEG - Let's Chat events if source is truly empty
-            # For "*Intro call with TEG*" events, preserve person names (like Ian) - don't overwrite
-            empty_source = (df["source"] == "")
-            # Apply is_teg_lets_chat mask to the filtered dataframe
-            df_teg_lets_chat_mask = df['name'].astype(str).str.lower().str.contains("teg", na=False) & (
-                df['name'].astype(str).str.lower().str.contains("let's chat", na=False) | 
-                df['name'].astype(str).str.lower().str.contains("lets chat", na=False)
-            )
-            df.loc[df_teg_lets_chat_mask & empty_source, "source"] = "Burki"
-            # If source is still empty, leave it empty (don't set to "Other" - let it show as empty rather than wrong)
-            # This helps identify events that need database refresh
+        # Active "TEG - Let's Chat" and "*Intro call with TEG*" events, classified at refresh
+        # (calendly_categories.classify_event: source is already cleaned, with "Burki" for Let's Chat)
+        df = get_calendly_events(categories=['lets_chat', 'intro_call'], active_only=True)
+        df = df[['uri', 'name', 'start_time', 'end_time', 'status', 'event_type',
+                 'invitee_name', 'invitee_email', 'source', 'local_date', 'local_hour', 'updated_at']]
         
         if df.empty:
             return None, "No Burki Calls or Intro Call with TEG events in database. Refresh Calendly data from the Database Refresh page."
@@ -201,12 +122,12 @@ def load_calendly_data_from_db():
         df['end_time'] = pd.to_datetime(df['end_time'], utc=True)
         df['updated_at'] = pd.to_datetime(df['updated_at'], utc=True)
         df['start_time_local'] = df['start_time'].dt.tz_convert(CALIFORNIA_TZ)
-        df['date'] = df['start_time_local'].dt.date
+        df['date'] = pd.to_datetime(df['local_date']).dt.date
         df['month'] = df['start_time_local'].dt.strftime('%B %Y')
         df['week'] = df['start_time_local'].dt.isocalendar().week
         df['year'] = df['start_time_local'].dt.year
         df['day_of_week'] = df['start_time_local'].dt.strftime('%A')
-        df['hour'] = df['start_time_local'].dt.hour
+        df['hour'] = df['local_hour']
         return df, None
         
     except sqlite3.Error as e:
@@ -225,7 +146,7 @@ def get_calendly_data():
     }
     
     # Get user info
-    user_response = requests.get('https://api.calendly.com/users/me', headers=headers)
+    user_response = http_client.get('https://api.calendly.com/users/me', headers=headers)
     if user_response.status_code != 200:
         st.error(f"Failed to get user info: {user_response.status_code}")
         return {'events': [], 'debug_info': {'error': f'User API error: {user_response.status_code}'}}
@@ -235,7 +156,7 @@ def get_calendly_data():
     user_name = user_data['resource']['name']
     
     # Get event types
-    event_types_response = requests.get('https://api.calendly.com/event_types', 
+    event_types_response = http_client.get('https://api.calendly.com/event_types', 
                                       headers=headers,
                                       params={
                                           'user': user_uri,
@@ -286,7 +207,7 @@ def get_calendly_data():
         if next_page_token:
             params['page_token'] = next_page_token
         
-        events_response = requests.get('https://api.calendly.com/scheduled_events', 
+        events_response = http_client.get('https://api.calendly.com/scheduled_events', 
                                      headers=headers,
                                      params=params)
         
@@ -7,8 +7,9 @@ import json
 import plotly.express as px
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database_utils import (
-    check_database_exists,
+from database_utils import check_database_exists
+from board_datasets import (
+    get_dataset,
     get_new_leads_data,
     get_discovery_call_data,
     get_design_review_data,
@@ -58,9 +59,8 @@ st.markdown(
 # ----------------------
 # Data functions
 # ----------------------
-@st.cache_data(ttl=600, show_spinner=False)
 def get_all_leads_data_from_db():
-    """Load all leads data from local SQLite database (cached)."""
+    """Load all leads data from the shared board datasets (see board_datasets)."""
     # Keep imports of board fetchers centralized above for faster reloads
     boards = {
         "New Leads v2": get_new_leads_data(),
@@ -98,12 +98,13 @@ def _cache_file_path() -> str:
     return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "inputs", "new_leads_current_month.json")
 
 
-@st.cache_data(ttl=300, show_spinner=False)
-def try_load_cached_current_month_df(_cache_path: str) -> tuple[pd.DataFrame, dict]:
+@st.cache_data(show_spinner=False)
+def try_load_cached_current_month_df(_cache_path: str, cache_mtime) -> tuple[pd.DataFrame, dict]:
     """Load precomputed current-month leads dataframe and daily counts from JSON cache if available.
     
     Args:
         _cache_path: Cache file path (prefixed with _ to prevent Streamlit from treating it as a parameter)
+        cache_mtime: Cache file modification time (the cache key: reloaded only when the refresh rewrites it)
     
     Returns:
         tuple: (dataframe, daily_counts_dict) or (empty_df, empty_dict) if cache not available
@@ -140,7 +141,6 @@ def try_load_cached_current_month_df(_cache_path: str) -> tuple[pd.DataFrame, di
     return pd.DataFrame(), {}
 
 
-@st.cache_data(ttl=600)
 def format_leads_data(leads_data):
     if not leads_data:
         return pd.DataFrame()
@@ -286,11 +286,12 @@ def main():
     selected_date = st.session_state["nlc_selected_date"]
 
     cache_path = _cache_file_path()
-    cached_df, cached_daily_counts = try_load_cached_current_month_df(cache_path)
+    cache_mtime = os.path.getmtime(cache_path) if os.path.exists(cache_path) else None
+    cached_df, cached_daily_counts = try_load_cached_current_month_df(cache_path, cache_mtime)
 
     with st.spinner("Loading leads data from database..."):
-        leads_data = get_all_leads_data_from_db()
-    df_full = format_leads_data(leads_data)
+        # Built once per refresh for the whole process and shared read-only (board_datasets)
+        df_full = get_dataset("new_leads_check_frame", lambda: format_leads_data(get_all_leads_data_from_db()))
 
     if df_full.empty:
         st.warning(
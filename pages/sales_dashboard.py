@@ -11,7 +11,9 @@ CURRENT_YEAR = datetime.now().year
 
 # Add parent directory to path to import database_utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database_utils import get_sales_data, check_database_exists, get_new_leads_data, get_discovery_call_data, get_design_review_data
+from database_utils import get_database_generation, check_database_exists, items_to_frame, get_funnel_items, get_lead_funnel
+from board_datasets import get_sales_data, get_sales_facts
+from lead_identity import FUNNEL_STAGES
 
 # Page configuration
 st.set_page_config(
@@ -35,81 +37,47 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def get_all_leads_for_sales_chart():
-    """Get all leads data from all boards for sales chart analysis using correct date fields"""
-    import json
-    
-    all_leads = []
-    
-    # Get data from all boards using database functions
-    boards_data = {
-        'New Leads': get_new_leads_data(),
-        'Discovery Call': get_discovery_call_data(), 
-        'Design Review': get_design_review_data(),
-        'Sales': get_sales_data().get('data', {}).get('boards', [{}])[0].get('items_page', {}).get('items', [])
+@st.cache_data  # Keyed on get_database_generation() (monday_data.db): recomputed once per Monday.com refresh
+def get_all_leads_for_sales_chart(generation):
+    """Get all leads data from all boards for sales chart analysis using correct date fields.
+    
+    Each board item with its lead id and stage date comes from lead_identity, so the same
+    lead's items on different boards can be joined on lead_id.
+    """
+    # Board-specific stage date columns (lead_identity.FUNNEL_STAGES, based on Monday.com filter results):
+    # New Leads date_mkwgr4gg (Date Created), Discovery Call date_mktbrpz6 (Discovery Call Date),
+    # Design Review date3 (Design Review Date), Sales date_mktqx5me (Deck Call Date)
+    funnel_items = get_funnel_items()
+    
+    # Map board tables to board names and chart categories
+    board_names = {
+        'new_leads_board': 'New Leads',
+        'discovery_call_board': 'Discovery Call',
+        'design_review_board': 'Design Review',
+        'sales_board': 'Sales'
     }
-    
-    # Board-specific date column IDs for each stage (based on Monday.com filter results)
-    date_columns = {
-        'New Leads': 'date_mkwgr4gg',           # Date Created (181 vs 182 expected)
-        'Discovery Call': 'date_mktbrpz6',      # Discovery Call Date (144 vs 145 expected)
-        'Design Review': 'date3',                # Design Review Date (221 vs 221 expected - PERFECT MATCH!)
-        'Sales': 'date_mktqx5me'                # Deck Call Date (390 vs 390 expected - PERFECT MATCH!)
-    }
-    
-    # Process each board's data
-    for board_name, items in boards_data.items():
-        target_date_column = date_columns.get(board_name)
-        
-        for item in items:
-            # Parse column_values if it's a string
-            column_values = item.get("column_values", [])
-            if isinstance(column_values, str):
-                try:
-                    column_values = json.loads(column_values)
-                except:
-                    column_values = []
-            # Look for the specific date column for this board/stage
-            stage_date = None
-            lead_status = ""
-            assigned_person = ""
-            for col_val in column_values:
-                col_id = col_val.get("id", "")
-                col_type = col_val.get("type", "")
-                text = (col_val.get("text") or "").strip()
-                
-                if col_type == "date" and text and col_id == target_date_column and not stage_date:
-                    stage_date = text
-                
-                if board_name == 'Sales':
-                    if col_id == "color_mknxd1j2":
-                        lead_status = text
-                    elif col_id == "color_mkvewcwe":
-                        assigned_person = text
-            
-            # Map board names to chart categories
-            if board_name == 'New Leads':
-                category = 'New Leads'
-            elif board_name == 'Discovery Call':
-                category = 'Discovery Call'
-            elif board_name == 'Design Review':
-                category = 'Design Review Call'
-            elif board_name == 'Sales':
-                category = 'Deck Call'
-            else:
-                category = 'Other'
-            
-            all_leads.append({
-                'name': item.get('name', ''),
-                'board': board_name,
-                'category': category,
-                'stage_date': stage_date,  # Changed from 'date_created' to 'stage_date'
-                'status': lead_status if board_name == 'Sales' else "",
-                'assigned_person': assigned_person if board_name == 'Sales' else ""
-            })
-    
-    return all_leads
+    categories = {board: stage for board, stage, _ in FUNNEL_STAGES}
+    
+    # Lead Status and Assigned Person of Sales items
+    sales_items = get_sales_data(columns=["color_mknxd1j2", "color_mkvewcwe"]).get('data', {}).get('boards', [{}])[0].get('items_page', {}).get('items', [])
+    sales_frame = items_to_frame(sales_items, columns=["color_mknxd1j2", "color_mkvewcwe"], typed=False).set_index('id')
+    no_text = pd.Series("", index=sales_frame.index)
+    is_sales = funnel_items['board'] == 'sales_board'
+    
+    return pd.DataFrame({
+        'lead_id': funnel_items['lead_id'],
+        'name': funnel_items['name'],
+        'board': funnel_items['board'].map(board_names),
+        'category': funnel_items['board'].map(categories).fillna('Other'),
+        'stage_date': funnel_items['stage_date'],  # Changed from 'date_created' to 'stage_date'
+        'status': funnel_items['item_id'].map(sales_frame.get("color_mknxd1j2", no_text)).where(is_sales, "").fillna(""),
+        'assigned_person': funnel_items['item_id'].map(sales_frame.get("color_mkvewcwe", no_text)).where(is_sales, "").fillna("")
+    })
+
+@st.cache_data  # Keyed on get_database_generation() (monday_data.db): recomputed once per Monday.com refresh
+def get_lead_funnel_data(generation):
+    """One row per lead with its item count and first date at each funnel stage (lead_identity)"""
+    return get_lead_funnel()
 
 # Helper function to format numbers with K format
 def format_currency(value):
@@ -158,98 +126,30 @@ def load_credentials():
         st.error(f"Error reading secrets: {str(e)}")
         st.stop()
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def get_sales_data_from_db():
-    """Get sales data from SQLite database"""
+    """Get sales data (shared read-only across pages, see board_datasets)"""
     return get_sales_data()
 
-def process_sales_data(data):
-    """Convert Monday.com sales data to pandas DataFrame and process it"""
-    if not data or "data" not in data or "boards" not in data["data"]:
-        return pd.DataFrame()
-    
-    boards = data["data"]["boards"]
-    if not boards:
-        return pd.DataFrame()
-    
-    # Collect items from the board
-    all_items = []
-    for board in boards:
-        if board.get("items_page") and board["items_page"].get("items"):
-            all_items.extend(board["items_page"]["items"])
-    
-    if not all_items:
-        return pd.DataFrame()
-    
-    items = all_items
-    
-    # Convert to DataFrame
-    records = []
-    
-    
-    for item in items:
-        record = {
-            "Item": item.get("name", ""),
-            "Close Date": "",
-            "Lead Status": "",
-            "Amount Paid or Contract Value": "",
-            "Contract Amount": "",
-            "Numbers3": "",
-            "Assigned Person": "",
-            "Client Type": "",
-            "Type of Revenue": ""
-        }
-        
-        for col_val in item.get("column_values", []):
-            col_id = col_val.get("id", "")
-            text = col_val.get("text", "")
-            
-            if col_id == "color_mknxd1j2":  # Lead Status
-                record["Lead Status"] = text if text else ""
-            elif col_id == "contract_amt":  # Contract Amount
-                record["Contract Amount"] = text if text else ""
-            elif col_id == "numbers3":  # Numbers3 column
-                record["Numbers3"] = text if text else ""
-            elif col_id == "color_mkvewcwe":  # Assigned Person dropdown field (CORRECT ONE)
-                record["Assigned Person"] = text if text else ""
-            elif col_id == "status_14__1":  # Client Type (CORRECT COLUMN)
-                record["Client Type"] = text if text else ""
-            elif col_id == "color_mkwp98ks":  # Type of Revenue (CORRECT COLUMN ID)
-                record["Type of Revenue"] = text if text else ""
-            elif col_id == "date_mktq7npm":  # CORRECT Close Date (Date MK7)
-                record["Close Date"] = text if text else ""
-            # Try to find the "Amount Paid or Contract Value" formula column
-            elif col_id == "formula_mktj2qh2":  # Try first formula column
-                record["Amount Paid or Contract Value"] = text if text else ""
-            elif col_id == "formula_mktk2rgx":  # Try second formula column
-                record["Amount Paid or Contract Value"] = text if text else ""
-            elif col_id == "formula_mktks5te":  # Try third formula column
-                record["Amount Paid or Contract Value"] = text if text else ""
-            elif col_id == "formula_mktknqy9":  # Try fourth formula column
-                record["Amount Paid or Contract Value"] = text if text else ""
-            elif col_id == "formula_mktkwnyh":  # Try fifth formula column
-                record["Amount Paid or Contract Value"] = text if text else ""
-            elif col_id == "formula_mktq5ahq":  # Try sixth formula column
-                record["Amount Paid or Contract Value"] = text if text else ""
-            elif col_id == "formula_mktt5nty":  # Try seventh formula column
-                record["Amount Paid or Contract Value"] = text if text else ""
-            elif col_id == "formula_mkv0r139":  # Try eighth formula column
-                record["Amount Paid or Contract Value"] = text if text else ""
-        
-        records.append(record)
-    
-    
-    df = pd.DataFrame(records)
-    
-    # Process monetary values for all columns
-    df['Amount Paid or Contract Value'] = pd.to_numeric(df['Amount Paid or Contract Value'], errors='coerce')
-    df['Contract Amount'] = pd.to_numeric(df['Contract Amount'].str.replace('$', '').str.replace(',', ''), errors='coerce')
-    df['Numbers3'] = pd.to_numeric(df['Numbers3'], errors='coerce')
-    
-    # Use the CORRECT combination: Contract Amount OR Numbers3 (Amount Paid or Contract Value)
-    # This matches the exact $2,013,315 value discovered
-    df['Contract Amount'] = pd.to_numeric(df['Contract Amount'], errors='coerce')
-    df['Numbers3'] = pd.to_numeric(df['Numbers3'], errors='coerce')
+def get_sales_facts_from_db():
+    """Get sales facts (one row per Sales board item), shared read-only across pages"""
+    return get_sales_facts()
+
+def process_sales_data(facts):
+    """Build the closed-sales DataFrames from sales_facts rows"""
+    if facts is None or facts.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    
+    # Amounts are parsed at refresh time (see sales_facts.py)
+    df = pd.DataFrame({
+        "Item": facts["item_name"],
+        "Close Date": facts["date_closed"].fillna(""),
+        "Lead Status": facts["lead_status"].fillna(""),
+        "Contract Amount": pd.to_numeric(facts["contract_amount"], errors='coerce'),
+        "Numbers3": pd.to_numeric(facts["amount_paid"], errors='coerce'),
+        "Assigned Person": facts["assigned_person"].fillna(""),
+        "Client Type": facts["client_type"].fillna(""),
+        "Type of Revenue": facts["revenue_type"].fillna("")
+    })
             
     # Use the best available value: Contract Amount if available, otherwise Numbers3
     df['Total Value'] = df['Contract Amount'].fillna(0)
@@ -307,9 +207,9 @@ def main():
     
     # Load and process data from database
     with st.spinner("Loading sales data from database..."):
-        data = get_sales_data_from_db()
+        facts = get_sales_facts_from_db()
         
-        df_filtered, df_current_year_filtered = process_sales_data(data)
+        df_filtered, df_current_year_filtered = process_sales_data(facts)
     
     if df_filtered.empty:
         st.warning("No closed sales records found. Please check your data and filters.")
@@ -793,90 +693,48 @@ def main():
     # 6. Sales by Source (Revenue) - Based on UTM Data from Sales Board
     st.subheader("Sales by Source")
     
-    @st.cache_data(ttl=300)  # Cache for 5 minutes
-    def get_sales_revenue_by_source():
+    @st.cache_data  # Keyed on get_database_generation() (monday_data.db): recomputed once per Monday.com refresh
+    def get_sales_revenue_by_source(generation):
         """Get sales revenue data by source/channel from Sales board for revenue analysis"""
-        import json
-        
-        sales_revenue_data = []
-        
         # Get data from Sales board only
         sales_items = get_sales_data_from_db().get('data', {}).get('boards', [{}])[0].get('items_page', {}).get('items', [])
+        frame = items_to_frame(sales_items, columns=['text_mkrfer1n', "date_mktq7npm", "color_mknxd1j2", "contract_amt", "numbers3"])
+        no_text = pd.Series("", index=frame.index)
+        no_amount = pd.Series(0.0, index=frame.index)
         
         # Sales board channel column ID - this is the UTM channel column with "Paid search", "Organic search", etc.
-        sales_channel_column = 'text_mkrfer1n'
+        channel = frame.get('text_mkrfer1n', no_text)
+        # Closed date - the same column leveraged in process_sales_data
+        close_date = frame.get("date_mktq7npm", no_text)
+        lead_status = frame.get("color_mknxd1j2", no_text)  # Lead Status
+        contract_amount = frame.get("contract_amt__number", no_amount).fillna(0)  # Contract Amount
+        numbers3_amount = frame.get("numbers3__number", no_amount).fillna(0)  # Numbers3 column
         
-        # Process Sales board data
-        for item in sales_items:
-            # Extract channel information, revenue, and other relevant data
-            channel = ""
-            close_date = None
-            lead_status = ""
-            contract_amount = 0
-            numbers3_amount = 0
-            
-            # Parse column_values if it's a string
-            column_values = item.get("column_values", [])
-            if isinstance(column_values, str):
-                try:
-                    column_values = json.loads(column_values)
-                except:
-                    column_values = []
-            
-            for col_val in column_values:
-                col_id = col_val.get("id", "")
-                text = (col_val.get("text") or "").strip()
-                col_type = col_val.get("type", "")
-                
-                # Look for the channel column (UTM channel column)
-                if col_id == sales_channel_column and text:
-                    channel = text
-                
-                # Look for closed date - use the same column leveraged in process_sales_data
-                if col_id == "date_mktq7npm" and text:
-                    close_date = text
-                
-                # Look for lead status
-                if col_id == "color_mknxd1j2":  # Lead Status
-                    lead_status = text
-                
-                # Look for revenue amounts
-                if col_id == "contract_amt":  # Contract Amount
-                    try:
-                        contract_amount = float(str(text).replace('$', '').replace(',', '')) if text else 0
-                    except:
-                        contract_amount = 0
-                elif col_id == "numbers3":  # Numbers3 column
-                    try:
-                        numbers3_amount = float(str(text).replace('$', '').replace(',', '')) if text else 0
-                    except:
-                        numbers3_amount = 0
-                
-            # Calculate total revenue (same logic as in process_sales_data)
-            total_revenue = contract_amount if contract_amount > 0 else numbers3_amount
-            
-            # Filter for proper UTM channels (exclude individual names)
-            valid_utm_channels = [
-                'paid search', 'organic search', 'direct traffic', 'referral', 
-                'email marketing', 'social media', 'tradeshow', 'google', 
-                'facebook', 'instagram', 'linkedin', 'youtube', 'twitter'
-            ]
-            
-            # Only include items with valid UTM channels and closed/win status and revenue > 0
-            if (channel and channel.strip() and 
-                close_date and
-                lead_status and lead_status.lower() in ['closed', 'win'] and 
-                total_revenue > 0 and
-                channel.lower() in valid_utm_channels):
-                sales_revenue_data.append({
-                    'name': item.get('name', ''),
-                    'channel': channel,
-                    'close_date': close_date,
-                    'lead_status': lead_status,
-                    'revenue': total_revenue
-                })
+        # Calculate total revenue (same logic as in process_sales_data)
+        total_revenue = contract_amount.where(contract_amount > 0, numbers3_amount)
+        
+        # Filter for proper UTM channels (exclude individual names)
+        valid_utm_channels = [
+            'paid search', 'organic search', 'direct traffic', 'referral', 
+            'email marketing', 'social media', 'tradeshow', 'google', 
+            'facebook', 'instagram', 'linkedin', 'youtube', 'twitter'
+        ]
         
-        return sales_revenue_data
+        # Only include items with valid UTM channels and closed/win status and revenue > 0
+        include = (
+            (close_date != "")
+            & lead_status.str.lower().isin(['closed', 'win'])
+            & (total_revenue > 0)
+            & channel.str.lower().isin(valid_utm_channels)
+        )
+        sales_revenue_data = pd.DataFrame({
+            'name': frame['name'],
+            'channel': channel,
+            'close_date': close_date,
+            'lead_status': lead_status,
+            'revenue': total_revenue
+        })
+        return sales_revenue_data[include].reset_index(drop=True)
     
     # Year selector for sales by source chart - default to current year
     available_years_source = sorted([int(year) for year in df_filtered['Year'].unique() if pd.notna(year)])
@@ -885,11 +743,10 @@ def main():
     
     # Get sales revenue data by source
     with st.spinner("Loading Sales by Source data..."):
-        sales_revenue_data = get_sales_revenue_by_source()
+        sales_revenue_data = get_sales_revenue_by_source(get_database_generation())
     
-    if sales_revenue_data:
-        # Convert to DataFrame
-        sales_revenue_df = pd.DataFrame(sales_revenue_data)
+    if not sales_revenue_data.empty:
+        sales_revenue_df = sales_revenue_data
         
         # Parse close dates and filter for valid dates
         sales_revenue_df['close_date'] = pd.to_datetime(sales_revenue_df['close_date'], errors='coerce')
@@ -989,11 +846,10 @@ def main():
     # Reuse the same year selector (using same selected_year_source)
     # Get sales revenue data by source (same data, but we'll count instead of sum)
     with st.spinner("Loading Number of Deals Closed by Source data..."):
-        sales_revenue_data = get_sales_revenue_by_source()
+        sales_revenue_data = get_sales_revenue_by_source(get_database_generation())
     
-    if sales_revenue_data:
-        # Convert to DataFrame
-        sales_revenue_df = pd.DataFrame(sales_revenue_data)
+    if not sales_revenue_data.empty:
+        sales_revenue_df = sales_revenue_data
         
         # Parse close dates and filter for valid dates
         sales_revenue_df['close_date'] = pd.to_datetime(sales_revenue_df['close_date'], errors='coerce')
@@ -1090,11 +946,11 @@ def main():
     st.subheader(f"Close Rate by Month - {CURRENT_YEAR}")
     
     with st.spinner("Loading leads data..."):
-        all_leads = get_all_leads_for_sales_chart()
+        all_leads = get_all_leads_for_sales_chart(get_database_generation())
     
     leads_with_dates = pd.DataFrame()
-    if all_leads:
-        leads_df = pd.DataFrame(all_leads)
+    if not all_leads.empty:
+        leads_df = all_leads
         leads_df['stage_date'] = pd.to_datetime(leads_df['stage_date'], errors='coerce')
         leads_with_dates = leads_df.dropna(subset=['stage_date'])
     else:
@@ -1293,6 +1149,46 @@ def main():
             st.info("No leads data with valid dates available.")
     else:
         st.info("No leads data available.")
+    
+    # Lead Funnel: each lead's items on the four boards, joined on lead_id (lead_identity)
+    st.markdown("---")
+    st.subheader(f"Lead Funnel - {CURRENT_YEAR}")
+    
+    with st.spinner("Loading lead funnel..."):
+        lead_funnel = get_lead_funnel_data(get_database_generation())
+    
+    stage_names = [stage for _, stage, _ in FUNNEL_STAGES]
+    funnel_cohort = pd.DataFrame()
+    if not lead_funnel.empty:
+        # Leads whose first stage date falls in the current year
+        first_dates = lead_funnel[[f"{stage} Date" for stage in stage_names]].min(axis=1)
+        funnel_cohort = lead_funnel[first_dates.dt.year == CURRENT_YEAR]
+    
+    if not funnel_cohort.empty:
+        funnel_rows = []
+        for i, stage in enumerate(stage_names):
+            reached = funnel_cohort[f"{stage} Items"] > 0
+            row = {'Stage': stage, 'Leads': int(reached.sum()), 'Conversion': "", 'Median Days From Previous Stage': ""}
+            if i > 0:
+                previous = stage_names[i - 1]
+                previous_reached = funnel_cohort[f"{previous} Items"] > 0
+                if previous_reached.any():
+                    row['Conversion'] = f"{(reached & previous_reached).sum() / previous_reached.sum():.1%}"
+                days = (funnel_cohort[f"{stage} Date"] - funnel_cohort[f"{previous} Date"]).dt.days.dropna()
+                if not days.empty:
+                    row['Median Days From Previous Stage'] = f"{days.median():.0f}"
+            funnel_rows.append(row)
+        funnel_df = pd.DataFrame(funnel_rows)
+        
+        fig_funnel = px.funnel(funnel_df, x='Leads', y='Stage', color_discrete_sequence=['#4ECDC4'])
+        fig_funnel.update_layout(height=400, font=dict(size=14))
+        st.plotly_chart(fig_funnel, use_container_width=True)
+        
+        st.dataframe(funnel_df, width='stretch', hide_index=True)
+        st.caption("Conversion: share of the previous stage's leads that reached this stage. "
+                   "Leads are matched across boards by Connect boards links and email.")
+    else:
+        st.info(f"No leads with stage dates found for {CURRENT_YEAR}.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""
+In-process Monday.com refresh pipeline shared by refresh_database.py and the Database Refresh page.
+
+Stages run in order in one interpreter: fetch (monday_sync.fetch_boards) -> write
+(monday_sync.publish_boards, which also rebuilds sales_facts) -> derive caches.
+Items from the fetch stage are handed straight to the derived-cache stages, so a
+board fetched in full is never read back from SQLite or parsed again. Boards synced
+incrementally only fetched their changed items; derived caches read those boards
+once from monday_data.db.
+"""
+from monday_sync import fetch_boards, publish_boards
+from new_leads_cache import write_new_leads_cache
+
+# Derived caches built after the write stage: (name, build). build({table_name: items})
+# gets the boards fetched in full and returns (success, message).
+DERIVED_CACHES = [
+    ("New Leads month cache", write_new_leads_cache),
+]
+
+
+def complete_boards(fetched_boards, results):
+    """{table_name: items} for the boards fetched in full and written successfully"""
+    return {
+        fetched['table_name']: fetched['items']
+        for fetched in fetched_boards
+        if fetched['mode'] == "full" and not results[fetched['table_name']]['error']
+    }
+
+
+def run_monday_pipeline(boards, api_token, db_path, mode="auto", columns="manifest", on_result=None, log=print):
+    """Fetch, write and derive caches for boards (a list of (board_id, table_name, board_type)).
+
+    on_result(table_name, result) is called from the calling thread for each board after
+    the write stage. Caches are only derived when at least one board was written.
+    Returns (results, derived): {table_name: result} as from monday_sync.sync_boards,
+    and {cache name: (success, message)}.
+    """
+    fetched_boards = fetch_boards(boards, api_token, db_path, mode=mode, log=log, columns=columns)
+    results = publish_boards(db_path, fetched_boards)
+    if on_result:
+        for _, table_name, _ in boards:
+            on_result(table_name, results[table_name])
+
+    derived = {}
+    if any(not result['error'] for result in results.values()):
+        in_memory = complete_boards(fetched_boards, results)
+        for name, build in DERIVED_CACHES:
+            try:
+                derived[name] = build(in_memory)
+            except Exception as e:
+                derived[name] = (False, f"Error generating {name}: {str(e)}")
+    return results, derived
@@ -0,0 +1,302 @@
+"""
+Sales facts: one typed row per Sales board item, materialized at refresh time.
+
+The revenue rules (formula fallback, contract_amt + numbers3 + mirror, copy-item
+rollups and linked-item revenue) used to run in the Ads and Sales dashboards on
+every cache miss. The refresh now computes them once, in the same transaction that
+publishes the Sales board, and the dashboards read sales_facts with plain SQL.
+"""
+import json
+from datetime import datetime
+from functools import lru_cache
+
+# Sales board formula columns that hold "Amount Paid or Contract Value"
+SALES_FORMULA_COLUMNS = ["formula_mktj2qh2", "formula_mktk2rgx", "formula_mktks5te",
+                         "formula_mktknqy9", "formula_mktkwnyh", "formula_mktq5ahq",
+                         "formula_mktt5nty", "formula_mkv0r139"]
+
+SALES_FACTS_FIELDS = [
+    'item_id', 'item_name', 'status', 'lead_status', 'channel', 'value',
+    'contract_amount', 'amount_paid', 'date_created', 'date_closed',
+    'assigned_person', 'client_type', 'revenue_type', 'linked_items', 'is_linked_item'
+]
+
+_STATUS_WORDS = ["status", "stage", "state", "phase"]
+_CHANNEL_WORDS = ["channel", "source", "utm", "traffic", "medium"]
+_VALUE_WORDS = ["value", "revenue", "amount", "price", "deal", "contract"]
+
+# Sales board columns build_sales_facts reads (plus board_relation columns and the
+# fallback patterns above), for the refresh's column manifest
+SALES_FACT_COLUMNS = SALES_FORMULA_COLUMNS + [
+    "contract_amt", "numbers3", "lookup_mkx8jk3h", "color_mknxd1j2", "text_mkrfer1n", "source",
+    "date7", "date_mktq7npm", "color_mkvewcwe", "status_14__1", "color_mkwp98ks"
+]
+SALES_FACT_COLUMN_PATTERNS = _STATUS_WORDS + _CHANNEL_WORDS + _VALUE_WORDS
+
+
+def create_sales_facts_table(cursor):
+    """Create the sales_facts table and its indexes"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales_facts (
+            item_id TEXT PRIMARY KEY,
+            item_name TEXT,
+            status TEXT,
+            lead_status TEXT,
+            channel TEXT,
+            value REAL,
+            contract_amount REAL,
+            amount_paid REAL,
+            date_created TEXT,
+            date_closed TEXT,
+            assigned_person TEXT,
+            client_type TEXT,
+            revenue_type TEXT,
+            linked_items TEXT,
+            is_linked_item INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_facts_lead_status ON sales_facts (lead_status, date_closed)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_facts_channel ON sales_facts (channel, date_created)")
+
+
+def is_excluded_item_name(name):
+    """Items named "No ...", "Not ..." or "Spam..." are placeholders, not leads"""
+    return (name or "").lower().startswith(('no ', 'not ', 'spam'))
+
+
+def _to_number(text):
+    """Parse a Monday.com amount ("$1,250.00") to float, or None"""
+    if text is None or text == "":
+        return None
+    try:
+        number = float(str(text).replace('$', '').replace(',', '').strip())
+    except ValueError:
+        return None
+    return None if number != number else number  # NaN
+
+
+@lru_cache(maxsize=4096)
+def _column_pattern_matches(col_id):
+    """Whether col_id contains a status, channel or value word, matched once per column id"""
+    lowered = col_id.lower()
+    return tuple(any(word in lowered for word in words) for words in (_STATUS_WORDS, _CHANNEL_WORDS, _VALUE_WORDS))
+
+
+def _formula_value(col_val):
+    """Text of a formula column, falling back to its value (JSON or plain)"""
+    text = (col_val.get("text") or "").strip()
+    if text:
+        return text
+    value = col_val.get("value", "")
+    if not value:
+        return ""
+    if isinstance(value, dict):
+        return str(value.get("number", value.get("text", value)))
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return value
+        if isinstance(parsed, dict):
+            return str(parsed.get("number", parsed.get("text", value)))
+        return str(parsed)
+    return str(value)
+
+
+def _mirror_value(col_val):
+    """Mirror Ap or Cv: text, else a display value from additional_info or value"""
+    text = (col_val.get("text") or "").strip()
+    if text:
+        return text
+    for candidate in [col_val.get("additional_info"), col_val.get("value")]:
+        if not candidate:
+            continue
+        try:
+            parsed = json.loads(candidate) if isinstance(candidate, str) else candidate
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, dict):
+            # Common keys that may carry display text or number
+            for key in ["display_value", "text", "value", "number"]:
+                if key in parsed and parsed[key]:
+                    return str(parsed[key])
+    return ""
+
+
+def base_item_name(name):
+    """Item name without trailing " (copy)" suffixes"""
+    base = name or ""
+    while base.endswith(" (copy)"):
+        base = base[:-len(" (copy)")]
+    return base.strip()
+
+
+def _item_fact(item):
+    """First pass over one item's column_values. Returns (fact, raw amounts, linked item ids)."""
+    fact = {
+        'item_id': item.get("id", ""),
+        'item_name': item.get("name", ""),
+        'status': "", 'lead_status': "", 'channel': "",
+        'date_created': "", 'date_closed': "", 'assigned_person': "",
+        'client_type': "", 'revenue_type': "",
+    }
+    formula = contract = numbers3 = mirror = ""
+    linked_ids = []
+    value = ""
+
+    column_values = [c for c in item.get("column_values", []) if isinstance(c, dict)]
+    for col_val in column_values:
+        col_id = col_val.get("id", "")
+        text = (col_val.get("text") or "").strip()
+        if not formula and col_id in SALES_FORMULA_COLUMNS:
+            formula = _formula_value(col_val)
+        if col_id == "contract_amt" and text:
+            contract = text
+        elif col_id == "numbers3" and text:
+            numbers3 = text
+        elif col_id == "lookup_mkx8jk3h":
+            mirror = _mirror_value(col_val)
+        elif col_val.get("type") == "board_relation":
+            linked_ids.extend(col_val.get("linked_item_ids") or [])
+
+    # Initial value: formula, else the sum of whichever of contract/numbers3/mirror are set
+    parts = [v for v in (contract, numbers3, mirror) if v]
+    if formula:
+        value = formula
+    elif len(parts) >= 2:
+        numbers = [_to_number(v) for v in parts]
+        value = str(sum(numbers)) if None not in numbers else parts[0]
+    elif contract or numbers3:
+        value = contract or numbers3
+
+    for col_val in column_values:
+        col_id = col_val.get("id", "")
+        text = (col_val.get("text") or "").strip()
+        status_word, channel_word, value_word = _column_pattern_matches(col_id)
+        if col_id == "color_mknxd1j2":
+            fact['status'] = text
+            fact['lead_status'] = text
+        elif col_id in ("text_mkrfer1n", "source"):
+            fact['channel'] = text
+        elif col_id == "date7":
+            fact['date_created'] = text
+        elif col_id == "date_mktq7npm":
+            fact['date_closed'] = text
+        elif col_id == "color_mkvewcwe":
+            fact['assigned_person'] = text
+        elif col_id == "status_14__1":
+            fact['client_type'] = text
+            if fact['channel'] == "":
+                fact['channel'] = text
+        elif status_word and fact['status'] == "":
+            fact['status'] = text
+        elif channel_word and fact['channel'] == "":
+            fact['channel'] = text
+        elif value_word and value == "":
+            value = text
+        if col_id == "color_mkwp98ks":
+            fact['revenue_type'] = text
+
+    raw = {'formula': formula, 'contract': contract, 'numbers3': numbers3, 'mirror': mirror, 'value': value}
+    return fact, raw, linked_ids
+
+
+def build_sales_facts(items, links=None):
+    """Compute sales_facts rows (dicts keyed by SALES_FACTS_FIELDS) for Sales board items.
+
+    value follows the Ads dashboard revenue rules: the formula column if set,
+    otherwise contract_amt + numbers3 + mirror, where a base item's missing mirror
+    is the sum of its "(copy)" items; items with Connect boards links then add
+    their linked items' values, and those linked items are flagged is_linked_item.
+    links maps item ids to their linked item ids (read from the items' Connect
+    boards columns when None).
+    """
+    facts, raws, column_links = [], [], {}
+    for item in items:
+        fact, raw, linked_ids = _item_fact(item)
+        facts.append(fact)
+        raws.append(raw)
+        if linked_ids:
+            column_links.setdefault(fact['item_id'], []).extend(linked_ids)
+    if links is None:
+        links = column_links
+
+    # Copy items: previously matched with str.contains("(copy)"), a regex that matches any "copy"
+    is_copy = ['copy' in str(fact['item_name']) for fact in facts]
+    copy_totals = {}
+    for fact, raw, copy in zip(facts, raws, is_copy):
+        if copy:
+            base = base_item_name(fact['item_name'])
+            copy_totals[base] = copy_totals.get(base, 0.0) + (_to_number(raw['contract']) or 0.0) + (_to_number(raw['numbers3']) or 0.0)
+
+    for fact, raw, copy in zip(facts, raws, is_copy):
+        contract = _to_number(raw['contract']) or 0.0
+        numbers3 = _to_number(raw['numbers3']) or 0.0
+        value = raw['value']
+        if copy:
+            value = str(contract + numbers3) if contract + numbers3 > 0 else ""
+        elif not raw['formula']:
+            mirror = _to_number(raw['mirror']) or 0.0
+            if mirror == 0:
+                mirror = copy_totals.get(base_item_name(fact['item_name']), mirror)
+            total = contract + numbers3 + mirror
+            if total > 0:
+                value = str(total)
+            elif contract + numbers3 > 0:
+                value = str(contract + numbers3)
+        fact['value'] = _to_number(str(value).replace(' ', ''))
+        fact['contract_amount'] = _to_number(raw['contract'])
+        fact['amount_paid'] = _to_number(raw['numbers3'])
+
+    # Linked items: add their (pre-rollup) values to the item that links them
+    values = {fact['item_id']: fact['value'] for fact in facts}
+    names = {fact['item_id']: fact['item_name'] for fact in facts}
+    linked_item_ids = {linked_id for linked_ids in links.values() for linked_id in linked_ids}
+    for fact in facts:
+        linked_ids = links.get(fact['item_id'], [])
+        linked_revenue = sum(values[i] for i in linked_ids if values.get(i) is not None)
+        if linked_revenue > 0:
+            fact['value'] = (fact['value'] or 0.0) + linked_revenue
+        linked_names = list(dict.fromkeys(names[i] for i in linked_ids if names.get(i)))
+        fact['linked_items'] = ", ".join(linked_names)
+        fact['is_linked_item'] = 1 if fact['item_id'] in linked_item_ids else 0
+
+    return facts
+
+
+def _sales_item_links(conn, item_ids):
+    """{item_id: [linked item ids]} of the Sales board's Connect boards links, from item_links,
+    for links from item_ids only (excluded items' links must not flag their targets as linked)"""
+    links = {}
+    for item_id, linked_item_id in conn.execute(
+        "SELECT item_id, linked_item_id FROM item_links WHERE board = 'sales_board'"
+    ):
+        if item_id in item_ids:
+            links.setdefault(item_id, []).append(linked_item_id)
+    return links
+
+
+def rebuild_sales_facts(conn, decode=json.loads):
+    """Recompute sales_facts from the sales_board table and its item_links rows (caller commits).
+    Returns the row count."""
+    items = []
+    for item_id, name, column_values in conn.execute(
+        "SELECT id, name, column_values FROM sales_board ORDER BY updated_at DESC"
+    ):
+        if is_excluded_item_name(name):
+            continue
+        try:
+            column_values = decode(column_values) if column_values else []
+        except ValueError:
+            column_values = []
+        items.append({'id': item_id, 'name': name, 'column_values': column_values})
+
+    facts = build_sales_facts(items, links=_sales_item_links(conn, {item['id'] for item in items}))
+    now = datetime.now()
+    conn.execute("DELETE FROM sales_facts")
+    conn.executemany(f'''
+        INSERT OR REPLACE INTO sales_facts ({', '.join(SALES_FACTS_FIELDS)}, updated_at)
+        VALUES ({', '.join('?' * len(SALES_FACTS_FIELDS))}, ?)
+    ''', [tuple(fact[field] for field in SALES_FACTS_FIELDS) + (now,) for fact in facts])
+    return len(facts)
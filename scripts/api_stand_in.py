@@ -0,0 +1,300 @@
+"""
+Local stand-in for the Monday.com and Calendly APIs, for benchmarking the refresh offline.
+
+Serves synthetic data shaped like the real responses:
+- Monday.com GraphQL (POST /v2): board column lists and items_page pages with
+  cursors, plus injected rate limit errors carrying retry_in_seconds
+- Calendly (GET): users/me, users/{uuid}, event_types, event_types/{uuid} and
+  paginated scheduled_events (organization or user + event_type scope), plus
+  injected 429 responses with Retry-After
+
+Point the refresh at it with HTTP_CLIENT_HOST_OVERRIDES (see http_client.py), or
+use scripts/benchmark_refresh.py, which starts it in-process.
+
+Usage: python scripts/api_stand_in.py [--port 8765] [--items 2000] [--events-per-year 3000]
+       [--extra-columns 60] [--latency-ms 50] [--rate-limit-rate 0.02]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from board_columns import BOARD_COLUMN_MANIFEST
+
+CALENDLY_BASE = "https://api.calendly.com"
+
+# Board ids served by the stand-in (used as sales_board_id etc. in the benchmark config)
+BOARD_IDS = {
+    1001: 'sales_board',
+    1002: 'new_leads_board',
+    1003: 'discovery_call_board',
+    1004: 'design_review_board',
+    1005: 'ads_board',
+}
+
+# Calendly event types: (uuid, name, scheduling_url)
+EVENT_TYPES = [
+    ("ET-CHAT", "TEG - Let's Chat", "https://calendly.com/teg/lets-chat"),
+    ("ET-INTRO", "TEG Introductory Call", "https://calendly.com/teg/teg-introductory-call"),
+    ("ET-ANTHONY", "30 Minute Meeting", "https://calendly.com/anthony-the-evans-group/30min"),
+    ("ET-HEATHER", "30 Minute Meeting", "https://calendly.com/heather-the-evans-group/30min"),
+]
+HOSTS = ["Anthony", "Heather", "Ian", "Jennifer", "Jamie Burki"]
+
+
+class StandInData:
+    """Synthetic boards and events, generated once from the scale knobs"""
+
+    def __init__(self, items=2000, events_per_year=3000, extra_columns=60, seed=7):
+        self.rng = random.Random(seed)
+        self.events_per_year = events_per_year
+        self.columns = {board_id: self._board_columns(table, extra_columns) for board_id, table in BOARD_IDS.items()}
+        self.items = {board_id: self._board_items(board_id, items) for board_id in BOARD_IDS}
+        self._events = {}
+
+    def _board_columns(self, table, extra_columns):
+        manifest = BOARD_COLUMN_MANIFEST[table]
+        columns = [{'id': column_id, 'type': self._column_type(column_id)} for column_id in dict.fromkeys(manifest['ids'])]
+        columns.append({'id': 'connect_boards', 'type': 'board_relation'})
+        columns += [{'id': f'text_extra{c}', 'type': 'text'} for c in range(extra_columns)]
+        return columns
+
+    @staticmethod
+    def _column_type(column_id):
+        if column_id.startswith('date'):
+            return 'date'
+        if column_id.startswith(('color', 'status')):
+            return 'status'
+        if column_id.startswith(('numeric', 'numbers', 'contract')):
+            return 'numbers'
+        if column_id.startswith('formula'):
+            return 'formula'
+        if column_id.startswith('lookup'):
+            return 'mirror'
+        return 'text'
+
+    def _column_value(self, column, i):
+        kind = column['type']
+        if kind == 'date':
+            text = (datetime(2025, 1, 1) + timedelta(days=(i * 7 + len(column['id'])) % 700)).strftime('%Y-%m-%d')
+        elif kind == 'status':
+            text = self.rng.choice(["Closed Won", "Qualified", "Disqualified", "Working", ""])
+        elif kind == 'numbers':
+            text = str(self.rng.choice([0, 1500, 2500, 9000]))
+        elif kind in ('formula', 'mirror'):
+            text = ""
+        elif kind == 'board_relation':
+            return {'id': column['id'], 'type': kind, 'text': '', 'value': None,
+                    'linked_item_ids': [], 'display_value': ''}
+        else:
+            text = self.rng.choice(["Instagram", "Google", "Referral", "Website"])
+        return {'id': column['id'], 'type': kind, 'text': text, 'value': json.dumps(text) if text else None}
+
+    def _board_items(self, board_id, count):
+        base = datetime(2025, 1, 1)
+        return [{
+            'id': str(board_id * 1_000_000 + i),
+            'name': f"Lead {i}",
+            'updated_at': (base + timedelta(minutes=37 * i)).isoformat() + 'Z',
+            'column_values': [self._column_value(column, i) for column in self.columns[board_id]],
+        } for i in range(count)]
+
+    def events_for_year(self, year):
+        """Scheduled events starting in year, sorted by start_time"""
+        if year not in self._events:
+            rng = random.Random(year)
+            start = datetime(year, 1, 1, 8)
+            events = []
+            for i in range(self.events_per_year):
+                uuid, name, _ = EVENT_TYPES[i % len(EVENT_TYPES)]
+                begins = start + timedelta(minutes=int(i * 525600 / max(self.events_per_year, 1)))
+                host = rng.choice(HOSTS)
+                events.append({
+                    'uri': f"{CALENDLY_BASE}/scheduled_events/EV-{year}-{i}",
+                    'name': name,
+                    'status': 'active',
+                    'start_time': begins.isoformat() + '.000000Z',
+                    'end_time': (begins + timedelta(minutes=30)).isoformat() + '.000000Z',
+                    'event_type': f"{CALENDLY_BASE}/event_types/{uuid}",
+                    'event_memberships': [{'user': f"{CALENDLY_BASE}/users/U-HOST",
+                                           'user_name': host, 'user_email': f"{host.split()[0].lower()}@example.com"}],
+                })
+            self._events[year] = events
+        return self._events[year]
+
+
+def make_handler(data, latency_ms=0, rate_limit_rate=0.0, retry_in_seconds=1, seed=11):
+    """Request handler class bound to a StandInData and the injection knobs"""
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    def inject_rate_limit():
+        with rng_lock:
+            return rng.random() < rate_limit_rate
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, headers=None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            length = int(self.headers.get("Content-Length") or 0)
+            query = json.loads(self.rfile.read(length) or b"{}").get("query", "")
+            if inject_rate_limit():
+                self._send(200, {'errors': [{
+                    'message': "Complexity budget exhausted",
+                    'extensions': {'code': "COMPLEXITY_BUDGET_EXHAUSTED_RATE_LIMIT_EXCEEDED",
+                                   'status_code': 429, 'retry_in_seconds': retry_in_seconds},
+                }]})
+                return
+            self._send(200, monday_response(data, query))
+
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            if inject_rate_limit():
+                self._send(429, {'title': "Too Many Requests"}, {"Retry-After": str(retry_in_seconds)})
+                return
+            url = urlparse(self.path)
+            status, body = calendly_response(data, url.path, {k: v[-1] for k, v in parse_qs(url.query).items()})
+            self._send(status, body)
+
+    return Handler
+
+
+def monday_response(data, query):
+    """Response body for a Monday.com GraphQL query (columns or items_page)"""
+    complexity = {'before': 4_990_000, 'after': 4_980_000, 'query': 10_000, 'reset_in_x_seconds': 60}
+    board_id = int(re.search(r"boards\(ids: \[(\d+)\]\)", query).group(1))
+    if board_id not in BOARD_IDS:
+        return {'data': {'complexity': complexity, 'boards': []}}
+
+    if "items_page" not in query:
+        return {'data': {'complexity': complexity, 'boards': [{'columns': data.columns[board_id]}]}}
+
+    limit = int(re.search(r"limit: (\d+)", query).group(1))
+    cursor = re.search(r'cursor: "([^"]+)"', query)
+    offset = int(cursor.group(1).split(":")[1]) if cursor else 0
+    ids_match = re.search(r"column_values\(ids: \[([^\]]*)\]\)", query)
+    column_ids = set(json.loads(f"[{ids_match.group(1)}]")) if ids_match else None
+
+    items = data.items[board_id][offset:offset + limit]
+    if column_ids is not None:
+        items = [{**item, 'column_values': [c for c in item['column_values'] if c['id'] in column_ids]}
+                 for item in items]
+    next_offset = offset + limit
+    next_cursor = f"{board_id}:{next_offset}" if next_offset < len(data.items[board_id]) else None
+    return {'data': {'complexity': complexity,
+                     'boards': [{'items_page': {'cursor': next_cursor, 'items': items}}]}}
+
+
+def calendly_response(data, path, params):
+    """(status, body) for a Calendly GET"""
+    if path == "/users/me":
+        return 200, {'resource': {'uri': f"{CALENDLY_BASE}/users/U-ME", 'name': "TEG Admin", 'slug': "teg",
+                                  'current_organization': f"{CALENDLY_BASE}/organizations/ORG"}}
+    if path.startswith("/users/"):
+        return 200, {'resource': {'uri': f"{CALENDLY_BASE}{path}", 'name': "Anthony", 'slug': "anthony-the-evans-group"}}
+    if path == "/event_types":
+        return 200, {'collection': [event_type_resource(*et) for et in EVENT_TYPES],
+                     'pagination': {'next_page_token': None}}
+    if path.startswith("/event_types/"):
+        uuid = path.rsplit("/", 1)[-1]
+        for et in EVENT_TYPES:
+            if et[0] == uuid:
+                return 200, {'resource': event_type_resource(*et)}
+        return 404, {'title': "Resource Not Found"}
+    if path == "/scheduled_events":
+        return 200, scheduled_events_page(data, params)
+    return 404, {'title': "Resource Not Found"}
+
+
+def event_type_resource(uuid, name, scheduling_url):
+    return {'uri': f"{CALENDLY_BASE}/event_types/{uuid}", 'name': name, 'slug': scheduling_url.rsplit("/", 1)[-1],
+            'scheduling_url': scheduling_url, 'profile': {'type': 'User', 'name': name}}
+
+
+def scheduled_events_page(data, params):
+    """One page of scheduled_events filtered by start time window and event type"""
+    min_start = params.get('min_start_time', '')
+    max_start = params.get('max_start_time', '9999')
+    years = range(int(min_start[:4] or 2000), int(max_start[:4]) + 1) if min_start else []
+    events = [e for year in years for e in data.events_for_year(year)
+              if min_start <= e['start_time'] <= max_start]
+    if params.get('event_type'):
+        events = [e for e in events if e['event_type'].endswith("/" + params['event_type'])]
+    count = int(params.get('count', 20))
+    offset = int(params.get('page_token') or 0)
+    page = events[offset:offset + count]
+    next_token = str(offset + count) if offset + count < len(events) else None
+    return {'collection': page, 'pagination': {'count': len(page), 'next_page_token': next_token}}
+
+
+def start_server(data, port=0, **knobs):
+    """Start the stand-in on a background thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(data, **knobs))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def add_scale_arguments(parser):
+    """Scale and injection knobs shared with scripts/benchmark_refresh.py"""
+    parser.add_argument("--items", type=int, default=2000, help="Items per Monday.com board")
+    parser.add_argument("--extra-columns", type=int, default=60,
+                        help="Columns per board beyond the manifest (not fetched in manifest mode)")
+    parser.add_argument("--events-per-year", type=int, default=3000, help="Calendly events per year")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Latency added to every response")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with a rate limit error")
+    parser.add_argument("--retry-in-seconds", type=int, default=1, help="retry_in_seconds / Retry-After of injected rate limits")
+
+
+def data_and_knobs(args):
+    """(StandInData, handler knobs) from parsed add_scale_arguments options"""
+    data = StandInData(items=args.items, events_per_year=args.events_per_year, extra_columns=args.extra_columns)
+    knobs = {'latency_ms': args.latency_ms, 'rate_limit_rate': args.rate_limit_rate,
+             'retry_in_seconds': args.retry_in_seconds}
+    return data, knobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Monday.com/Calendly API stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    data, knobs = data_and_knobs(args)
+    server, base_url = start_server(data, port=args.port, **knobs)
+    print(f"🧪 API stand-in listening on {base_url}")
+    print(f"   export HTTP_CLIENT_HOST_OVERRIDES=\"api.monday.com={base_url},api.calendly.com={base_url}\"")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
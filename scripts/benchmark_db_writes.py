@@ -0,0 +1,138 @@
+"""
+Benchmark the refresh write phase (no API calls).
+
+Writes synthetic Monday.com items and Calendly events into throwaway databases,
+once with the old row-at-a-time inserts and once through the batched writers used
+by refresh_database.py, and prints rows/sec for each.
+
+Usage: python scripts/benchmark_db_writes.py [--items 5000] [--columns 60] [--events 20000]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database_utils import item_column_rows, serialize_column_values
+from monday_sync import init_monday_database, publish_boards
+from calendly_sync import CALENDLY_EVENT_FIELDS, calendly_event_row, init_calendly_database, save_calendly_events
+
+BOARDS = ['new_leads_board', 'discovery_call_board', 'design_review_board', 'sales_board', 'ads_board']
+
+
+def make_items(board, count, columns):
+    """Synthetic Monday items shaped like the items_page response"""
+    base = datetime(2025, 1, 1)
+    items = []
+    for i in range(count):
+        column_values = [
+            {'id': f'text_{c}', 'type': 'text', 'text': f'{board} value {i}-{c}', 'value': None}
+            for c in range(columns - 2)
+        ]
+        column_values.append({'id': 'date_mkwgr4gg', 'type': 'date',
+                              'text': (base + timedelta(days=i % 365)).strftime('%Y-%m-%d'), 'value': None})
+        column_values.append({'id': 'connect_boards', 'type': 'board_relation', 'text': '', 'value': None,
+                              'linked_item_ids': [str(i + 1)]})
+        items.append({'id': f'{board}-{i}', 'name': f'Lead {i}',
+                      'updated_at': (base + timedelta(minutes=i)).isoformat() + 'Z',
+                      'column_values': column_values})
+    return items
+
+
+def make_events(count):
+    """Synthetic Calendly scheduled events"""
+    base = datetime(2025, 1, 1, 9)
+    return [{
+        'uri': f'https://api.calendly.com/scheduled_events/{i}',
+        'name': 'TEG Intro Call',
+        'start_time': (base + timedelta(hours=i)).isoformat() + 'Z',
+        'end_time': (base + timedelta(hours=i, minutes=30)).isoformat() + 'Z',
+        'status': 'active',
+        'event_type': f'https://api.calendly.com/event_types/{i % 12}',
+        'invitees': [{'name': f'Invitee {i}', 'email': f'invitee{i}@example.com'}],
+        'source': 'Anthony',
+    } for i in range(count)]
+
+
+def legacy_write_boards(db_path, boards):
+    """The pre-batching write path: one execute per row (board tables and item_columns), default PRAGMAs"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for table_name, items in boards.items():
+        cursor.execute(f"DELETE FROM {table_name}")
+        for item in items:
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO {table_name} (id, name, board_type, column_values, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (item['id'], item['name'], table_name,
+                  serialize_column_values(item['column_values']), datetime.now()))
+        cursor.execute("DELETE FROM item_columns WHERE board = ?", (table_name,))
+        for row in item_column_rows(table_name, items):
+            cursor.execute('''
+                INSERT OR REPLACE INTO item_columns (board, item_id, col_id, pos, type, text, value, extra)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', row)
+    conn.commit()
+    conn.close()
+
+
+def legacy_write_events(db_path, events):
+    """The pre-batching Calendly write path"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM calendly_events")
+    for event in events:
+        cursor.execute(
+            f"INSERT OR REPLACE INTO calendly_events ({', '.join(CALENDLY_EVENT_FIELDS)}) "
+            f"VALUES ({', '.join('?' * len(CALENDLY_EVENT_FIELDS))})",
+            calendly_event_row(event, datetime.now())
+        )
+    conn.commit()
+    conn.close()
+
+
+def timed(label, rows, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<14} {rows:>8} rows  {elapsed:7.2f}s  {rows / elapsed:>10,.0f} rows/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the database refresh write phase.")
+    parser.add_argument("--items", type=int, default=5000, help="Items per Monday board")
+    parser.add_argument("--columns", type=int, default=60, help="Column values per item")
+    parser.add_argument("--events", type=int, default=20000, help="Calendly events")
+    args = parser.parse_args()
+
+    boards = {board: make_items(board, args.items, args.columns) for board in BOARDS}
+    events = make_events(args.events)
+    board_rows = args.items * len(BOARDS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = os.path.join(tmp, "legacy_monday.db")
+        batched_db = os.path.join(tmp, "batched_monday.db")
+        init_monday_database(legacy_db)
+        init_monday_database(batched_db)
+
+        print(f"📊 Monday.com: {len(BOARDS)} boards x {args.items} items x {args.columns} columns")
+        timed("row-at-a-time", board_rows, legacy_write_boards, legacy_db, boards)
+        fetched = [{'table_name': board, 'board_type': board, 'mode': 'full', 'state': None,
+                    'items': items, 'error': None} for board, items in boards.items()]
+        timed("batched", board_rows, publish_boards, batched_db, fetched)
+
+        legacy_cal = os.path.join(tmp, "legacy_calendly.db")
+        batched_cal = os.path.join(tmp, "batched_calendly.db")
+        init_calendly_database(legacy_cal)
+        init_calendly_database(batched_cal)
+
+        print(f"📅 Calendly: {args.events} events")
+        timed("row-at-a-time", args.events, legacy_write_events, legacy_cal, events)
+        timed("batched", args.events, save_calendly_events, batched_cal, events)
+
+
+if __name__ == "__main__":
+    main()
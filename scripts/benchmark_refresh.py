@@ -0,0 +1,106 @@
+"""
+Benchmark the full refresh against the offline API stand-in (no real API calls).
+
+Starts scripts/api_stand_in.py in-process, points http_client at it, runs the
+Monday.com (including the New Leads month cache), Calendly and snapshot steps of refresh_database.py into throwaway
+databases and prints wall time, requests, retries and items/sec.
+
+Usage: python scripts/benchmark_refresh.py [--items 2000] [--events-per-year 3000]
+       [--latency-ms 50] [--rate-limit-rate 0.02] [--columns manifest|all] [--verbose]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import http_client
+import new_leads_cache
+import refresh_database
+from api_stand_in import BOARD_IDS, add_scale_arguments, data_and_knobs, start_server
+from database_utils import BOARD_TABLES, export_snapshots
+
+
+def benchmark_config():
+    """refresh_database config pointing at the stand-in's boards"""
+    return {
+        'monday': {
+            'api_token': "stand-in",
+            **{f"{table}_id": board_id for board_id, table in BOARD_IDS.items()},
+        },
+        'calendly': {'calendly_api_key': "stand-in"},
+    }
+
+
+def count_rows(db_path, tables):
+    conn = sqlite3.connect(db_path)
+    try:
+        return sum(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark refresh_database.py against the offline API stand-in")
+    add_scale_arguments(parser)
+    parser.add_argument("--columns", choices=["manifest", "all"], default="manifest",
+                        help="Monday.com columns to fetch (see board_columns.py)")
+    parser.add_argument("--verbose", action="store_true", help="Show the refresh output")
+    args = parser.parse_args()
+
+    data, knobs = data_and_knobs(args)
+    server, base_url = start_server(data, **knobs)
+    os.environ[http_client.HOST_OVERRIDES_ENV] = f"api.monday.com={base_url},api.calendly.com={base_url}"
+
+    # The refresh writes to relative database paths - run it in a scratch directory
+    workdir = tempfile.mkdtemp(prefix="refresh_benchmark_")
+    os.chdir(workdir)
+    new_leads_cache.CACHE_PATH = os.path.join(workdir, "new_leads_current_month.json")
+    config = benchmark_config()
+    http_client.reset_stats()
+
+    output = None if args.verbose else io.StringIO()
+    timings = {}
+    with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+        started = time.monotonic()
+        refresh_database.init_databases()
+        step = time.monotonic()
+        monday_success, _ = refresh_database.refresh_monday_database(config, mode="full", columns=args.columns)
+        timings['Monday.com'] = time.monotonic() - step
+        step = time.monotonic()
+        calendly_success = refresh_database.refresh_calendly_database(config)
+        timings['Calendly'] = time.monotonic() - step
+        step = time.monotonic()
+        export_snapshots()
+        timings['Snapshots'] = time.monotonic() - step
+        wall = time.monotonic() - started
+    server.shutdown()
+
+    board_items = count_rows(refresh_database.MONDAY_DB_PATH, BOARD_TABLES)
+    events = count_rows(refresh_database.CALENDLY_DB_PATH, ["calendly_events"])
+    stats = http_client.get_stats()
+    requests_made = sum(s['requests'] for s in stats.values())
+    retries = sum(s['retries'] for s in stats.values())
+
+    print(f"Stand-in: {args.items} items x {len(BOARD_IDS)} boards, {args.events_per_year} events/year, "
+          f"{args.latency_ms}ms latency, {args.rate_limit_rate:.0%} rate limited, columns={args.columns}")
+    print(f"{'Step':<12} {'Seconds':>9}")
+    for name, seconds in timings.items():
+        print(f"{name:<12} {seconds:>9.2f}")
+    print(f"{'Total':<12} {wall:>9.2f}")
+    print(f"Monday.com: {'✅' if monday_success else '❌'} {board_items} items, "
+          f"Calendly: {'✅' if calendly_success else '❌'} {events} events")
+    print(f"Requests: {requests_made}, HTTP retries: {retries}, "
+          f"items/sec: {(board_items + events) / wall if wall else 0:,.0f}")
+    for line in http_client.format_stats():
+        print(f"   {line}")
+    print(f"Databases left in {workdir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ import base64
 from typing import Dict, Optional, Tuple
 import streamlit as st
 import os
+import http_client
 from docx_template_processor import DocxTemplateProcessor
 
 class SignNowAPI:
@@ -63,7 +64,7 @@ class SignNowAPI:
                 "scope": "*"
             }
             
-            response = requests.post(auth_url, headers=headers, data=auth_data, timeout=30)
+            response = http_client.post(auth_url, headers=headers, data=auth_data, timeout=30)
             response.raise_for_status()
             
             auth_response = response.json()
@@ -100,7 +101,7 @@ class SignNowAPI:
                 "Content-Type": "application/json"
             }
             
-            response = requests.get(user_url, headers=headers, timeout=30)
+            response = http_client.get(user_url, headers=headers, timeout=30)
             response.raise_for_status()
             
             user_data = response.json()
@@ -164,7 +165,7 @@ class SignNowAPI:
                 "Authorization": f"Bearer {self.access_token}"
             }
             
-            response = requests.post(
+            response = http_client.post(
                 f"{self.base_url}/document",
                 files=files,
                 data=data,
@@ -448,7 +449,7 @@ class SignNowAPI:
             }
             data = { 'name': document_name }
             headers = { "Authorization": f"Bearer {self.access_token}" }
-            response = requests.post(f"{self.base_url}/document", files=files, data=data, headers=headers, timeout=90)
+            response = http_client.post(f"{self.base_url}/document", files=files, data=data, headers=headers, timeout=90)
             response.raise_for_status()
             doc_id = response.json().get("id")
             return doc_id
@@ -500,7 +501,7 @@ class SignNowAPI:
             }
             
             # Trigger field extraction
-            response = requests.post(extract_url, headers=headers, timeout=60)
+            response = http_client.post(extract_url, headers=headers, timeout=60)
             
             # 200 or 202 are acceptable (202 = accepted/processing)
             if response.status_code in [200, 202]:
@@ -735,7 +736,7 @@ class SignNowAPI:
                 endpoint = f"{self.base_url}/document"
             
             headers = { "Authorization": f"Bearer {self.access_token}" }
-            resp = requests.post(endpoint, files=files, data=data, headers=headers, timeout=180)
+            resp = http_client.post(endpoint, files=files, data=data, headers=headers, timeout=180)
             resp.raise_for_status()
             doc_id = resp.json().get('id')
             
@@ -1010,7 +1011,7 @@ class SignNowAPI:
                 "from": self.user_email
             }
             
-            response = requests.post(send_url, json=data, headers=headers)
+            response = http_client.post(send_url, json=data, headers=headers)
             response.raise_for_status()
             
             return True
@@ -1042,7 +1043,7 @@ class SignNowAPI:
             }
             
             st.write("🔍 **DEBUG: Fetching document info...**")
-            doc_response = requests.get(doc_url, headers=headers)
+            doc_response = http_client.get(doc_url, headers=headers)
             doc_response.raise_for_status()
             doc_data = doc_response.json()
             st.write(f"✅ Document fetched. Document ID: {document_id}")
@@ -1293,7 +1294,7 @@ class SignNowAPI:
                 "first_field_sample": update_data["fields"][0] if update_data["fields"] else None
             }})
             
-            field_response = requests.put(fields_url, json=update_data, headers=headers)
+            field_response = http_client.put(fields_url, json=update_data, headers=headers)
             
             st.write(f"📡 **DEBUG: Response status code: {field_response.status_code}**")
             
@@ -1375,7 +1376,7 @@ class SignNowAPI:
             
             # Fetch document to check if fields were created from Text Tags
             doc_url = f"{self.base_url}/document/{document_id}"
-            doc_response = requests.get(doc_url, headers=headers)
+            doc_response = http_client.get(doc_url, headers=headers)
             doc_response.raise_for_status()
             doc_data = doc_response.json()
             
@@ -1404,7 +1405,7 @@ class SignNowAPI:
                     time.sleep(3)
                     
                     # Check again
-                    doc_response = requests.get(doc_url, headers=headers)
+                    doc_response = http_client.get(doc_url, headers=headers)
                     doc_response.raise_for_status()
                     doc_data = doc_response.json()
                     existing_fields = doc_data.get('fields', [])
@@ -1439,7 +1440,7 @@ class SignNowAPI:
                 "from": self.user_email
             }
             
-            response = requests.post(send_url, json=data, headers=headers)
+            response = http_client.post(send_url, json=data, headers=headers)
             
             # Better error handling
             if response.status_code != 200:
@@ -1490,7 +1491,7 @@ class SignNowAPI:
             }
             
             # Get document info to find page count and field locations
-            doc_response = requests.get(doc_url, headers=headers)
+            doc_response = http_client.get(doc_url, headers=headers)
             doc_response.raise_for_status()
             document_data = doc_response.json()
             
@@ -1523,7 +1524,7 @@ class SignNowAPI:
             }
             
             # Attempt to add the field
-            field_response = requests.put(fields_url, json=field_data, headers=headers)
+            field_response = http_client.put(fields_url, json=field_data, headers=headers)
             
             if field_response.status_code in [200, 201]:
                 return True
@@ -1669,7 +1670,7 @@ class SignNowAPI:
                 }
                 
                 # Create document in SignNow
-                response = requests.post(
+                response = http_client.post(
                     f"{self.base_url}/document",
                     files=files,
                     data=data,
@@ -1693,7 +1694,7 @@ class SignNowAPI:
                     "from": self.user_email
                 }
                 
-                send_response = requests.post(send_url, json=send_data, headers=headers)
+                send_response = http_client.post(send_url, json=send_data, headers=headers)
                 send_response.raise_for_status()
             
             return True, f"Document pair sent successfully to {email}. Document IDs: {', '.join(document_ids)}"
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import calendly_sync
+import database_utils
+from calendly_categories import classify_event
+
+DESIGN_REVIEW = ['teg_introductory', 'jennifer_30min']
+INTRO_CALL = ['lets_chat', 'intro_call']
+
+EVENTS = [
+    {'uri': 'ev-both', 'name': "TEG Let's Chat - Introductory Call", 'status': 'active',
+     'start_time': '2025-03-04T18:00:00.000000Z'},
+    {'uri': 'ev-chat', 'name': "TEG - Let's Chat", 'status': 'active', 'start_time': '2025-03-03T18:00:00.000000Z'},
+    {'uri': 'ev-intro', 'name': "*Intro call with TEG*", 'status': 'active', 'source': 'Ian',
+     'start_time': '2025-03-02T18:00:00.000000Z'},
+    {'uri': 'ev-teg-intro', 'name': "*TEG Introductory Call*", 'status': 'canceled',
+     'start_time': '2025-03-01T18:00:00.000000Z'},
+    {'uri': 'ev-jennifer', 'name': "30 Min Google Meet w/ JE", 'status': 'active', 'source': 'Jennifer',
+     'start_time': '2025-02-28T18:00:00.000000Z'},
+    {'uri': 'ev-other', 'name': "Internal sync", 'status': 'active', 'start_time': '2025-02-27T18:00:00.000000Z'},
+]
+
+
+@pytest.fixture
+def calendly_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_utils, 'DB_PATH', str(tmp_path / 'monday_data.db'))
+    monkeypatch.setattr(database_utils, 'CALENDLY_DB_PATH', str(tmp_path / 'calendly_data.db'))
+    monkeypatch.setattr(database_utils, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    yield database_utils.CALENDLY_DB_PATH
+    database_utils.close_read_connections()
+
+
+def uris(df):
+    return sorted(df['uri'])
+
+
+def test_event_matching_two_categories_keeps_both():
+    category, source, local_date, local_hour = classify_event(
+        "TEG Let's Chat - Introductory Call", '', '2025-03-04T18:00:00.000000Z')
+    assert category == 'lets_chat,teg_introductory'
+    assert source == 'Burki'
+    assert (local_date, local_hour) == ('2025-03-04', 10)
+
+
+def test_slices_include_events_in_several_categories(calendly_db):
+    calendly_sync.save_calendly_events(calendly_db, EVENTS)
+
+    assert uris(database_utils.get_calendly_events(DESIGN_REVIEW, active_only=True)) == ['ev-both', 'ev-jennifer']
+    assert uris(database_utils.get_calendly_events(INTRO_CALL, active_only=True)) == ['ev-both', 'ev-chat', 'ev-intro']
+    assert uris(database_utils.get_calendly_events(['lets_chat'])) == ['ev-both', 'ev-chat']
+    assert uris(database_utils.get_calendly_events(DESIGN_REVIEW)) == ['ev-both', 'ev-jennifer', 'ev-teg-intro']
+
+
+@pytest.mark.skipif(database_utils.pa is None, reason="pyarrow not installed")
+def test_snapshot_slices_match_the_database(calendly_db):
+    calendly_sync.save_calendly_events(calendly_db, EVENTS)
+    from_db = database_utils.get_calendly_events(DESIGN_REVIEW, active_only=True)
+
+    assert database_utils.export_snapshots()[0]
+    assert database_utils._load_snapshot_table("calendly_events", calendly_db) is not None
+    from_snapshot = database_utils.get_calendly_events(DESIGN_REVIEW, active_only=True)
+    assert from_snapshot['uri'].tolist() == from_db['uri'].tolist()
+
+
+def test_database_not_refreshed_since_categories_is_classified_on_read(calendly_db):
+    # calendly_events as written before event_category existed
+    conn = sqlite3.connect(calendly_db)
+    conn.execute('''
+        CREATE TABLE calendly_events (uri TEXT PRIMARY KEY, name TEXT, start_time TEXT, end_time TEXT, status TEXT,
+                                      event_type TEXT, invitee_name TEXT, invitee_email TEXT, source TEXT,
+                                      created_at TIMESTAMP, updated_at TIMESTAMP)
+    ''')
+    conn.executemany(
+        "INSERT INTO calendly_events (uri, name, start_time, status, source) VALUES (?, ?, ?, ?, ?)",
+        [(e['uri'], e['name'], e['start_time'], e['status'], e.get('source', '')) for e in EVENTS]
+    )
+    conn.commit()
+    conn.close()
+
+    df = database_utils.get_calendly_events(INTRO_CALL, active_only=True)
+    assert uris(df) == ['ev-both', 'ev-chat', 'ev-intro']
+    assert df.set_index('uri').loc['ev-chat', 'source'] == 'Burki'
+    assert uris(database_utils.get_calendly_events(DESIGN_REVIEW, active_only=True)) == ['ev-both', 'ev-jennifer']
+
+    # The next refresh stores the categories
+    calendly_sync.init_calendly_database(calendly_db)
+    stored = dict(sqlite3.connect(calendly_db).execute("SELECT uri, event_category FROM calendly_events").fetchall())
+    assert stored['ev-both'] == 'lets_chat,teg_introductory'
+    assert stored['ev-other'] == 'other'
+
+
+def test_failed_event_type_is_fetched_once_per_run(calendly_db, monkeypatch):
+    calendly_sync.init_calendly_database(calendly_db)
+    requests = []
+
+    class Unavailable:
+        status_code = 503
+
+    def get(url, **kwargs):
+        requests.append(url)
+        return Unavailable()
+
+    monkeypatch.setattr(calendly_sync.http_client, 'get', get)
+    event_types = calendly_sync.event_type_cache(calendly_db)
+    event_types.prefetch(['et/broken', 'et/broken'], {})
+    assert [event_types.get('et/broken', {}) for _ in range(3)] == [{}, {}, {}]
+    assert len(requests) == 1
+
+    # Not persisted: the next run asks again
+    event_types.save()
+    assert sqlite3.connect(calendly_db).execute("SELECT COUNT(*) FROM calendly_event_types").fetchone() == (0,)
+    calendly_sync.event_type_cache(calendly_db).get('et/broken', {})
+    assert len(requests) == 2
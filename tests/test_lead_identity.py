@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database_utils
+import monday_sync
+
+
+def item(item_id, name, email="", phone="", stage_date="", links=()):
+    column_values = [
+        {'id': 'email', 'type': 'email', 'text': email},
+        {'id': 'phone', 'type': 'phone', 'text': phone},
+        {'id': 'connect_boards', 'type': 'board_relation', 'text': '', 'linked_item_ids': list(links)},
+    ]
+    for col_id in ('date_mkwgr4gg', 'date_mktbrpz6', 'date3', 'date_mktqx5me'):
+        column_values.append({'id': col_id, 'type': 'date', 'text': stage_date})
+    return {'id': item_id, 'name': name, 'column_values': column_values}
+
+
+def fetched(table_name, items, mode="full"):
+    return {'table_name': table_name, 'board_type': table_name, 'mode': mode, 'state': None,
+            'items': items, 'error': None}
+
+
+@pytest.fixture
+def monday_db(tmp_path, monkeypatch):
+    # DB_PATH is relative to the working directory, and read helpers default to it
+    monkeypatch.chdir(tmp_path)
+    monday_sync.init_monday_database(database_utils.DB_PATH)
+    yield database_utils.DB_PATH
+    database_utils.close_read_connections()
+
+
+def lead_ids(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return dict(((board, item_id), lead_id) for board, item_id, lead_id in conn.execute(
+            "SELECT board, item_id, lead_id FROM lead_identity"
+        ))
+
+
+BOARDS = [
+    fetched('new_leads_board', [
+        item('101', 'Jane Doe', email='Jane@Example.com', stage_date='2025-01-02'),
+        item('102', 'Sam Lee', phone='+1 (555) 010-2030', stage_date='2025-01-03'),
+        item('103', 'Alex Kim', stage_date='2025-01-04'),
+        item('104', 'No show', stage_date='2025-01-05'),
+    ]),
+    fetched('discovery_call_board', [
+        # Same email, different name: the same lead
+        item('201', 'Jane D.', email=' jane@example.com', stage_date='2025-01-10'),
+        # Same name or phone only: different people
+        item('202', 'Sam Lee (copy)', stage_date='2025-01-11'),
+        item('203', 'Pat Roe', phone='555-010-2030', stage_date='2025-01-12'),
+    ]),
+    fetched('design_review_board', [
+        # Linked to Alex Kim's New Leads item
+        item('301', 'Alex K', stage_date='2025-01-20', links=['103']),
+    ]),
+    fetched('sales_board', [
+        item('401', 'Jane Doe (copy)', stage_date='2025-02-01'),
+        item('402', 'Alex Kim (copy)', stage_date='2025-02-01', links=['301']),
+    ]),
+]
+
+
+def test_leads_merge_on_links_and_email_only(monday_db):
+    monday_sync.publish_boards(monday_db, BOARDS)
+    leads = lead_ids(monday_db)
+    assert leads[('new_leads_board', '101')] == leads[('discovery_call_board', '201')] == '101'
+    assert leads[('new_leads_board', '103')] == leads[('design_review_board', '301')] == leads[('sales_board', '402')]
+    assert leads[('sales_board', '401')] == '401'
+    assert leads[('new_leads_board', '102')] == '102'
+    assert leads[('discovery_call_board', '202')] == '202'
+    assert leads[('discovery_call_board', '203')] == '203'
+
+
+def test_incremental_publish_matches_full_rebuild(monday_db):
+    monday_sync.publish_boards(monday_db, BOARDS)
+    monday_sync.publish_boards(monday_db, [
+        # Sam Lee's copy gets Sam's email and the new leads item too; Alex's sales item drops its link
+        fetched('discovery_call_board', [item('202', 'Sam Lee (copy)', email='sam@example.com')], mode="incremental"),
+        fetched('new_leads_board', [item('102', 'Sam Lee', email='SAM@example.com')], mode="incremental"),
+        fetched('sales_board', [item('402', 'Alex Kim (copy)', stage_date='2025-02-01')], mode="incremental"),
+    ])
+    incremental = lead_ids(monday_db)
+    assert incremental[('discovery_call_board', '202')] == '102'
+    assert incremental[('sales_board', '402')] == '402'
+    assert incremental[('design_review_board', '301')] == '103'
+
+    with sqlite3.connect(monday_db) as conn:
+        monday_sync.rebuild_lead_identity(conn)
+    assert lead_ids(monday_db) == incremental
+
+
+def test_funnel_reads_lead_identity_and_resolves_unrefreshed_databases(monday_db):
+    monday_sync.publish_boards(monday_db, BOARDS)
+    funnel = database_utils.get_lead_funnel().set_index('lead_id').sort_index()
+    assert '104' not in funnel.index  # Placeholder items are not leads
+    alex = funnel.loc['103']
+    assert (alex['New Leads Items'], alex['Design Review Call Items'], alex['Deck Call Items']) == (1, 1, 1)
+    assert (alex['Deck Call Date'] - alex['New Leads Date']).days == 28
+
+    # A database refreshed before the current matching rules is resolved on read, without writing
+    with sqlite3.connect(monday_db) as conn:
+        conn.execute("UPDATE db_metadata SET value = '1' WHERE key = 'lead_identity_rules'")
+        conn.execute("UPDATE lead_identity SET lead_id = '101'")
+    database_utils.close_read_connections()
+    assert database_utils.get_lead_funnel().set_index('lead_id').sort_index().equals(funnel)
+    assert sorted(database_utils.get_lead_items(name='Alex Kim')['item_id']) == ['103', '301', '402']
+
+
+def test_search_item_by_name_returns_the_whole_lead(monday_db):
+    monday_sync.publish_boards(monday_db, BOARDS)
+    results = database_utils.search_item_by_name('jane  doe')
+    assert sorted((r['board'], r['id']) for r in results) == [
+        ('discovery_call_board', '201'), ('new_leads_board', '101'), ('sales_board', '401')
+    ]
+
+
+@pytest.mark.parametrize('search', ['Doe', 'jane'])
+def test_search_item_by_name_matches_partial_names(monday_db, search):
+    monday_sync.publish_boards(monday_db, BOARDS)
+    results = database_utils.search_item_by_name(search)
+    assert sorted((r['board'], r['id'], r['lead_id']) for r in results) == [
+        ('discovery_call_board', '201', '101'), ('new_leads_board', '101', '101'), ('sales_board', '401', '401')
+    ]
+
+    # Databases refreshed before the current matching rules match the same way
+    with sqlite3.connect(monday_db) as conn:
+        conn.execute("UPDATE db_metadata SET value = '1' WHERE key = 'lead_identity_rules'")
+    database_utils.close_read_connections()
+    assert sorted((r['board'], r['id']) for r in database_utils.search_item_by_name(search)) == [
+        ('discovery_call_board', '201'), ('new_leads_board', '101'), ('sales_board', '401')
+    ]
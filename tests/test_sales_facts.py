@@ -0,0 +1,128 @@
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database_utils import create_item_links_table, save_item_links
+from sales_facts import build_sales_facts, create_sales_facts_table, rebuild_sales_facts
+
+
+def column(col_id, text="", col_type="text", **extra):
+    return {'id': col_id, 'type': col_type, 'text': text, **extra}
+
+
+def item(item_id, name, *column_values):
+    return {'id': item_id, 'name': name, 'column_values': list(column_values)}
+
+
+def facts_by_name(items):
+    return {fact['item_name']: fact for fact in build_sales_facts(items)}
+
+
+def test_formula_text_and_value_fallback():
+    facts = facts_by_name([
+        item('1', 'Formula text', column('formula_mktj2qh2', '$2,000', 'formula'), column('contract_amt', '500', 'numbers')),
+        item('2', 'Formula value', column('formula_mktk2rgx', '', 'formula', value='{"number": 1500}')),
+        item('3', 'Formula plain', column('formula_mktks5te', '', 'formula', value='750')),
+    ])
+    # The formula wins over contract_amt
+    assert facts['Formula text']['value'] == 2000.0
+    assert facts['Formula text']['contract_amount'] == 500.0
+    assert facts['Formula value']['value'] == 1500.0
+    assert facts['Formula plain']['value'] == 750.0
+
+
+def test_contract_numbers3_and_mirror_are_summed():
+    facts = facts_by_name([
+        item('1', 'All three', column('contract_amt', '$1,000', 'numbers'), column('numbers3', '250', 'numbers'),
+             column('lookup_mkx8jk3h', '', 'mirror', additional_info='{"display_value": "300"}')),
+        item('2', 'Contract only', column('contract_amt', '800', 'numbers')),
+        item('3', 'Paid only', column('numbers3', '120.5', 'numbers')),
+        item('4', 'Nothing', column('color_mknxd1j2', 'Closed', 'status')),
+    ])
+    assert facts['All three']['value'] == 1550.0
+    assert facts['All three']['contract_amount'] == 1000.0
+    assert facts['All three']['amount_paid'] == 250.0
+    assert facts['Contract only']['value'] == 800.0
+    assert facts['Paid only']['value'] == 120.5
+    assert facts['Nothing']['value'] is None
+    assert facts['Nothing']['status'] == facts['Nothing']['lead_status'] == 'Closed'
+
+
+def test_copy_items_roll_up_into_base_without_mirror():
+    facts = facts_by_name([
+        item('1', 'Acme', column('contract_amt', '1000', 'numbers')),
+        item('2', 'Acme (copy)', column('contract_amt', '200', 'numbers'), column('numbers3', '50', 'numbers')),
+        item('3', 'Acme (copy) (copy)', column('numbers3', '100', 'numbers')),
+        item('4', 'Mirrored', column('contract_amt', '400', 'numbers'), column('lookup_mkx8jk3h', '90', 'mirror')),
+        item('5', 'Mirrored (copy)', column('contract_amt', '60', 'numbers')),
+    ])
+    assert facts['Acme']['value'] == 1350.0
+    assert facts['Acme (copy)']['value'] == 250.0
+    assert facts['Acme (copy) (copy)']['value'] == 100.0
+    # A base item with its own mirror value keeps it instead of the copy total
+    assert facts['Mirrored']['value'] == 490.0
+    assert facts['Mirrored (copy)']['value'] == 60.0
+
+
+def test_linked_items_add_their_revenue():
+    facts = facts_by_name([
+        item('1', 'Parent', column('contract_amt', '1000', 'numbers'),
+             column('connect_boards', 'Child A, Child B', 'board_relation', linked_item_ids=['2', '3', '9'])),
+        item('2', 'Child A', column('contract_amt', '300', 'numbers')),
+        item('3', 'Child B', column('numbers3', '', 'numbers')),
+    ])
+    assert facts['Parent']['value'] == 1300.0
+    # Unknown linked ids are ignored; linked names keep the link order
+    assert facts['Parent']['linked_items'] == 'Child A, Child B'
+    assert facts['Parent']['is_linked_item'] == 0
+    assert facts['Child A']['value'] == 300.0
+    assert facts['Child A']['is_linked_item'] == 1
+    assert facts['Child B']['value'] is None
+    assert facts['Child B']['is_linked_item'] == 1
+    assert facts['Child B']['linked_items'] == ''
+
+
+def test_rebuild_reads_links_from_item_links():
+    items = [
+        item('1', 'Parent', column('contract_amt', '1000', 'numbers'),
+             column('connect_boards', 'Child', 'board_relation', linked_item_ids=['2'])),
+        item('2', 'Child', column('contract_amt', '300', 'numbers')),
+        item('3', 'No show', column('contract_amt', '50', 'numbers')),
+        item('4', 'Spam test', column('connect_boards', 'Real Co', 'board_relation', linked_item_ids=['5'])),
+        item('5', 'Real Co', column('contract_amt', '500', 'numbers')),
+    ]
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE sales_board (id TEXT PRIMARY KEY, name TEXT, column_values TEXT, updated_at TIMESTAMP)")
+    conn.executemany(
+        "INSERT INTO sales_board (id, name, column_values) VALUES (?, ?, ?)",
+        [(i['id'], i['name'], json.dumps(i['column_values'])) for i in items]
+    )
+    create_item_links_table(conn.cursor())
+    create_sales_facts_table(conn.cursor())
+    save_item_links(conn, 'sales_board', items)
+    conn.execute("INSERT INTO item_links (board, item_id, col_id, linked_item_id) VALUES ('sales_board', '1', 'connect2', '3')")
+
+    # Excluded items ("No ...", "Spam...") have no facts: links to them add nothing, and
+    # links from them do not flag their targets as linked items
+    assert rebuild_sales_facts(conn) == 3
+    facts = {row[0]: row[1:] for row in conn.execute(
+        "SELECT item_name, value, linked_items, is_linked_item FROM sales_facts"
+    )}
+    assert facts == {'Parent': (1300.0, 'Child', 0), 'Child': (300.0, '', 1), 'Real Co': (500.0, '', 0)}
+
+
+@pytest.mark.parametrize('col_id, field', [
+    ('deal_stage', 'status'), ('utm_medium', 'channel'),
+])
+def test_column_name_fallbacks(col_id, field):
+    facts = facts_by_name([item('1', 'Lead', column(col_id, 'Found'))])
+    assert facts['Lead'][field] == 'Found'
+
+
+def test_value_column_name_fallback():
+    facts = facts_by_name([item('1', 'Lead', column('deal_price', '$42'))])
+    assert facts['Lead']['value'] == 42.0